@@ -3,9 +3,11 @@ Argus - Open Source Observability for AI Agents
 """
 
 from .watch import Watch
+from .sampling import Sampler
+from .retention import RetentionPolicy
 
 # Global instance for convenience
 watch = Watch()
 
 __version__ = "0.1.0"
-__all__ = ["watch", "Watch"]
+__all__ = ["watch", "Watch", "Sampler", "RetentionPolicy"]
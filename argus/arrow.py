@@ -0,0 +1,125 @@
+"""
+Arrow - columnar call export (Parquet, Arrow tables, pandas)
+
+Needs the optional pyarrow package (pip install 'hundredeyes[arrow]');
+pandas is only needed for to_dataframe().
+"""
+
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Parquet column codecs accepted by export(format="parquet", compression=...)
+PARQUET_COMPRESSIONS = ("snappy", "gzip", "zstd", "none")
+
+
+def require_pyarrow():
+    if not PYARROW_AVAILABLE:
+        raise ImportError(
+            "Parquet and Arrow export need pyarrow: pip install 'hundredeyes[arrow]'"
+        )
+
+
+def call_schema(payloads: bool = False) -> "pa.Schema":
+    """Arrow schema of exported calls"""
+    require_pyarrow()
+    fields = [
+        pa.field("call_id", pa.string(), nullable=False),
+        pa.field("agent_name", pa.dictionary(pa.int32(), pa.string()), nullable=False),
+        pa.field("status", pa.dictionary(pa.int8(), pa.string())),
+        pa.field("duration_ms", pa.int64()),
+        pa.field("cost", pa.float64()),
+        pa.field("timestamp", pa.timestamp("us")),
+        pa.field("error", pa.string()),
+        pa.field("trace_id", pa.string()),
+        pa.field("span_id", pa.string()),
+        pa.field("parent_span_id", pa.string()),
+    ]
+    if payloads:
+        # JSON text, exactly as stored
+        fields += [
+            pa.field("input_data", pa.string()),
+            pa.field("output_data", pa.string()),
+        ]
+    return pa.schema(fields)
+
+
+def record_batches(
+    chunks: Iterable[Dict[str, Sequence[Any]]],
+    payloads: bool = False
+) -> Iterator["pa.RecordBatch"]:
+    """
+    Arrow record batches from Storage.iter_call_columns() chunks
+    
+    Each column list is converted to a typed array in one go.
+    """
+    schema = call_schema(payloads)
+    for columns in chunks:
+        yield pa.RecordBatch.from_arrays(
+            [
+                # safe=False: duration_ms may hold floats logged by hand
+                pa.array(columns[field.name], type=field.type, safe=False)
+                for field in schema
+            ],
+            schema=schema
+        )
+
+
+def to_table(chunks: Iterable[Dict[str, Sequence[Any]]], payloads: bool = False) -> "pa.Table":
+    """All chunks as one Arrow table"""
+    return pa.Table.from_batches(
+        list(record_batches(chunks, payloads)),
+        schema=call_schema(payloads)
+    )
+
+
+def to_dataframe(table: "pa.Table") -> Any:
+    """pandas DataFrame of an Arrow table (agent_name and status become categoricals)"""
+    try:
+        import pandas  # noqa: F401
+    except ImportError:
+        raise ImportError("to_dataframe() needs pandas: pip install 'hundredeyes[pandas]'")
+    return table.to_pandas()
+
+
+def write_parquet(
+    filename: str,
+    chunks: Iterable[Dict[str, Sequence[Any]]],
+    payloads: bool = True,
+    compression: Optional[str] = None
+) -> int:
+    """
+    Write chunks to a Parquet file, one row group per chunk
+    
+    Row groups are written as they arrive, so memory holds one chunk at a
+    time.
+    
+    Args:
+        filename: Output path
+        chunks: Storage.iter_call_columns() output
+        payloads: Whether chunks have input_data/output_data
+        compression: Column codec - "snappy" (default), "gzip", "zstd"
+            or "none"
+    
+    Returns:
+        Number of calls written
+    """
+    require_pyarrow()
+    compression = compression or "snappy"
+    if compression not in PARQUET_COMPRESSIONS:
+        raise ValueError(
+            f"Unknown Parquet compression '{compression}', "
+            f"expected one of {PARQUET_COMPRESSIONS}"
+        )
+    
+    written = 0
+    with pq.ParquetWriter(filename, call_schema(payloads), compression=compression) as writer:
+        for batch in record_batches(chunks, payloads):
+            writer.write_batch(batch)
+            written += batch.num_rows
+    return written
@@ -0,0 +1,16 @@
+"""
+Storage backends - where Watch keeps agents, calls and rollups
+
+"sqlite" (argus.storage.Storage) is the default; "segments" appends calls
+to log files and folds them into the same SQLite database in the background,
+for higher call rates; "memory" keeps recent calls in a ring buffer and
+never touches disk.
+"""
+
+from .base import StorageBackend
+from .memory import MemoryBackend
+from .segments import SegmentLogBackend
+
+BACKENDS = ("sqlite", "segments", "memory")
+
+__all__ = ["BACKENDS", "StorageBackend", "MemoryBackend", "SegmentLogBackend"]
@@ -0,0 +1,409 @@
+"""
+Storage backend interface - everything Watch, the dashboard and the
+integrations need from wherever calls are kept
+"""
+
+import base64
+import binascii
+import json
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from ..export import check_format, infer_compression, open_output, write_calls
+from ..rollups import RESOLUTIONS, bucket_start, parse_window, resolution_for, summarize
+from ..sketch import percentiles_of
+
+_CURSOR_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+# Metric columns of exported calls, in export order
+EXPORT_COLUMNS = [
+    "call_id", "agent_name", "status", "duration_ms", "cost", "timestamp",
+    "error", "trace_id", "span_id", "parent_span_id"
+]
+
+
+def encode_cursor(timestamp: datetime, position: Union[int, str]) -> str:
+    """Opaque get_calls_page() cursor pointing just past a call"""
+    key = f"{timestamp.strftime(_CURSOR_TIMESTAMP_FORMAT)}|{position}"
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def decode_cursor(cursor: str, position_type: type = int) -> Tuple[datetime, Any]:
+    """(timestamp, position) of the last call on the previous page"""
+    try:
+        timestamp, position = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.strptime(timestamp, _CURSOR_TIMESTAMP_FORMAT), position_type(position)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError(f"Invalid cursor '{cursor}'")
+
+
+def check_limit(limit: int):
+    """Raise ValueError for a get_calls_page() limit that isn't a positive page size"""
+    if limit < 1:
+        raise ValueError(f"limit must be at least 1, got {limit}")
+
+
+class StorageBackend(ABC):
+    """
+    Where Watch keeps agents, calls and rollups
+    
+    Backends implement the abstract methods; listing, rollup summaries and
+    export are built on top of them here. Every backend keeps the same
+    aggregate semantics: agent totals and rollups count every call, sampled
+    or not, and are never touched by compact().
+    """
+    
+    @abstractmethod
+    def register_agent(self, name: str, tags: List[str]):
+        """Register an agent, or update its tags"""
+    
+    @abstractmethod
+    def log_calls(self, calls: List[Dict[str, Any]]):
+        """
+        Log a batch of calls
+        
+        Each item takes the same keys as log_call() ("sampled", "tags" and
+        the trace fields are optional). Calls with sampled=False only count
+        towards agent totals and rollups.
+        """
+    
+    @abstractmethod
+    def get_stats(self, agent_name: Optional[str] = None) -> Dict[str, Any]:
+        """Totals of one agent ({} if unknown), or of all agents"""
+    
+    @abstractmethod
+    def list_agents(self) -> List[Dict[str, Any]]:
+        """Every agent with its tags and totals"""
+    
+    @abstractmethod
+    def _rollup_rows(
+        self,
+        resolution: str,
+        agent_name: Optional[str],
+        since: Optional[datetime],
+        until: Optional[datetime]
+    ) -> List[Dict[str, Any]]:
+        """Rollup rows, oldest first, including their serialized sketches"""
+    
+    @abstractmethod
+    def get_calls_page(
+        self,
+        agent_name: Optional[str] = None,
+        limit: int = 100,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        status: Optional[str] = None,
+        min_duration_ms: Optional[float] = None,
+        max_duration_ms: Optional[float] = None,
+        min_cost: Optional[float] = None,
+        tags: Optional[List[str]] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """One page of calls, newest first: {"calls": [...], "next_cursor": ...}"""
+    
+    @abstractmethod
+    def get_call(self, call_id: str) -> Optional[Dict[str, Any]]:
+        """One call with its input and output data, or None"""
+    
+    @abstractmethod
+    def get_trace(self, trace_id: str) -> List[Dict[str, Any]]:
+        """Every span of a trace, oldest first"""
+    
+    @abstractmethod
+    def compact(self, retention: Any = None, **options: Any) -> Dict[str, Any]:
+        """Delete expired calls and rollups; returns what was deleted"""
+    
+    @abstractmethod
+    def iter_calls(
+        self,
+        agent_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        payloads: bool = True,
+        chunk_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """Every matching call, oldest first"""
+    
+    @abstractmethod
+    def export_since_watermark(
+        self,
+        name: str,
+        filename: str,
+        format: str = "jsonl",
+        compression: Optional[str] = None,
+        chunk_size: Optional[int] = None
+    ) -> int:
+        """Export only the calls added since the last export under name"""
+    
+    def clear_agent_cache(self):
+        """Forget which agents were registered by this process"""
+    
+    def log_call(
+        self,
+        call_id: str,
+        agent_name: str,
+        input_data: Dict[str, Any],
+        output_data: Dict[str, Any],
+        status: str,
+        error: Optional[str],
+        duration_ms: int,
+        cost: float,
+        timestamp: datetime,
+        sampled: bool = True,
+        trace_id: Optional[str] = None,
+        span_id: Optional[str] = None,
+        parent_span_id: Optional[str] = None
+    ):
+        """
+        Log an agent call
+        
+        Calls with sampled=False only update the agent's totals - the call
+        itself isn't kept.
+        """
+        self.log_calls([{
+            "call_id": call_id,
+            "agent_name": agent_name,
+            "input_data": input_data,
+            "output_data": output_data,
+            "status": status,
+            "error": error,
+            "duration_ms": duration_ms,
+            "cost": cost,
+            "timestamp": timestamp,
+            "sampled": sampled,
+            "trace_id": trace_id,
+            "span_id": span_id,
+            "parent_span_id": parent_span_id
+        }])
+    
+    def get_calls(
+        self,
+        agent_name: Optional[str] = None,
+        limit: int = 100,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        **filters: Any
+    ) -> List[Dict[str, Any]]:
+        """
+        Get recent calls, newest first
+        
+        Args:
+            agent_name: Filter by agent (optional)
+            limit: Max calls returned
+            since: Only calls at or after this time
+            until: Only calls before this time
+            **filters: Any other get_calls_page() argument
+        """
+        if limit == 0:
+            return []
+        return self.get_calls_page(
+            agent_name, limit, since=since, until=until, **filters
+        )["calls"]
+    
+    def get_rollups(
+        self,
+        resolution: str = "hour",
+        agent_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get rollup buckets, oldest first
+        
+        Args:
+            resolution: "minute", "hour" or "day"
+            agent_name: Filter by agent (optional)
+            since: First bucket to include - a timestamp inside a bucket
+                includes that whole bucket
+            until: Only buckets starting before this time
+        """
+        if resolution not in RESOLUTIONS:
+            raise ValueError(
+                f"Unknown resolution '{resolution}', expected one of {tuple(RESOLUTIONS)}"
+            )
+        
+        rows = self._rollup_rows(resolution, agent_name, since, until)
+        for row in rows:
+            row["latency_percentiles"] = percentiles_of(row.pop("latency_sketch"))
+        return rows
+    
+    def get_window_stats(
+        self,
+        window: Any = "24h",
+        agent_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Per-agent stats for a recent time window, read from rollups
+        
+        The resolution is picked from the window length (minutes up to 6h,
+        hours up to 14 days, days beyond), so the oldest bucket may reach up
+        to one bucket further back than the window.
+        
+        Args:
+            window: timedelta, seconds or a string like "30m", "24h", "7d"
+            agent_name: Filter by agent (optional)
+        """
+        length = parse_window(window)
+        resolution = resolution_for(length)
+        since = datetime.utcnow() - length
+        
+        by_agent: Dict[str, List[Dict[str, Any]]] = {}
+        for row in self._rollup_rows(resolution, agent_name, since, None):
+            by_agent.setdefault(row["agent_name"], []).append(row)
+        
+        return {
+            "window_seconds": length.total_seconds(),
+            "resolution": resolution,
+            "since": bucket_start(since, resolution).isoformat(),
+            "agents": [
+                {"name": name, **summarize(rows)}
+                for name, rows in sorted(by_agent.items())
+            ]
+        }
+    
+    def iter_call_columns(
+        self,
+        agent_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        payloads: bool = False,
+        chunk_size: int = 65536
+    ) -> Iterator[Dict[str, Sequence[Any]]]:
+        """
+        Matching calls, oldest first, as one column -> values dict per chunk
+        
+        timestamp is a datetime; input_data/output_data (with payloads) are
+        JSON text.
+        
+        Args:
+            agent_name: Only this agent's calls
+            since: Only calls at or after this time
+            until: Only calls before this time
+            payloads: Include input_data/output_data columns
+            chunk_size: Rows per chunk
+        """
+        return self._iter_call_columns(
+            payloads, chunk_size, agent_name=agent_name, since=since, until=until
+        )
+    
+    def _iter_calls(self, payloads: bool, chunk_size: int, **selection: Any) -> Iterator[Dict[str, Any]]:
+        """iter_calls() of a selection (agent_name, since, until)"""
+        return self.iter_calls(payloads=payloads, chunk_size=chunk_size, **selection)
+    
+    def _iter_call_columns(
+        self,
+        payloads: bool,
+        chunk_size: int,
+        **selection: Any
+    ) -> Iterator[Dict[str, Sequence[Any]]]:
+        """iter_call_columns() of a selection, transposed from _iter_calls()"""
+        names = EXPORT_COLUMNS + (["input_data", "output_data"] if payloads else [])
+        chunk = []
+        for call in self._iter_calls(payloads, chunk_size, **selection):
+            call["timestamp"] = datetime.fromisoformat(call["timestamp"])
+            if payloads:
+                for name in ("input_data", "output_data"):
+                    if call[name] is not None:
+                        call[name] = json.dumps(call[name])
+            chunk.append(call)
+            if len(chunk) == chunk_size:
+                yield {name: [c[name] for c in chunk] for name in names}
+                chunk = []
+        if chunk:
+            yield {name: [c[name] for c in chunk] for name in names}
+    
+    def to_arrow(
+        self,
+        agent_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        payloads: bool = False,
+        chunk_size: int = 65536
+    ) -> Any:
+        """
+        Matching calls as a pyarrow Table, oldest first
+        
+        Columns are fetched chunk_size rows at a time and converted to
+        typed arrays directly. Needs pyarrow.
+        
+        Args:
+            agent_name: Only this agent's calls
+            since: Only calls at or after this time
+            until: Only calls before this time
+            payloads: Include input_data/output_data as JSON text
+            chunk_size: Rows per record batch
+        """
+        from ..arrow import require_pyarrow, to_table
+        require_pyarrow()
+        return to_table(
+            self.iter_call_columns(
+                agent_name, since=since, until=until, payloads=payloads, chunk_size=chunk_size
+            ),
+            payloads
+        )
+    
+    def to_dataframe(self, *args: Any, **kwargs: Any) -> Any:
+        """Matching calls as a pandas DataFrame - same arguments as to_arrow()"""
+        from ..arrow import to_dataframe
+        return to_dataframe(self.to_arrow(*args, **kwargs))
+    
+    def export(
+        self,
+        filename: str,
+        format: str = "csv",
+        agent_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        compression: Optional[str] = None,
+        chunk_size: Optional[int] = None
+    ) -> int:
+        """
+        Export calls, oldest first, streaming them to the file
+        
+        Args:
+            filename: Output path
+            format: "csv", "json", "jsonl" (one call per line) or
+                "parquet" (needs pyarrow)
+            agent_name: Only this agent's calls
+            since: Only calls at or after this time
+            until: Only calls before this time
+            compression: "gzip" or "zstd" - by default taken from the
+                extension (.gz, .zst). For Parquet, the column codec:
+                "snappy" (default), "gzip", "zstd" or "none"
+            chunk_size: Rows read at a time (default 1000; 65536 for
+                Parquet, one row group each)
+        
+        Returns:
+            Number of calls exported
+        """
+        return self._export(
+            filename, format, compression, chunk_size,
+            agent_name=agent_name, since=since, until=until
+        )
+    
+    def _export(
+        self,
+        filename: str,
+        format: str,
+        compression: Optional[str],
+        chunk_size: Optional[int],
+        **selection: Any
+    ) -> int:
+        """export() of any _iter_calls() selection"""
+        check_format(format)
+        if format == "parquet":
+            from ..arrow import write_parquet
+            return write_parquet(
+                filename,
+                self._iter_call_columns(True, chunk_size or 65536, **selection),
+                compression=compression
+            )
+        
+        if compression is None:
+            compression = infer_compression(filename)
+        
+        # CSV only has the metric columns
+        calls = self._iter_calls(format != "csv", chunk_size or 1000, **selection)
+        with open_output(filename, compression) as f:
+            return write_calls(f, calls, format)
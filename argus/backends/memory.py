@@ -0,0 +1,521 @@
+"""
+Memory backend - recent calls in a fixed-size ring buffer, nothing on disk
+
+For tests, benchmarks and short-lived sidecars. Agent totals and rollups
+are kept in full, like the SQLite backend's; only the newest `capacity`
+calls are, older ones are overwritten one slot at a time.
+"""
+
+import heapq
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from ..export import check_format
+from ..rollups import RollupBatch, bucket_start
+from ..sketch import LatencySketch
+from .base import StorageBackend, check_limit, decode_cursor, encode_cursor
+
+DEFAULT_CAPACITY = 100_000
+
+
+class _StoredCall(NamedTuple):
+    seq: int  # Position in the stream of calls - the ring slot is seq % capacity
+    call_id: str
+    agent_name: str
+    status: str
+    duration_ms: Any
+    cost: float
+    timestamp: datetime
+    error: Optional[str]
+    trace_id: Optional[str]
+    span_id: Optional[str]
+    parent_span_id: Optional[str]
+    input_data: Any
+    output_data: Any
+
+
+class _AgentTotals:
+    __slots__ = (
+        "tags", "total_calls", "total_cost", "total_errors", "sum_duration_ms",
+        "min_duration_ms", "max_duration_ms", "sketch", "created_at", "last_called_at"
+    )
+    
+    def __init__(self, tags: List[str]):
+        self.tags = tags
+        self.total_calls = 0
+        self.total_cost = 0.0
+        self.total_errors = 0
+        self.sum_duration_ms = 0.0
+        self.min_duration_ms = None
+        self.max_duration_ms = None
+        self.sketch = LatencySketch()
+        self.created_at = datetime.utcnow()
+        self.last_called_at = None
+    
+    def add(self, status: str, duration_ms: float, cost: float, timestamp: datetime):
+        self.total_calls += 1
+        self.total_cost += cost
+        if status == "error":
+            self.total_errors += 1
+        self.sum_duration_ms += duration_ms
+        if self.min_duration_ms is None or duration_ms < self.min_duration_ms:
+            self.min_duration_ms = duration_ms
+        if self.max_duration_ms is None or duration_ms > self.max_duration_ms:
+            self.max_duration_ms = duration_ms
+        self.sketch.add(duration_ms)
+        self.last_called_at = timestamp
+    
+    @property
+    def avg_duration_ms(self) -> float:
+        return self.sum_duration_ms / self.total_calls if self.total_calls else 0.0
+
+
+def _summary(call: _StoredCall) -> Dict[str, Any]:
+    """A call as get_calls() lists it"""
+    return {
+        "call_id": call.call_id,
+        "agent_name": call.agent_name,
+        "status": call.status,
+        "duration_ms": call.duration_ms,
+        "cost": call.cost,
+        "timestamp": call.timestamp.isoformat(),
+        "error": call.error,
+        "trace_id": call.trace_id,
+        "span_id": call.span_id,
+        "parent_span_id": call.parent_span_id
+    }
+
+
+class MemoryBackend(StorageBackend):
+    """
+    In-memory storage backend
+    
+    Usage:
+        watch = Watch(backend="memory")
+        watch = Watch(backend=MemoryBackend(capacity=10_000))
+    
+    Inserting a call is O(1): it takes the next slot of a preallocated
+    ring, evicting the oldest call once the ring is full. Payloads are kept
+    as passed in, not copied. All methods are thread-safe.
+    """
+    
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        """
+        Args:
+            capacity: Number of calls kept - agent totals and rollups
+                count every call regardless
+        """
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self._ring: List[Optional[_StoredCall]] = [None] * capacity
+        self._next_seq = 0
+        self._by_id: Dict[str, int] = {}  # call_id -> seq
+        self._agents: Dict[str, _AgentTotals] = {}
+        self._rollups = RollupBatch()
+        self._watermarks: Dict[str, int] = {}  # name -> last exported seq
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        """Calls currently held"""
+        with self._lock:
+            return len(self._by_id)
+    
+    def register_agent(self, name: str, tags: List[str]):
+        with self._lock:
+            agent = self._agents.get(name)
+            if agent is None:
+                self._agents[name] = _AgentTotals(list(tags or ()))
+            else:
+                agent.tags = list(tags or ())
+    
+    def log_calls(self, calls: List[Dict[str, Any]]):
+        """
+        Log a batch of agent calls
+        
+        Each item takes the same keys as log_call(); see
+        StorageBackend.log_calls().
+        """
+        if not calls:
+            return
+        
+        for record in calls:
+            if "tags" in record:
+                self.register_agent(record["agent_name"], record["tags"])
+        
+        with self._lock:
+            for record in calls:
+                agent_name = record["agent_name"]
+                status = record["status"]
+                duration_ms = record["duration_ms"]
+                cost = record["cost"]
+                called_at = record["timestamp"] or datetime.utcnow()
+                
+                if record.get("sampled", True):
+                    self._append(_StoredCall(
+                        self._next_seq,
+                        record["call_id"],
+                        agent_name,
+                        status,
+                        duration_ms,
+                        cost,
+                        called_at,
+                        record["error"],
+                        record.get("trace_id"),
+                        record.get("span_id"),
+                        record.get("parent_span_id"),
+                        record["input_data"],
+                        record["output_data"]
+                    ))
+                
+                agent = self._agents.get(agent_name)
+                if agent is None:
+                    agent = self._agents[agent_name] = _AgentTotals([])
+                agent.add(status, duration_ms, cost, called_at)
+                self._rollups.add(agent_name, called_at, status, duration_ms, cost)
+    
+    def _append(self, call: _StoredCall):
+        """Put call in its slot, evicting what was there (lock held)"""
+        slot = call.seq % self.capacity
+        evicted = self._ring[slot]
+        if evicted is not None and self._by_id.get(evicted.call_id) == evicted.seq:
+            del self._by_id[evicted.call_id]
+        self._ring[slot] = call
+        self._by_id[call.call_id] = call.seq
+        self._next_seq += 1
+    
+    def _newest_first(self) -> Iterator[_StoredCall]:
+        """Calls in the ring, most recently logged first (lock held)"""
+        ring, capacity = self._ring, self.capacity
+        for seq in range(self._next_seq - 1, max(self._next_seq - capacity, 0) - 1, -1):
+            call = ring[seq % capacity]
+            if call is not None:
+                yield call
+    
+    def get_stats(self, agent_name: Optional[str] = None) -> Dict[str, Any]:
+        """Get statistics"""
+        with self._lock:
+            if agent_name:
+                agent = self._agents.get(agent_name)
+                if agent is None:
+                    return {}
+                
+                return {
+                    "name": agent_name,
+                    "total_calls": agent.total_calls,
+                    "total_cost": agent.total_cost,
+                    "total_errors": agent.total_errors,
+                    "avg_duration_ms": agent.avg_duration_ms,
+                    "min_duration_ms": agent.min_duration_ms,
+                    "max_duration_ms": agent.max_duration_ms,
+                    "latency_percentiles": agent.sketch.percentiles(),
+                    "error_rate": agent.total_errors / agent.total_calls if agent.total_calls > 0 else 0,
+                    "last_called_at": agent.last_called_at.isoformat() if agent.last_called_at else None
+                }
+            
+            agents = self._agents.items()
+            return {
+                "total_agents": len(agents),
+                "total_calls": sum(a.total_calls for _, a in agents),
+                "total_cost": sum(a.total_cost for _, a in agents),
+                "agents": [
+                    {
+                        "name": name,
+                        "total_calls": a.total_calls,
+                        "total_cost": a.total_cost,
+                        "avg_duration_ms": a.avg_duration_ms,
+                        "latency_percentiles": a.sketch.percentiles()
+                    }
+                    for name, a in agents
+                ]
+            }
+    
+    def list_agents(self) -> List[Dict[str, Any]]:
+        """List all agents"""
+        with self._lock:
+            return [
+                {
+                    "name": name,
+                    "tags": a.tags,
+                    "total_calls": a.total_calls,
+                    "total_cost": a.total_cost,
+                    "total_errors": a.total_errors,
+                    "avg_duration_ms": a.avg_duration_ms,
+                    "min_duration_ms": a.min_duration_ms,
+                    "max_duration_ms": a.max_duration_ms,
+                    "latency_percentiles": a.sketch.percentiles(),
+                    "last_called_at": a.last_called_at.isoformat() if a.last_called_at else None
+                }
+                for name, a in self._agents.items()
+            ]
+    
+    def _rollup_rows(
+        self,
+        resolution: str,
+        agent_name: Optional[str],
+        since: Optional[datetime],
+        until: Optional[datetime]
+    ) -> List[Dict[str, Any]]:
+        first = bucket_start(since, resolution) if since is not None else None
+        with self._lock:
+            rows = [
+                {
+                    "agent_name": name,
+                    "bucket_start": start.isoformat(),
+                    "calls": b[0],
+                    "errors": b[1],
+                    "cost": b[2],
+                    "sum_duration_ms": b[3],
+                    "min_duration_ms": b[4],
+                    "max_duration_ms": b[5],
+                    "histogram": list(b[6]),
+                    "latency_sketch": b[7].to_bytes()
+                }
+                for (res, start, name), b in self._rollups.buckets.items()
+                if res == resolution
+                and (first is None or start >= first)
+                and (until is None or start < until)
+                and (not agent_name or name == agent_name)
+            ]
+        rows.sort(key=lambda r: (r["bucket_start"], r["agent_name"]))
+        return rows
+    
+    def get_calls_page(
+        self,
+        agent_name: Optional[str] = None,
+        limit: int = 100,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        status: Optional[str] = None,
+        min_duration_ms: Optional[float] = None,
+        max_duration_ms: Optional[float] = None,
+        min_cost: Optional[float] = None,
+        tags: Optional[List[str]] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        One page of calls, newest first
+        
+        Same arguments and cursors as Storage.get_calls_page(). Each page
+        scans the ring once and keeps the newest limit + 1 matches.
+        """
+        check_limit(limit)
+        after = decode_cursor(cursor) if cursor else None
+        
+        with self._lock:
+            agent_names = None
+            if tags:
+                wanted = set(tags)
+                agent_names = {
+                    name for name, a in self._agents.items() if wanted <= set(a.tags or ())
+                }
+                if agent_name is not None:
+                    agent_names &= {agent_name}
+                if not agent_names:
+                    return {"calls": [], "next_cursor": None}
+            elif agent_name is not None:
+                agent_names = {agent_name}
+            
+            matches = (
+                c for c in self._newest_first()
+                if (agent_names is None or c.agent_name in agent_names)
+                and (status is None or c.status == status)
+                and (since is None or c.timestamp >= since)
+                and (until is None or c.timestamp < until)
+                and (min_duration_ms is None or c.duration_ms >= min_duration_ms)
+                and (max_duration_ms is None or c.duration_ms <= max_duration_ms)
+                and (min_cost is None or c.cost >= min_cost)
+                and (after is None or (c.timestamp, c.seq) < after)
+            )
+            # One extra call tells us whether there is a next page
+            calls = heapq.nlargest(limit + 1, matches, key=lambda c: (c.timestamp, c.seq))
+        
+        next_cursor = None
+        if len(calls) > limit:
+            calls = calls[:limit]
+            next_cursor = encode_cursor(calls[-1].timestamp, calls[-1].seq)
+        
+        return {"calls": [_summary(c) for c in calls], "next_cursor": next_cursor}
+    
+    def get_call(self, call_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get one call with its input and output data
+        
+        Returns:
+            The call, or None if it doesn't exist, wasn't sampled or has
+            been evicted
+        """
+        with self._lock:
+            seq = self._by_id.get(call_id)
+            if seq is None:
+                return None
+            c = self._ring[seq % self.capacity]
+        
+        return {
+            "call_id": c.call_id,
+            "agent_name": c.agent_name,
+            "input_data": c.input_data,
+            "output_data": c.output_data,
+            "status": c.status,
+            "duration_ms": c.duration_ms,
+            "cost": c.cost,
+            "timestamp": c.timestamp.isoformat(),
+            "error": c.error,
+            "trace_id": c.trace_id,
+            "span_id": c.span_id,
+            "parent_span_id": c.parent_span_id
+        }
+    
+    def get_trace(self, trace_id: str) -> List[Dict[str, Any]]:
+        """Get every span of a trace, oldest first"""
+        with self._lock:
+            calls = [c for c in self._newest_first() if c.trace_id == trace_id]
+        calls.sort(key=lambda c: (c.timestamp, c.seq))
+        
+        return [
+            {
+                "call_id": c.call_id,
+                "agent_name": c.agent_name,
+                "trace_id": c.trace_id,
+                "span_id": c.span_id,
+                "parent_span_id": c.parent_span_id,
+                "status": c.status,
+                "duration_ms": c.duration_ms,
+                "cost": c.cost,
+                "timestamp": c.timestamp.isoformat(),
+                "error": c.error
+            }
+            for c in calls
+        ]
+    
+    def compact(self, retention: Any = None, **options: Any) -> Dict[str, Any]:
+        """
+        Delete expired calls and rollups
+        
+        Same retention rules as Storage.compact(); its chunking and vacuum
+        options don't apply and are ignored.
+        
+        Returns:
+            Same keys as Storage.compact() - sizes are always 0
+        """
+        from ..retention import RetentionPolicy
+        
+        cutoffs = (retention or RetentionPolicy()).cutoffs()
+        started = time.perf_counter()
+        
+        def expired(call: _StoredCall) -> bool:
+            # Per-agent TTLs override the default, including with None
+            cutoff = cutoffs["agents"].get(call.agent_name, cutoffs["calls"])
+            return cutoff is not None and call.timestamp < cutoff
+        
+        with self._lock:
+            calls_deleted = 0
+            for call in list(self._newest_first()):
+                if expired(call):
+                    self._ring[call.seq % self.capacity] = None
+                    if self._by_id.get(call.call_id) == call.seq:
+                        del self._by_id[call.call_id]
+                    calls_deleted += 1
+            
+            buckets = self._rollups.buckets
+            stale = [
+                key for key in buckets
+                if cutoffs["rollups"].get(key[0]) is not None
+                and key[1] < cutoffs["rollups"][key[0]]
+            ]
+            for key in stale:
+                del buckets[key]
+        
+        return {
+            "calls_deleted": calls_deleted,
+            "payloads_deleted": 0,
+            "rollups_deleted": len(stale),
+            "size_before": 0,
+            "size_after": 0,
+            "reclaimed_bytes": 0,
+            "vacuum": "skipped",
+            "duration_s": round(time.perf_counter() - started, 3)
+        }
+    
+    def iter_calls(
+        self,
+        agent_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        payloads: bool = True,
+        chunk_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Every matching call, oldest first
+        
+        The matching calls are picked in one pass when iteration starts;
+        chunk_size is accepted for compatibility and has no effect.
+        """
+        with self._lock:
+            calls = [
+                c for c in self._newest_first()
+                if (agent_name is None or c.agent_name == agent_name)
+                and (since is None or c.timestamp >= since)
+                and (until is None or c.timestamp < until)
+            ]
+        calls.sort(key=lambda c: (c.timestamp, c.seq))
+        
+        for c in calls:
+            call = _summary(c)
+            if payloads:
+                call["input_data"] = c.input_data
+                call["output_data"] = c.output_data
+            yield call
+    
+    def _iter_calls(
+        self,
+        payloads: bool,
+        chunk_size: int,
+        seq_range: Optional[Tuple[int, int]] = None,
+        **selection: Any
+    ) -> Iterator[Dict[str, Any]]:
+        """iter_calls() of a selection, or the calls with after < seq <= upto in log order"""
+        if seq_range is None:
+            return super()._iter_calls(payloads, chunk_size, **selection)
+        
+        after, upto = seq_range
+        with self._lock:
+            calls = [c for c in self._newest_first() if after < c.seq <= upto]
+        calls.reverse()
+        return (
+            dict(_summary(c), input_data=c.input_data, output_data=c.output_data)
+            if payloads else _summary(c)
+            for c in calls
+        )
+    
+    def export_since_watermark(
+        self,
+        name: str,
+        filename: str,
+        format: str = "jsonl",
+        compression: Optional[str] = None,
+        chunk_size: Optional[int] = None
+    ) -> int:
+        """
+        Export only the calls logged since the last export under name
+        
+        Same arguments as Storage.export_since_watermark(). Watermarks
+        live as long as the backend does, and calls evicted from the ring
+        before an export are never exported.
+        
+        Returns:
+            Number of calls exported
+        """
+        check_format(format)
+        with self._lock:
+            after = self._watermarks.get(name, -1)
+            upto = self._next_seq - 1
+        if upto <= after:
+            return 0
+        
+        exported = self._export(filename, format, compression, chunk_size, seq_range=(after, upto))
+        with self._lock:
+            self._watermarks[name] = upto
+        return exported
@@ -0,0 +1,748 @@
+"""
+Segment log backend - calls appended to binary segment files and folded
+into SQLite in the background
+
+Logging a call is one buffered append to a file; there is no SQLite
+transaction on the call path. Each writer (backend instance) owns a
+directory of numbered segment files, rotated at segment_bytes, and fsyncs
+them in batches every sync_interval. A background thread folds what has
+been written into the SQLite store - calls, payloads, agent totals and
+rollups - in large transactions, recording how far it got in the same
+transaction so a crash never folds a call twice. Folded segments are
+deleted once sealed; folding never rotates the current one.
+
+get_calls(), get_call() and get_trace() also read the segments that
+haven't been folded yet, through mmap, so new calls show up immediately.
+Totals, rollups and exports come from SQLite and trail by up to
+fold_interval; fold() brings them up to date.
+
+Records are length-prefixed and checksummed:
+    
+    frame:  <u32 body length> <u32 crc32 of body> <body>
+    body:   <i64 timestamp, us since 1970> <f64 duration_ms> <f64 cost>
+            <u8 flags> then call_id, agent_name, status, error, trace_id,
+            span_id, parent_span_id, input_data, output_data, each
+            <u32 length> <utf-8 bytes> (0xFFFFFFFF = None; payloads as JSON)
+
+A torn frame at the end of a segment (a crash mid-write) fails its
+checksum and is skipped.
+"""
+
+import atexit
+import bisect
+import heapq
+import json
+import logging
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ..profiles import DEFAULT_PROFILE
+from .base import StorageBackend, check_limit, decode_cursor, encode_cursor
+
+try:
+    import fcntl
+except ImportError:
+    # No flock (Windows): segments left by a crashed writer aren't picked
+    # up by other writers
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+DEFAULT_SYNC_INTERVAL = 0.05
+DEFAULT_FOLD_INTERVAL = 1.0
+
+# Calls per SQLite transaction when folding
+FOLD_BATCH = 5000
+
+_FRAME = struct.Struct("<II")
+_FIXED = struct.Struct("<qddB")
+_LENGTH = struct.Struct("<I")
+_NONE = 0xFFFFFFFF
+_SAMPLED = 1
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+_TEXT_FIELDS = (
+    "call_id", "agent_name", "status", "error", "trace_id", "span_id", "parent_span_id"
+)
+
+# Payloads as compact JSON - anything else is stored as its str(), like the payloads table
+_json = json.JSONEncoder(separators=(",", ":"), default=str)
+
+_UPSERT_CHECKPOINT = (
+    "INSERT INTO segment_checkpoints (writer, segment, position) VALUES (?, ?, ?) "
+    "ON CONFLICT (writer) DO UPDATE SET "
+    "segment = excluded.segment, position = excluded.position"
+)
+
+
+def _pack_text(value: Optional[str]) -> bytes:
+    if value is None:
+        return _LENGTH.pack(_NONE)
+    data = value.encode()
+    return _LENGTH.pack(len(data)) + data
+
+
+def encode_record(record: Dict[str, Any]) -> bytes:
+    """One log_calls() item as a segment frame"""
+    timestamp = record["timestamp"] or datetime.utcnow()
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    parts = [_FIXED.pack(
+        (timestamp - _EPOCH) // _MICROSECOND,
+        record["duration_ms"],
+        record["cost"],
+        _SAMPLED if record.get("sampled", True) else 0
+    )]
+    for field in _TEXT_FIELDS:
+        parts.append(_pack_text(record.get(field)))
+    for field in ("input_data", "output_data"):
+        data = record[field]
+        parts.append(_pack_text(None if data is None else _json.encode(data)))
+    
+    body = b"".join(parts)
+    return _FRAME.pack(len(body), zlib.crc32(body)) + body
+
+
+def _decode_body(body: bytes) -> Dict[str, Any]:
+    timestamp_us, duration_ms, cost, flags = _FIXED.unpack_from(body)
+    record = {
+        "timestamp": _EPOCH + timedelta(microseconds=timestamp_us),
+        # Whole numbers come back as ints, like from SQLite's INTEGER column
+        "duration_ms": int(duration_ms) if duration_ms.is_integer() else duration_ms,
+        "cost": cost,
+        "sampled": bool(flags & _SAMPLED)
+    }
+    position = _FIXED.size
+    for field in _TEXT_FIELDS + ("input_json", "output_json"):
+        (length,) = _LENGTH.unpack_from(body, position)
+        position += _LENGTH.size
+        if length == _NONE:
+            record[field] = None
+        else:
+            record[field] = body[position:position + length].decode()
+            position += length
+    return record
+
+
+def iter_records(buffer: Any, start: int = 0) -> Iterator[Tuple[int, int, Dict[str, Any]]]:
+    """
+    Records of a segment (bytes or mmap) from offset start
+    
+    Stops at the first incomplete or corrupt frame.
+    
+    Yields:
+        (offset, offset of the next record, record) - payloads are left
+        as JSON text under "input_json"/"output_json"
+    """
+    end = len(buffer)
+    offset = start
+    while offset + _FRAME.size <= end:
+        length, crc = _FRAME.unpack_from(buffer, offset)
+        body_end = offset + _FRAME.size + length
+        if body_end > end:
+            return
+        body = buffer[offset + _FRAME.size:body_end]
+        if zlib.crc32(body) != crc:
+            return
+        yield offset, body_end, _decode_body(body)
+        offset = body_end
+
+
+def _log_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """A decoded record as a Storage.log_calls() item"""
+    item = {field: record[field] for field in _TEXT_FIELDS}
+    item.update(
+        timestamp=record["timestamp"],
+        duration_ms=record["duration_ms"],
+        cost=record["cost"],
+        sampled=record["sampled"],
+        input_data=None if record["input_json"] is None else json.loads(record["input_json"]),
+        output_data=None if record["output_json"] is None else json.loads(record["output_json"])
+    )
+    return item
+
+
+def _segments(directory: str) -> List[Tuple[int, str]]:
+    """(number, path) of a writer's segment files, oldest first"""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return sorted(
+        (int(name[:-4]), os.path.join(directory, name))
+        for name in names
+        if name.endswith(".seg")
+    )
+
+
+def _write_all(fd: int, data: bytes):
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+class SegmentLogBackend(StorageBackend):
+    """
+    Log-structured storage backend for very high call rates
+    
+    Usage:
+        watch = Watch(backend="segments")
+        
+        backend = SegmentLogBackend("argus.db", sync_interval=0.2)
+        watch = Watch(backend=backend)
+    
+    Any number of processes can share one database and log_dir: each has
+    its own segment directory, locked while it runs. Segments left by a
+    writer that died are folded by whichever writer notices first.
+    """
+    
+    def __init__(
+        self,
+        db_path: str = "argus.db",
+        profile: str = DEFAULT_PROFILE,
+        partition: Optional[str] = None,
+        log_dir: Optional[str] = None,
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        sync_interval: Optional[float] = DEFAULT_SYNC_INTERVAL,
+        fold_interval: float = DEFAULT_FOLD_INTERVAL
+    ):
+        """
+        Args:
+            db_path: SQLite database segments are folded into
+            profile: Its pragma profile (see argus.profiles)
+            partition: Its partitioning, "day" or "hour" (optional)
+            log_dir: Where segments are written (default: <db name>_segments
+                next to the database)
+            segment_bytes: Start a new segment once one reaches this size
+            sync_interval: Seconds between fsyncs of the current segment -
+                a crash loses at most this much. 0 fsyncs every write;
+                None leaves it to the OS.
+            fold_interval: Seconds between folds into SQLite
+        """
+        if partition:
+            from ..storage import PartitionedStorage
+            self.store = PartitionedStorage(db_path, profile=profile, partition=partition)
+        else:
+            from ..storage import Storage
+            self.store = Storage(db_path, profile=profile)
+        
+        self.log_dir = log_dir or os.path.splitext(db_path)[0] + "_segments"
+        self.segment_bytes = segment_bytes
+        self.sync_interval = sync_interval
+        self.fold_interval = fold_interval
+        
+        # Set up under a temporary name, so other writers never see this
+        # directory unlocked
+        self._writer = f"{os.getpid()}-{os.urandom(4).hex()}"
+        staging = os.path.join(self.log_dir, self._writer + ".new")
+        os.makedirs(staging)
+        self._lock_fd = os.open(os.path.join(staging, "LOCK"), os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        self._dir = os.path.join(self.log_dir, self._writer)
+        os.rename(staging, self._dir)
+        
+        self._write_lock = threading.Lock()
+        self._fold_lock = threading.Lock()
+        self._tail_lock = threading.Lock()
+        self._close_lock = threading.Lock()
+        self._closed = False
+        self._unsynced = False
+        self._active = 0
+        self._active_size = 0
+        self._fd = self._open_segment(0)
+        # Segment path -> (bytes decoded, offsets, records) of the sampled
+        # records past the checkpoint - nothing already folded is kept
+        self._tail_cache: Dict[str, Tuple[int, List[int], List[Dict[str, Any]]]] = {}
+        
+        self._stop = threading.Event()
+        self._threads = [threading.Thread(
+            target=self._run_folds, name="argus-segment-fold", daemon=True
+        )]
+        if sync_interval:
+            self._threads.append(threading.Thread(
+                target=self._run_syncs, name="argus-segment-sync", daemon=True
+            ))
+        for thread in self._threads:
+            thread.start()
+        atexit.register(self.close)
+    
+    # Writing
+    
+    def _open_segment(self, number: int) -> int:
+        return os.open(
+            os.path.join(self._dir, f"{number:010d}.seg"),
+            os.O_WRONLY | os.O_CREAT | os.O_APPEND,
+            0o644
+        )
+    
+    def log_calls(self, calls: List[Dict[str, Any]]):
+        """
+        Append a batch of calls to the current segment
+        
+        Items take the same keys as Storage.log_calls(). Agents with "tags"
+        are registered in SQLite right away.
+        """
+        if not calls:
+            return
+        
+        for record in calls:
+            if "tags" in record:
+                self.store.register_agent(record["agent_name"], record["tags"])
+        
+        data = b"".join([encode_record(record) for record in calls])
+        with self._write_lock:
+            if self._closed:
+                # Nothing left to fold it - write it through
+                self.store.log_calls(calls)
+                return
+            _write_all(self._fd, data)
+            self._active_size += len(data)
+            if self.sync_interval == 0:
+                os.fsync(self._fd)
+            else:
+                self._unsynced = True
+            if self._active_size >= self.segment_bytes:
+                self._rotate()
+    
+    def _rotate(self):
+        """Seal the current segment and start the next one (write lock held)"""
+        if self.sync_interval is not None:
+            os.fsync(self._fd)
+        os.close(self._fd)
+        self._active += 1
+        self._active_size = 0
+        self._unsynced = False
+        self._fd = self._open_segment(self._active)
+    
+    def _run_syncs(self):
+        while not self._stop.wait(self.sync_interval):
+            with self._write_lock:
+                if self._unsynced and not self._closed:
+                    os.fsync(self._fd)
+                    self._unsynced = False
+    
+    # Folding
+    
+    def _run_folds(self):
+        while True:
+            try:
+                self.fold()
+            except Exception:
+                # Never let a bad fold kill the thread - it's retried next time
+                logger.exception("Argus: failed to fold segments into %s", self.store.db_path)
+            if self._stop.wait(self.fold_interval):
+                return
+    
+    def fold(self) -> int:
+        """
+        Fold every call logged so far into SQLite, and segments of dead writers
+        
+        Returns:
+            Number of calls folded
+        """
+        with self._fold_lock:
+            with self._write_lock:
+                # Appends are whole frames, so this is a record boundary
+                active = None if self._closed else (self._active, self._active_size)
+            return self._fold_writer(self._writer, self._dir, active) + self._fold_orphans()
+    
+    def _checkpoints(self) -> Dict[str, Tuple[int, int]]:
+        """writer -> (segment, position) folded up to"""
+        with self.store.engine.connect() as conn:
+            return {
+                writer: (segment, position)
+                for writer, segment, position in conn.exec_driver_sql(
+                    "SELECT writer, segment, position FROM segment_checkpoints"
+                )
+            }
+    
+    def _fold_writer(
+        self,
+        writer: str,
+        directory: str,
+        active: Optional[Tuple[int, int]] = None
+    ) -> int:
+        """
+        Fold a writer's segments, deleting them
+        
+        active is the (number, size) of the segment still being written:
+        it's folded up to size and kept, and anything after it is left
+        for the next fold. By default every segment is sealed.
+        """
+        segment, position = self._checkpoints().get(writer, (-1, 0))
+        folded = 0
+        for number, path in _segments(directory):
+            if active is not None and number > active[0]:
+                break
+            end = active[1] if active is not None and number == active[0] else None
+            if number >= segment:
+                start = position if number == segment else 0
+                folded += self._fold_segment(writer, number, path, start, end)
+            with self._tail_lock:
+                if end is None:
+                    os.remove(path)
+                    self._tail_cache.pop(path, None)
+                elif path in self._tail_cache:
+                    self._tail_cache[path] = _trimmed(self._tail_cache[path], end)
+        return folded
+    
+    def _fold_segment(
+        self,
+        writer: str,
+        number: int,
+        path: str,
+        start: int,
+        end: Optional[int] = None
+    ) -> int:
+        """Fold a segment from offset start, up to offset end (the whole file by default)"""
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size if end is None else end
+            if size <= start:
+                return 0
+            with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as buffer:
+                folded = 0
+                batch, ends = [], []
+                position = start
+                for _, position, record in iter_records(buffer, start):
+                    batch.append(_log_record(record))
+                    ends.append(position)
+                    if len(batch) == FOLD_BATCH:
+                        folded += self._commit(writer, number, batch, ends)
+                        batch, ends = [], []
+                if batch:
+                    folded += self._commit(writer, number, batch, ends)
+        
+        if position < size:
+            logger.warning(
+                "Argus: skipped %d unreadable bytes at the end of %s", size - position, path
+            )
+        return folded
+    
+    def _commit(self, writer: str, number: int, batch: List[Dict[str, Any]], ends: List[int]) -> int:
+        """Write a batch and move the writer's checkpoint past it, atomically"""
+        try:
+            self.store._log_calls(
+                batch, [(_UPSERT_CHECKPOINT, (writer, number, ends[-1]))], replay=True
+            )
+            return len(batch)
+        except sqlite3.IntegrityError:
+            if len(batch) == 1:
+                # A call_id that's already stored - skip it, or it blocks everything after it
+                logger.warning("Argus: skipped duplicate call %s", batch[0]["call_id"])
+                with self.store.engine.begin() as conn:
+                    conn.exec_driver_sql(_UPSERT_CHECKPOINT, (writer, number, ends[0]))
+                return 0
+        return sum(self._commit(writer, number, [item], [end]) for item, end in zip(batch, ends))
+    
+    def _fold_orphans(self) -> int:
+        """Fold and remove the segments of writers that are no longer running"""
+        if fcntl is None:
+            return 0
+        
+        folded = 0
+        for name in os.listdir(self.log_dir):
+            directory = os.path.join(self.log_dir, name)
+            if name == self._writer or not os.path.isdir(directory):
+                continue
+            try:
+                fd = os.open(os.path.join(directory, "LOCK"), os.O_RDWR)
+            except FileNotFoundError:
+                continue
+            try:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    continue  # Still running
+                folded += self._fold_writer(name, directory)
+                self._remove_writer(name, directory)
+            finally:
+                os.close(fd)
+        return folded
+    
+    def _remove_writer(self, writer: str, directory: str):
+        """Forget a writer whose segments have all been folded"""
+        with self.store.engine.begin() as conn:
+            conn.exec_driver_sql("DELETE FROM segment_checkpoints WHERE writer = ?", (writer,))
+        try:
+            os.remove(os.path.join(directory, "LOCK"))
+            os.rmdir(directory)
+        except OSError:
+            pass
+    
+    def close(self, timeout: Optional[float] = 10.0):
+        """Fold everything into SQLite and remove this writer's segments"""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._stop.set()
+            for thread in self._threads:
+                thread.join(timeout)
+            
+            with self._fold_lock:
+                with self._write_lock:
+                    self._closed = True
+                    if self.sync_interval is not None:
+                        os.fsync(self._fd)
+                    os.close(self._fd)
+                self._fold_writer(self._writer, self._dir)
+            self._remove_writer(self._writer, self._dir)
+            os.close(self._lock_fd)
+        
+        try:
+            atexit.unregister(self.close)
+        except Exception:
+            pass
+    
+    # Reading
+    
+    def _tail(self) -> List[Dict[str, Any]]:
+        """
+        Calls in segments that haven't been folded yet, every writer's
+        
+        Read before querying SQLite: a call folded in between then shows up
+        in both (callers drop the copy) rather than in neither.
+        """
+        with self._tail_lock:
+            checkpoints = self._checkpoints()
+            calls = []
+            seen = set()
+            try:
+                writers = sorted(os.listdir(self.log_dir))
+            except FileNotFoundError:
+                writers = []
+            for writer in writers:
+                segment, position = checkpoints.get(writer, (-1, 0))
+                for number, path in _segments(os.path.join(self.log_dir, writer)):
+                    if number < segment:
+                        continue
+                    seen.add(path)
+                    calls.extend(self._read_segment(path, position if number == segment else 0))
+            
+            for path in set(self._tail_cache) - seen:
+                self._tail_cache.pop(path, None)
+            return calls
+    
+    def _read_segment(self, path: str, start: int) -> List[Dict[str, Any]]:
+        """
+        Sampled records of a segment from offset start (tail lock held)
+        
+        Only records past what's cached are decoded, and decoding starts at
+        start - the checkpoint - rather than at the top of the segment.
+        """
+        decoded, offsets, records = _trimmed(self._tail_cache.get(path, (start, [], [])), start)
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size > decoded:
+                    offsets, records = list(offsets), list(records)
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                        for offset, decoded, record in iter_records(buffer, decoded):
+                            if record["sampled"]:
+                                offsets.append(offset)
+                                records.append(record)
+        except FileNotFoundError:
+            # Folded and deleted since it was listed - SQLite has it now
+            return []
+        self._tail_cache[path] = (decoded, offsets, records)
+        return records
+    
+    def get_calls_page(
+        self,
+        agent_name: Optional[str] = None,
+        limit: int = 100,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        status: Optional[str] = None,
+        min_duration_ms: Optional[float] = None,
+        max_duration_ms: Optional[float] = None,
+        min_cost: Optional[float] = None,
+        tags: Optional[List[str]] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        One page of calls, newest first, including calls not folded yet
+        
+        Same arguments as Storage.get_calls_page(). Calls with the same
+        timestamp are ordered by call_id, which a call keeps when it's
+        folded, so pages never repeat or skip a call folded in between.
+        """
+        from ..storage import _call_summary
+        
+        check_limit(limit)
+        after = decode_cursor(cursor, str) if cursor else None
+        agent_names = None
+        if tags:
+            agent_names = set(self.store._agents_tagged(tags))
+            if agent_name is not None:
+                agent_names &= {agent_name}
+        elif agent_name is not None:
+            agent_names = {agent_name}
+        
+        tail = (
+            r for r in self._tail()
+            if (agent_names is None or r["agent_name"] in agent_names)
+            and (status is None or r["status"] == status)
+            and (since is None or r["timestamp"] >= since)
+            and (until is None or r["timestamp"] < until)
+            and (min_duration_ms is None or r["duration_ms"] >= min_duration_ms)
+            and (max_duration_ms is None or r["duration_ms"] <= max_duration_ms)
+            and (min_cost is None or r["cost"] >= min_cost)
+            and (after is None or (r["timestamp"], r["call_id"]) < after)
+        )
+        # One extra call tells us whether there is a next page
+        candidates = [
+            (r["timestamp"], r["call_id"], _summary(r))
+            for r in heapq.nlargest(limit + 1, tail, key=lambda r: (r["timestamp"], r["call_id"]))
+        ]
+        candidates.extend(
+            (c.timestamp, c.call_id, _call_summary(c))
+            for c in self.store._newest_calls(
+                limit + 1, after, agent_name=agent_name, since=since, until=until,
+                status=status, min_duration_ms=min_duration_ms,
+                max_duration_ms=max_duration_ms, min_cost=min_cost, tags=tags,
+                by_call_id=True
+            )
+        )
+        candidates.sort(key=lambda c: (c[0], c[1]), reverse=True)
+        
+        calls, keys, seen = [], [], set()
+        for timestamp, call_id, call in candidates:
+            if call_id not in seen:
+                seen.add(call_id)
+                calls.append(call)
+                keys.append((timestamp, call_id))
+        
+        next_cursor = None
+        if len(calls) > limit:
+            calls = calls[:limit]
+            next_cursor = encode_cursor(*keys[limit - 1])
+        
+        return {"calls": calls, "next_cursor": next_cursor}
+    
+    def get_call(self, call_id: str) -> Optional[Dict[str, Any]]:
+        """Get one call with its input and output data, folded or not"""
+        for r in self._tail():
+            if r["call_id"] == call_id:
+                item = _log_record(r)
+                call = _summary(r)
+                call["input_data"] = item["input_data"]
+                call["output_data"] = item["output_data"]
+                return call
+        return self.store.get_call(call_id)
+    
+    def get_trace(self, trace_id: str) -> List[Dict[str, Any]]:
+        """Get every span of a trace, oldest first, folded or not"""
+        tail = [r for r in self._tail() if r["trace_id"] == trace_id]
+        spans = self.store.get_trace(trace_id)
+        stored = {span["call_id"] for span in spans}
+        for r in sorted(tail, key=lambda r: (r["timestamp"], r["call_id"])):
+            if r["call_id"] not in stored:
+                spans.append({
+                    "call_id": r["call_id"],
+                    "agent_name": r["agent_name"],
+                    "trace_id": r["trace_id"],
+                    "span_id": r["span_id"],
+                    "parent_span_id": r["parent_span_id"],
+                    "status": r["status"],
+                    "duration_ms": r["duration_ms"],
+                    "cost": r["cost"],
+                    "timestamp": r["timestamp"].isoformat(),
+                    "error": r["error"]
+                })
+        spans.sort(key=lambda span: span["timestamp"])
+        return spans
+    
+    # Everything else is answered by SQLite
+    
+    def register_agent(self, name: str, tags: List[str]):
+        self.store.register_agent(name, tags)
+    
+    def clear_agent_cache(self):
+        self.store.clear_agent_cache()
+    
+    def get_stats(self, agent_name: Optional[str] = None) -> Dict[str, Any]:
+        """Get statistics (as of the last fold)"""
+        return self.store.get_stats(agent_name)
+    
+    def list_agents(self) -> List[Dict[str, Any]]:
+        """List all agents (totals as of the last fold)"""
+        return self.store.list_agents()
+    
+    def _rollup_rows(
+        self,
+        resolution: str,
+        agent_name: Optional[str],
+        since: Optional[datetime],
+        until: Optional[datetime]
+    ) -> List[Dict[str, Any]]:
+        return self.store._rollup_rows(resolution, agent_name, since, until)
+    
+    def compact(self, retention: Any = None, **options: Any) -> Dict[str, Any]:
+        """Fold, then Storage.compact() - same options and report"""
+        self.fold()
+        return self.store.compact(retention, **options)
+    
+    def iter_calls(
+        self,
+        agent_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        payloads: bool = True,
+        chunk_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """Every matching call, oldest first - folds first"""
+        self.fold()
+        return self.store.iter_calls(agent_name, since, until, payloads, chunk_size)
+    
+    def _iter_call_columns(
+        self,
+        payloads: bool,
+        chunk_size: int,
+        **selection: Any
+    ) -> Iterator[Dict[str, Sequence[Any]]]:
+        self.fold()
+        return self.store._iter_call_columns(payloads, chunk_size, **selection)
+    
+    def export_since_watermark(self, name: str, filename: str, *args: Any, **kwargs: Any) -> int:
+        """Fold, then Storage.export_since_watermark()"""
+        self.fold()
+        return self.store.export_since_watermark(name, filename, *args, **kwargs)
+
+
+def _trimmed(
+    cached: Tuple[int, List[int], List[Dict[str, Any]]],
+    start: int
+) -> Tuple[int, List[int], List[Dict[str, Any]]]:
+    """A _tail_cache entry without the records before offset start (folded)"""
+    decoded, offsets, records = cached
+    if decoded <= start:
+        return start, [], []
+    first = bisect.bisect_left(offsets, start)
+    if first:
+        return decoded, offsets[first:], records[first:]
+    return cached
+
+
+def _summary(r: Dict[str, Any]) -> Dict[str, Any]:
+    """A decoded record as get_calls() lists it"""
+    return {
+        "call_id": r["call_id"],
+        "agent_name": r["agent_name"],
+        "status": r["status"],
+        "duration_ms": r["duration_ms"],
+        "cost": r["cost"],
+        "timestamp": r["timestamp"].isoformat(),
+        "error": r["error"],
+        "trace_id": r["trace_id"],
+        "span_id": r["span_id"],
+        "parent_span_id": r["parent_span_id"]
+    }
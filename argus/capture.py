@@ -0,0 +1,259 @@
+"""
+Capture - bounded, lazy rendering of call arguments and results
+"""
+
+import enum
+import os
+import reprlib
+from itertools import islice
+from typing import Any, Dict, Optional
+
+
+CAPTURE_MODES = ("off", "bounded", "full")
+DEFAULT_LIMIT = 500
+
+# Modules whose types have short reprs whatever the value - rendered as usual
+_SMALL_REPR_MODULES = frozenset({
+    "builtins", "datetime", "decimal", "fractions", "uuid", "pathlib", "ipaddress"
+})
+
+
+class BoundedRepr(reprlib.Repr):
+    """
+    reprlib.Repr that never renders more than it has to
+
+    Containers stop after a handful of items, nesting stops after a few
+    levels and strings/bytes are sliced before being rendered, so the cost
+    depends on the budget, not on the size of the object. Plain reprlib
+    sorts whole dicts and renders bytes in full, and calls repr() on any
+    other object, however big - all overridden here. Objects of other types
+    are described (type plus len() or shape) instead of rendered;
+    namedtuples and dataclasses are rendered field by field.
+    """
+
+    def __init__(self, limit: int = DEFAULT_LIMIT):
+        super().__init__()
+        self.limit = limit
+        self.maxlevel = 4
+        self.maxtuple = 10
+        self.maxlist = 10
+        self.maxarray = 10
+        self.maxdict = 10
+        self.maxset = 10
+        self.maxfrozenset = 10
+        self.maxdeque = 10
+        self.maxstring = limit
+        self.maxlong = 64
+        self.maxother = limit
+
+    def repr_dict(self, x, level):
+        n = len(x)
+        if n == 0:
+            return "{}"
+        if level <= 0:
+            return "{...}"
+        newlevel = level - 1
+        pieces = [
+            f"{self.repr1(k, newlevel)}: {self.repr1(v, newlevel)}"
+            for k, v in islice(x.items(), self.maxdict)
+        ]
+        if n > self.maxdict:
+            pieces.append("...")
+        return "{" + ", ".join(pieces) + "}"
+
+    def repr_bytes(self, x, level):
+        s = repr(x[:self.maxstring])
+        if len(x) > self.maxstring:
+            s = s[:-1] + "..." + s[-1]
+        return s
+
+    repr_bytearray = repr_bytes
+
+    def repr_instance(self, x, level):
+        if (
+            type(x).__module__ in _SMALL_REPR_MODULES
+            or isinstance(x, (int, float, complex, BaseException, enum.Enum))
+        ):
+            return super().repr_instance(x, level)
+
+        fields = getattr(type(x), "_fields", None) if isinstance(x, tuple) else None
+        if fields is None:
+            fields = getattr(type(x), "__dataclass_fields__", None)
+        if fields is not None:
+            if level <= 0:
+                return f"{type(x).__name__}(...)"
+            pieces = [
+                f"{name}={self.repr1(getattr(x, name, None), level - 1)}"
+                for name in islice(fields, self.maxtuple)
+            ]
+            if len(fields) > self.maxtuple:
+                pieces.append("...")
+            return f"{type(x).__name__}({', '.join(pieces)})"
+
+        return _describe(x)
+
+
+def _describe(x: Any) -> str:
+    """<TypeName object, shape/len> - a repr that never renders the object"""
+    details = ""
+    try:
+        shape = getattr(x, "shape", None)
+        if isinstance(shape, tuple):
+            details = f", shape={shape}"
+        else:
+            details = f", len={len(x)}"
+    except Exception:
+        pass
+    return f"<{type(x).__qualname__} object{details}>"
+
+
+_reprs: Dict[int, BoundedRepr] = {}
+
+
+def bounded_repr(obj: Any, limit: int = DEFAULT_LIMIT) -> str:
+    """
+    Render obj in at most limit characters
+
+    Strings are returned as-is (sliced), everything else goes through
+    BoundedRepr. Matches what str(obj)[:limit] used to store for builtin
+    types, without rendering the whole object first.
+    """
+    if isinstance(obj, str):
+        return obj[:limit]
+
+    r = _reprs.get(limit)
+    if r is None:
+        r = _reprs[limit] = BoundedRepr(limit)
+    try:
+        return r.repr(obj)[:limit]
+    except Exception:
+        return f"<{type(obj).__name__} (unrepresentable)>"
+
+
+def _full_repr(obj: Any) -> str:
+    """Render obj in full the way bounded_repr() does, without the limit"""
+    return obj if isinstance(obj, str) else repr(obj)
+
+
+class Deferred:
+    """Captured data that is rendered only when the call is written"""
+
+    __slots__ = ("func", "args")
+
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+
+    def resolve(self) -> Dict[str, Any]:
+        return self.func(*self.args)
+
+
+def resolve_payloads(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Render any Deferred input/output data in a call record (in place)"""
+    for key in ("input_data", "output_data"):
+        value = record.get(key)
+        if isinstance(value, Deferred):
+            try:
+                record[key] = value.resolve()
+            except Exception as e:
+                record[key] = {"capture_error": str(e)}
+    return record
+
+
+class CapturePolicy:
+    """
+    How much of a call's arguments and result Argus keeps
+
+    Modes:
+        off: Nothing is captured
+        bounded: A bounded repr of up to limit characters (default)
+        full: Everything is kept - payloads larger than limit are written
+            to a file in spill_dir and the call stores a bounded preview
+            plus the file path
+
+    Output is rendered when the call is written. Input is too with
+    async_writes - an argument mutated before then is recorded as it is
+    then, so pass a copy to an agent if that matters. Otherwise it is
+    rendered (full mode: repr'd) as the call starts, since the write pays
+    for it right after anyway.
+    """
+
+    def __init__(
+        self,
+        mode: str = "bounded",
+        limit: int = DEFAULT_LIMIT,
+        spill_dir: Optional[str] = None
+    ):
+        if mode not in CAPTURE_MODES:
+            raise ValueError(
+                f"Unknown capture mode '{mode}', expected one of {CAPTURE_MODES}"
+            )
+        if mode == "full" and not spill_dir:
+            raise ValueError("capture mode 'full' needs a spill_dir")
+        self.mode = mode
+        self.limit = limit
+        self.spill_dir = spill_dir
+
+    def capture_input(
+        self,
+        call_id: str,
+        args: tuple,
+        kwargs: Dict[str, Any],
+        snapshot: bool = False
+    ) -> Any:
+        """
+        Input data for a call ({} when capture is off)
+
+        Deferred, unless snapshot is set - then the arguments are rendered
+        now, before the agent can mutate them. Full mode only takes the
+        reprs now and leaves spilling them to files for the write.
+        """
+        if self.mode == "off":
+            return {}
+        if not snapshot:
+            return Deferred(self.render_input, call_id, args, kwargs)
+        if self.mode == "full":
+            return Deferred(
+                self._spill_input, call_id, _full_repr(args),
+                {k: _full_repr(v) for k, v in kwargs.items()}
+            )
+        return self.render_input(call_id, args, kwargs)
+
+    def capture_output(self, call_id: str, result: Any) -> Any:
+        """Deferred output data for a call ({} when capture is off)"""
+        if self.mode == "off":
+            return {}
+        return Deferred(self.render_output, call_id, result)
+
+    def render_input(self, call_id: str, args: tuple, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        if self.mode == "full":
+            return self._spill_input(
+                call_id, _full_repr(args), {k: _full_repr(v) for k, v in kwargs.items()}
+            )
+        return {
+            "args": bounded_repr(args, self.limit),
+            "kwargs": {k: bounded_repr(v, self.limit) for k, v in kwargs.items()}
+        }
+
+    def _spill_input(self, call_id: str, args: str, kwargs: Dict[str, str]) -> Dict[str, Any]:
+        return {
+            "args": self._spill(call_id, "args", args),
+            "kwargs": {k: self._spill(call_id, f"kwarg-{k}", v) for k, v in kwargs.items()}
+        }
+
+    def render_output(self, call_id: str, result: Any) -> Dict[str, Any]:
+        if self.mode == "full":
+            return {"result": self._spill(call_id, "result", _full_repr(result))}
+        return {"result": bounded_repr(result, self.limit)}
+
+    def _spill(self, call_id: str, field: str, text: str) -> Any:
+        """Keep small payloads inline, write large ones to spill_dir"""
+        if len(text) <= self.limit:
+            return text
+
+        os.makedirs(self.spill_dir, exist_ok=True)
+        safe_field = "".join(c if c.isalnum() or c in "-_" else "_" for c in field)
+        path = os.path.join(self.spill_dir, f"{call_id}.{safe_field}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return {"preview": text[:self.limit], "size": len(text), "spill": path}
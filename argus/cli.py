@@ -5,7 +5,11 @@ Argus CLI - Command line interface
 
 import argparse
 import sys
-from argus import Watch
+from datetime import datetime
+from argus import Watch, RetentionPolicy
+from argus.export import COMPRESSIONS, EXPORT_FORMATS
+from argus.profiles import PROFILES, DEFAULT_PROFILE
+from argus.partitions import detect_partitioning
 
 
 def main():
@@ -29,6 +33,13 @@ def main():
         default="argus.db",
         help="Database path (default: argus.db)"
     )
+    dashboard_parser.add_argument(
+        "--profile",
+        type=str,
+        choices=list(PROFILES),
+        default=DEFAULT_PROFILE,
+        help=f"SQLite storage profile (default: {DEFAULT_PROFILE})"
+    )
     dashboard_parser.add_argument(
         "--debug",
         action="store_true",
@@ -48,6 +59,13 @@ def main():
         default="argus.db",
         help="Database path (default: argus.db)"
     )
+    stats_parser.add_argument(
+        "--profile",
+        type=str,
+        choices=list(PROFILES),
+        default=DEFAULT_PROFILE,
+        help=f"SQLite storage profile (default: {DEFAULT_PROFILE})"
+    )
     
     # List command
     list_parser = subparsers.add_parser("list", help="List all agents")
@@ -57,6 +75,13 @@ def main():
         default="argus.db",
         help="Database path (default: argus.db)"
     )
+    list_parser.add_argument(
+        "--profile",
+        type=str,
+        choices=list(PROFILES),
+        default=DEFAULT_PROFILE,
+        help=f"SQLite storage profile (default: {DEFAULT_PROFILE})"
+    )
     
     # Export command
     export_parser = subparsers.add_parser("export", help="Export data")
@@ -68,16 +93,108 @@ def main():
     export_parser.add_argument(
         "--format",
         type=str,
-        choices=["csv", "json"],
+        choices=list(EXPORT_FORMATS),
         default="csv",
         help="Export format (default: csv)"
     )
     export_parser.add_argument(
+        "--agent",
+        type=str,
+        help="Only export this agent's calls"
+    )
+    export_parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        help="Only calls at or after this UTC time (e.g. 2026-03-01T00:00)"
+    )
+    export_parser.add_argument(
+        "--until",
+        type=datetime.fromisoformat,
+        help="Only calls before this UTC time"
+    )
+    export_parser.add_argument(
+        "--compression",
+        type=str,
+        choices=list(COMPRESSIONS),
+        help="Compress the output (default: from the extension, .gz or .zst; "
+             "Parquet uses snappy)"
+    )
+    export_parser.add_argument(
+        "--since-watermark",
+        type=str,
+        metavar="NAME",
+        help="Only calls added since the last export under NAME, then move "
+             "NAME's watermark past them (for log shipping)"
+    )
+    export_parser.add_argument(
+        "--db",
+        type=str,
+        default="argus.db",
+        help="Database path (default: argus.db)"
+    )
+    export_parser.add_argument(
+        "--profile",
+        type=str,
+        choices=list(PROFILES),
+        default=DEFAULT_PROFILE,
+        help=f"SQLite storage profile (default: {DEFAULT_PROFILE})"
+    )
+    
+    # Compact command
+    compact_parser = subparsers.add_parser(
+        "compact",
+        help="Delete expired calls/rollups and reclaim disk space"
+    )
+    compact_parser.add_argument(
+        "--calls-ttl",
+        type=str,
+        default="30d",
+        help="Delete calls older than this, e.g. 7d, 12h, none (default: 30d)"
+    )
+    compact_parser.add_argument(
+        "--agent-ttl",
+        type=str,
+        action="append",
+        default=[],
+        metavar="AGENT=TTL",
+        help="Per-agent calls TTL, e.g. embedder=2d (repeatable)"
+    )
+    for resolution, default in [("minute", "2d"), ("hour", "90d"), ("day", "none")]:
+        compact_parser.add_argument(
+            f"--{resolution}-ttl",
+            type=str,
+            default=default,
+            help=f"Delete {resolution} rollups older than this (default: {default})"
+        )
+    compact_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=5000,
+        help="Rows deleted per transaction (default: 5000)"
+    )
+    compact_parser.add_argument(
+        "--no-vacuum",
+        action="store_true",
+        help="Don't return freed pages to the OS"
+    )
+    compact_parser.add_argument(
+        "--full-vacuum",
+        action="store_true",
+        help="Rebuild the database file (blocks writers while it runs)"
+    )
+    compact_parser.add_argument(
         "--db",
         type=str,
         default="argus.db",
         help="Database path (default: argus.db)"
     )
+    compact_parser.add_argument(
+        "--profile",
+        type=str,
+        choices=list(PROFILES),
+        default=DEFAULT_PROFILE,
+        help=f"SQLite storage profile (default: {DEFAULT_PROFILE})"
+    )
     
     args = parser.parse_args()
     
@@ -86,7 +203,11 @@ def main():
         sys.exit(1)
     
     # Initialize Watch
-    watch = Watch(db_path=args.db)
+    watch = Watch(
+        db_path=args.db,
+        profile=args.profile,
+        partition=detect_partitioning(args.db)
+    )
     
     # Execute command
     if args.command == "dashboard":
@@ -131,9 +252,64 @@ def main():
                 print(f"   Avg duration: {agent['avg_duration_ms']:.0f}ms")
                 print()
     
+    elif args.command == "compact":
+        def ttl(value):
+            return None if value.lower() in ("none", "never") else value
+        
+        agent_ttls = {}
+        for item in args.agent_ttl:
+            agent, sep, value = item.partition("=")
+            if not sep:
+                parser.error(f"--agent-ttl expects AGENT=TTL, got '{item}'")
+            agent_ttls[agent] = ttl(value)
+        
+        report = watch.compact(
+            RetentionPolicy(
+                calls_ttl=ttl(args.calls_ttl),
+                agent_ttls=agent_ttls,
+                rollup_ttls={
+                    "minute": ttl(args.minute_ttl),
+                    "hour": ttl(args.hour_ttl),
+                    "day": ttl(args.day_ttl)
+                }
+            ),
+            chunk_size=args.chunk_size,
+            vacuum=not args.no_vacuum,
+            full_vacuum=args.full_vacuum
+        )
+        
+        print(f"\n🧹 Compacted {args.db} in {report['duration_s']:.1f}s")
+        print(f"Calls deleted: {report['calls_deleted']:,}")
+        print(f"Rollups deleted: {report['rollups_deleted']:,}")
+        print(f"Size: {report['size_before'] / 1e6:.1f} MB → {report['size_after'] / 1e6:.1f} MB")
+        print(f"Reclaimed: {report['reclaimed_bytes'] / 1e6:.1f} MB")
+        if report["vacuum"] == "needs full_vacuum":
+            print("\n⚠️  This database predates incremental vacuum - run once with --full-vacuum to reclaim space")
+    
+    elif args.command == "export" and args.since_watermark:
+        if args.agent or args.since or args.until:
+            parser.error("--since-watermark can't be combined with --agent, --since or --until")
+        exported = watch.export_since_watermark(
+            args.since_watermark,
+            args.filename,
+            format=args.format,
+            compression=args.compression
+        )
+        if exported:
+            print(f"✅ Exported {exported:,} new calls to {args.filename}")
+        else:
+            print(f"No new calls since watermark '{args.since_watermark}'")
+    
     elif args.command == "export":
-        watch.export(args.filename, format=args.format)
-        print(f"✅ Exported to {args.filename}")
+        exported = watch.export(
+            args.filename,
+            format=args.format,
+            agent_name=args.agent,
+            since=args.since,
+            until=args.until,
+            compression=args.compression
+        )
+        print(f"✅ Exported {exported:,} calls to {args.filename}")
 
 
 if __name__ == "__main__":
@@ -2,8 +2,11 @@
 Modern Flask dashboard for Argus - Professional UI/UX
 """
 
+from datetime import datetime
+
 from flask import Flask, render_template_string, jsonify, request
-from .storage import Storage
+from .backends import StorageBackend
+from .rollups import parse_window, resolution_for
 
 
 DASHBOARD_HTML = """
@@ -698,8 +701,12 @@ DASHBOARD_HTML = """
                                     <div class="metric-value">${agent.total_calls.toLocaleString()}</div>
                                 </div>
                                 <div class="metric">
-                                    <div class="metric-label">Latency</div>
-                                    <div class="metric-value">${Math.round(agent.avg_duration_ms)}ms</div>
+                                    <div class="metric-label">Latency p50 / p99</div>
+                                    <div class="metric-value">${
+                                        agent.latency_percentiles && agent.latency_percentiles.p50 !== null
+                                            ? `${Math.round(agent.latency_percentiles.p50)} / ${Math.round(agent.latency_percentiles.p99)}ms`
+                                            : `${Math.round(agent.avg_duration_ms)}ms`
+                                    }</div>
                                 </div>
                                 <div class="metric">
                                     <div class="metric-label">Cost</div>
@@ -784,7 +791,17 @@ DASHBOARD_HTML = """
 """
 
 
-def start_dashboard(storage: Storage, port: int = 3000, debug: bool = False):
+# Largest page /api/calls returns, whatever limit asks for
+MAX_PAGE_SIZE = 1000
+
+
+def _optional(args, name: str, parse):
+    """Parsed query parameter, or None if it's missing"""
+    value = args.get(name)
+    return parse(value) if value else None
+
+
+def start_dashboard(storage: StorageBackend, port: int = 3000, debug: bool = False):
     """Start Flask dashboard with modern UI"""
     app = Flask(__name__)
     
@@ -794,17 +811,59 @@ def start_dashboard(storage: Storage, port: int = 3000, debug: bool = False):
     
     @app.route('/api/stats')
     def api_stats():
+        window = request.args.get('window')
+        if window:
+            return jsonify(storage.get_window_stats(window, request.args.get('agent_name')))
         return jsonify(storage.get_stats())
     
+    @app.route('/api/rollups')
+    def api_rollups():
+        window = request.args.get('window', '24h')
+        length = parse_window(window)
+        return jsonify(storage.get_rollups(
+            request.args.get('resolution') or resolution_for(length),
+            request.args.get('agent_name'),
+            since=datetime.utcnow() - length
+        ))
+    
     @app.route('/api/agents')
     def api_agents():
         return jsonify(storage.list_agents())
     
     @app.route('/api/calls')
     def api_calls():
-        limit = int(request.args.get('limit', 100))
-        agent_name = request.args.get('agent_name')
-        return jsonify(storage.get_calls(agent_name, limit))
+        args = request.args
+        page = storage.get_calls_page(
+            args.get('agent_name'),
+            min(int(args.get('limit', 100)), MAX_PAGE_SIZE),
+            since=_optional(args, 'since', datetime.fromisoformat),
+            until=_optional(args, 'until', datetime.fromisoformat),
+            status=args.get('status'),
+            min_duration_ms=_optional(args, 'min_duration_ms', float),
+            max_duration_ms=_optional(args, 'max_duration_ms', float),
+            min_cost=_optional(args, 'min_cost', float),
+            tags=args.getlist('tag') or None,
+            cursor=args.get('cursor')
+        )
+        response = jsonify(page["calls"])
+        if page["next_cursor"]:
+            response.headers['X-Next-Cursor'] = page["next_cursor"]
+        return response
+    
+    @app.route('/api/calls/<call_id>')
+    def api_call(call_id):
+        call = storage.get_call(call_id)
+        if call is None:
+            return jsonify({"error": f"Call '{call_id}' not found"}), 404
+        return jsonify(call)
+    
+    @app.errorhandler(ValueError)
+    def bad_request(error):
+        return jsonify({"error": str(error)}), 400
+    
+    @app.route('/api/traces/<trace_id>')
+    def api_trace(trace_id):
+        return jsonify(storage.get_trace(trace_id))
     
     print(f"\n🚀 Argus Dashboard running on http://localhost:{port}\n")
     app.run(host='0.0.0.0', port=port, debug=debug)
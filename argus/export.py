@@ -0,0 +1,113 @@
+"""
+Export - stream calls to CSV, JSON or JSON Lines, optionally compressed
+"""
+
+import csv
+import gzip
+import io
+import json
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional, TextIO
+
+EXPORT_FORMATS = ("csv", "json", "jsonl", "parquet")
+COMPRESSIONS = ("gzip", "zstd")
+
+CSV_COLUMNS = [
+    "call_id", "agent_name", "status", "duration_ms",
+    "cost", "timestamp", "error"
+]
+
+
+def check_format(format: str):
+    if format not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Unknown export format '{format}', expected one of {EXPORT_FORMATS}"
+        )
+
+
+def infer_compression(filename: str) -> Optional[str]:
+    """Compression implied by the file extension (.gz, .zst), if any"""
+    if filename.endswith(".gz"):
+        return "gzip"
+    if filename.endswith(".zst"):
+        return "zstd"
+    return None
+
+
+@contextmanager
+def open_output(filename: str, compression: Optional[str] = None) -> Iterator[TextIO]:
+    """
+    Text stream writing to filename, compressed on the fly
+    
+    Args:
+        filename: Output path
+        compression: None, "gzip" or "zstd" (needs the zstandard package)
+    """
+    if compression is None:
+        with open(filename, "w", newline="", encoding="utf-8") as f:
+            yield f
+    elif compression == "gzip":
+        # Level 6, like zlib - gzip's default of 9 is much slower for ~1% smaller files
+        with gzip.open(filename, "wt", compresslevel=6, newline="", encoding="utf-8") as f:
+            yield f
+    elif compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(
+                "zstd compression needs the zstandard package: "
+                "pip install 'hundredeyes[zstd]'"
+            )
+        with open(filename, "wb") as raw:
+            with zstandard.ZstdCompressor().stream_writer(raw) as compressed:
+                f = io.TextIOWrapper(compressed, newline="", encoding="utf-8")
+                yield f
+                f.flush()
+                f.detach()
+    else:
+        raise ValueError(
+            f"Unknown compression '{compression}', expected one of {COMPRESSIONS}"
+        )
+
+
+def write_calls(f: TextIO, calls: Iterable[Dict[str, Any]], format: str) -> int:
+    """
+    Write calls to f one at a time
+    
+    Nothing is collected first, so memory use doesn't depend on how many
+    calls there are. JSON output is the same as json.dump(calls, f,
+    indent=2) would give.
+    
+    Returns:
+        Number of calls written
+    """
+    check_format(format)
+    if format == "parquet":
+        raise ValueError("Parquet is written by argus.arrow.write_parquet()")
+    written = 0
+    
+    if format == "csv":
+        writer = csv.writer(f)
+        writer.writerow(CSV_COLUMNS)
+        for c in calls:
+            writer.writerow([
+                c["call_id"], c["agent_name"], c["status"], c["duration_ms"],
+                c["cost"], c["timestamp"], c["error"] or ""
+            ])
+            written += 1
+    
+    elif format == "jsonl":
+        for c in calls:
+            f.write(json.dumps(c, default=str))
+            f.write("\n")
+            written += 1
+    
+    else:
+        f.write("[")
+        for c in calls:
+            f.write(",\n  " if written else "\n  ")
+            f.write(json.dumps(c, indent=2, default=str).replace("\n", "\n  "))
+            written += 1
+        f.write("\n]" if written else "]")
+    
+    return written
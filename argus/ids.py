@@ -0,0 +1,76 @@
+"""
+IDs - time-ordered, compact identifiers for calls and traces
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+
+# Crockford base32 - same symbol order as byte values, so string order == time order
+CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_DECODE = {c: i for i, c in enumerate(CROCKFORD)}
+
+# Every 10-bit value as two symbols - encoding is a handful of lookups
+_PAIRS = [a + b for a in CROCKFORD for b in CROCKFORD]
+
+# Random part starts below 2**79, leaving 2**79 increments per millisecond
+_RANDOM_START_MASK = (1 << 79) - 1
+
+_lock = threading.Lock()
+_last_ms = -1
+_last_random = 0
+_last_prefix = ""
+
+
+def _encode_time(ms: int) -> str:
+    """48-bit timestamp as 10 symbols"""
+    p = _PAIRS
+    return (
+        p[ms >> 40] + p[(ms >> 30) & 1023] + p[(ms >> 20) & 1023]
+        + p[(ms >> 10) & 1023] + p[ms & 1023]
+    )
+
+
+def _encode_random(r: int) -> str:
+    """80-bit integer as 16 symbols"""
+    p = _PAIRS
+    return (
+        p[r >> 70] + p[(r >> 60) & 1023] + p[(r >> 50) & 1023] + p[(r >> 40) & 1023]
+        + p[(r >> 30) & 1023] + p[(r >> 20) & 1023] + p[(r >> 10) & 1023] + p[r & 1023]
+    )
+
+
+def new_id() -> str:
+    """
+    New ULID: 26 characters, sortable by creation time
+    
+    48 bits of millisecond timestamp followed by 80 random bits. IDs created
+    in the same millisecond by this process increment the random part, so
+    they are strictly increasing even if the clock stalls or steps back.
+    Inserting them keeps unique indexes append-only instead of scattering
+    writes across the B-tree like uuid4 does.
+    """
+    global _last_ms, _last_random, _last_prefix
+    
+    ms = time.time_ns() // 1_000_000
+    with _lock:
+        if ms > _last_ms:
+            _last_ms = ms
+            _last_prefix = _encode_time(ms)
+            _last_random = int.from_bytes(os.urandom(10), "big") & _RANDOM_START_MASK
+        else:
+            _last_random += 1
+        prefix = _last_prefix
+        random_part = _last_random
+    
+    return prefix + _encode_random(random_part)
+
+
+def id_timestamp(value: str) -> datetime:
+    """UTC creation time of an id made by new_id()"""
+    ms = 0
+    for c in value[:10].upper():
+        ms = (ms << 5) | _DECODE[c]
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
@@ -16,7 +16,7 @@ except ImportError:
     LANGCHAIN_AVAILABLE = False
     BaseCallbackHandler = object
 
-from ..storage import Storage
+from ..backends import StorageBackend
 from ..pricing import calculate_cost
 
 
@@ -48,7 +48,8 @@ class ArgusCallbackHandler(BaseCallbackHandler):
         self,
         agent_name: str = "langchain-agent",
         tags: Optional[List[str]] = None,
-        db_path: str = "argus.db"
+        db_path: str = "argus.db",
+        backend: Optional[StorageBackend] = None
     ):
         """
         Initialize Argus callback handler
@@ -57,11 +58,16 @@ class ArgusCallbackHandler(BaseCallbackHandler):
             agent_name: Name for this agent in Argus dashboard
             tags: Optional tags for categorization
             db_path: Path to Argus database
+            backend: Storage backend to log to instead, e.g. a Watch's
+                watch.storage
         """
         super().__init__()
         self.agent_name = agent_name
         self.tags = tags or ["langchain"]
-        self.storage = Storage(db_path)
+        if backend is None:
+            from ..storage import Storage
+            backend = Storage(db_path)
+        self.storage = backend
         self._call_data = {}
         
         # Register agent
@@ -0,0 +1,264 @@
+"""
+Migrations - upgrade existing databases in place on startup
+
+The schema version lives in SQLite's PRAGMA user_version. Each migration
+runs once, in order, inside one write transaction together with the
+version bump, so a crash or a second process starting at the same time
+never leaves a half-upgraded database.
+
+Migrations must be idempotent: databases created before versioning
+existed report version 0 but may already have some of these changes, and
+brand-new databases get the full schema from create_all() first.
+
+Partition files (argus.partitions) only hold the calls and payloads
+tables. They are versioned the same way, but only run the migrations
+marked partitions=True - set it on every migration that touches those
+two tables.
+"""
+
+from typing import Callable, List, NamedTuple
+
+from .sketch import LatencySketch
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable  # apply(cursor) on a raw sqlite3 cursor
+    partitions: bool = False  # Also run on partition files
+
+
+def _columns(cursor, table: str) -> set:
+    return {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+
+
+def _add_column(cursor, table: str, column: str, type_: str) -> bool:
+    """ALTER TABLE ADD COLUMN unless it exists; True if it was added"""
+    if column in _columns(cursor, table):
+        return False
+    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {type_}")
+    return True
+
+
+def _add_trace_columns(cursor):
+    _add_column(cursor, "calls", "trace_id", "VARCHAR(32)")
+    _add_column(cursor, "calls", "span_id", "VARCHAR(16)")
+    _add_column(cursor, "calls", "parent_span_id", "VARCHAR(16)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_calls_trace_id ON calls (trace_id)")
+
+
+def _add_duration_totals(cursor):
+    added = _add_column(cursor, "agents", "sum_duration_ms", "FLOAT DEFAULT 0.0")
+    _add_column(cursor, "agents", "min_duration_ms", "FLOAT")
+    _add_column(cursor, "agents", "max_duration_ms", "FLOAT")
+    if added:
+        # Totals used to keep a running average - recover the sum from it,
+        # and min/max from whatever calls are stored
+        cursor.execute(
+            "UPDATE agents SET "
+            "sum_duration_ms = COALESCE(avg_duration_ms, 0) * total_calls, "
+            "min_duration_ms = (SELECT MIN(duration_ms) FROM calls "
+            "WHERE calls.agent_name = agents.name), "
+            "max_duration_ms = (SELECT MAX(duration_ms) FROM calls "
+            "WHERE calls.agent_name = agents.name)"
+        )
+
+
+def _add_call_indexes(cursor):
+    # Recent calls per agent, recent calls overall, recent errors
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_calls_agent_name_timestamp "
+        "ON calls (agent_name, timestamp)"
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_calls_timestamp ON calls (timestamp)")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_calls_status_timestamp ON calls (status, timestamp)"
+    )
+
+
+def _add_rollups(cursor):
+    cursor.execute(
+        "CREATE TABLE IF NOT EXISTS rollups ("
+        "id INTEGER NOT NULL PRIMARY KEY, "
+        "resolution VARCHAR(10) NOT NULL, "
+        "bucket_start DATETIME NOT NULL, "
+        "agent_name VARCHAR(255) NOT NULL, "
+        "calls INTEGER, errors INTEGER, cost FLOAT, sum_duration_ms FLOAT, "
+        "min_duration_ms FLOAT, max_duration_ms FLOAT, histogram JSON, "
+        "UNIQUE (resolution, bucket_start, agent_name))"
+    )
+
+
+def _add_latency_sketches(cursor):
+    added = _add_column(cursor, "agents", "latency_sketch", "BLOB")
+    _add_column(cursor, "rollups", "latency_sketch", "BLOB")
+    if added:
+        # Seed each agent's sketch from the calls that are stored
+        sketches = {}
+        for agent_name, duration_ms in cursor.execute(
+            "SELECT agent_name, duration_ms FROM calls WHERE duration_ms IS NOT NULL"
+        ):
+            sketch = sketches.get(agent_name)
+            if sketch is None:
+                sketch = sketches[agent_name] = LatencySketch()
+            sketch.add(duration_ms)
+        cursor.executemany(
+            "UPDATE agents SET latency_sketch = ? WHERE name = ?",
+            [(sketch.to_bytes(), name) for name, sketch in sketches.items()]
+        )
+
+
+def _add_payloads(cursor):
+    # Calls written from now on keep hashes; older rows keep inline payloads
+    _add_column(cursor, "calls", "input_hash", "VARCHAR(32)")
+    _add_column(cursor, "calls", "output_hash", "VARCHAR(32)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_calls_input_hash ON calls (input_hash)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_calls_output_hash ON calls (output_hash)")
+    cursor.execute(
+        "CREATE TABLE IF NOT EXISTS payloads ("
+        "id INTEGER NOT NULL PRIMARY KEY, "
+        "hash VARCHAR(32) NOT NULL UNIQUE, "
+        "codec VARCHAR(10) NOT NULL, "
+        "size INTEGER, "
+        "data BLOB NOT NULL)"
+    )
+
+
+def _add_export_watermarks(cursor):
+    cursor.execute(
+        "CREATE TABLE IF NOT EXISTS export_watermarks ("
+        "id INTEGER NOT NULL PRIMARY KEY, "
+        "name VARCHAR(255) NOT NULL UNIQUE, "
+        "positions JSON, "
+        "pending_positions JSON, "
+        "pending_file TEXT, "
+        "exported_calls INTEGER, "
+        "updated_at DATETIME)"
+    )
+
+
+def _add_segment_checkpoints(cursor):
+    cursor.execute(
+        "CREATE TABLE IF NOT EXISTS segment_checkpoints ("
+        "id INTEGER NOT NULL PRIMARY KEY, "
+        "writer VARCHAR(255) NOT NULL UNIQUE, "
+        "segment INTEGER NOT NULL, "
+        "position INTEGER NOT NULL)"
+    )
+
+
+def _autoincrement_call_ids(cursor):
+    # Without AUTOINCREMENT, SQLite reuses the ids of the newest rows once
+    # they're deleted, and export watermarks would skip the new calls.
+    # SQLite can't change a primary key in place - rebuild the table.
+    (sql,) = cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'calls'"
+    ).fetchone()
+    if "AUTOINCREMENT" in sql.upper():
+        return
+    
+    columns, definitions = [], []
+    for _, name, type_, notnull, default, pk in cursor.execute("PRAGMA table_info(calls)"):
+        columns.append(name)
+        if pk:
+            definitions.append(f"{name} INTEGER PRIMARY KEY AUTOINCREMENT")
+            continue
+        definition = f"{name} {type_}".strip()
+        if notnull:
+            definition += " NOT NULL"
+        if default is not None:
+            definition += f" DEFAULT {default}"
+        definitions.append(definition)
+    for _, index, unique, origin, _ in cursor.execute("PRAGMA index_list(calls)").fetchall():
+        if unique and origin == "u":
+            indexed = [row[2] for row in cursor.execute(f"PRAGMA index_info({index})")]
+            definitions.append(f"UNIQUE ({', '.join(indexed)})")
+    indexes = [
+        row[0] for row in cursor.execute(
+            "SELECT sql FROM sqlite_master "
+            "WHERE type = 'index' AND tbl_name = 'calls' AND sql IS NOT NULL"
+        )
+    ]
+    
+    column_list = ", ".join(columns)
+    cursor.execute(f"CREATE TABLE calls_rebuilt ({', '.join(definitions)})")
+    # Copying the ids also starts sqlite_sequence at the current max
+    cursor.execute(f"INSERT INTO calls_rebuilt ({column_list}) SELECT {column_list} FROM calls")
+    cursor.execute("DROP TABLE calls")
+    cursor.execute("ALTER TABLE calls_rebuilt RENAME TO calls")
+    for index in indexes:
+        cursor.execute(index)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1, "trace_id/span_id/parent_span_id on calls", _add_trace_columns, partitions=True
+    ),
+    Migration(2, "duration sum/min/max on agents", _add_duration_totals),
+    Migration(
+        3, "calls indexes for agent, time and status queries", _add_call_indexes,
+        partitions=True
+    ),
+    Migration(4, "minute/hour/day rollups table", _add_rollups),
+    Migration(5, "latency sketches on agents and rollups", _add_latency_sketches),
+    Migration(6, "content-addressed payloads table", _add_payloads, partitions=True),
+    Migration(7, "export watermarks table", _add_export_watermarks),
+    Migration(8, "segment log checkpoints table", _add_segment_checkpoints),
+    Migration(
+        9, "AUTOINCREMENT call ids, never reused", _autoincrement_call_ids, partitions=True
+    ),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def schema_version(engine) -> int:
+    """Current PRAGMA user_version of a database"""
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def migrate(engine, partition: bool = False) -> int:
+    """
+    Bring a database up to SCHEMA_VERSION
+    
+    Args:
+        engine: Engine of the database
+        partition: It's a partition file - only partition migrations run
+    
+    Returns:
+        The version the database was at before migrating
+    """
+    raw = engine.raw_connection()
+    try:
+        dbapi_connection = raw.driver_connection
+        cursor = dbapi_connection.cursor()
+        start_version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        if start_version >= SCHEMA_VERSION:
+            return start_version
+        
+        # Manage the transaction ourselves so the DDL is part of it
+        isolation_level = dbapi_connection.isolation_level
+        dbapi_connection.isolation_level = None
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                # Re-read under the write lock - another process may have
+                # migrated in the meantime
+                start_version = cursor.execute("PRAGMA user_version").fetchone()[0]
+                for migration in MIGRATIONS:
+                    if migration.version > start_version and (
+                        migration.partitions or not partition
+                    ):
+                        migration.apply(cursor)
+                if start_version < SCHEMA_VERSION:
+                    cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+        finally:
+            dbapi_connection.isolation_level = isolation_level
+        return start_version
+    finally:
+        raw.close()
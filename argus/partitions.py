@@ -0,0 +1,87 @@
+"""
+Partitions - file layout for day/hour-partitioned call storage
+
+Calls of each day (or hour) live in their own SQLite file next to the
+main database:
+    
+    argus.db                        agents, rollups, older unpartitioned calls
+    argus_calls/calls-2026-03-01.db
+    argus_calls/calls-2026-03-02.db
+"""
+
+import os
+import re
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional
+
+
+# name -> length of one partition
+PARTITIONS = {"day": timedelta(days=1), "hour": timedelta(hours=1)}
+
+_KEY_FORMATS = {"day": "%Y-%m-%d", "hour": "%Y-%m-%dT%H"}
+_FILE_PATTERN = re.compile(r"^calls-(\d{4}-\d{2}-\d{2}(?:T\d{2})?)\.db$")
+
+
+class Partition(NamedTuple):
+    key: str
+    start: datetime
+    end: datetime
+    path: str
+
+
+def check_partition(partition: str):
+    """Raise ValueError for an unknown partition scheme"""
+    if partition not in PARTITIONS:
+        raise ValueError(
+            f"Unknown partition scheme '{partition}', expected one of {tuple(PARTITIONS)}"
+        )
+
+
+def partition_dir(db_path: str) -> str:
+    """Directory holding the partition files of a database"""
+    return os.path.splitext(db_path)[0] + "_calls"
+
+
+def key_for_timestamp(timestamp: str, partition: str) -> str:
+    """
+    Partition key of a stored timestamp ("YYYY-MM-DD HH:MM:SS.ffffff")
+    
+    Slices the string instead of parsing it - this runs for every call.
+    """
+    if partition == "day":
+        return timestamp[:10]
+    return timestamp[:10] + "T" + timestamp[11:13]
+
+
+def partition_for_key(directory: str, key: str, partition: str) -> Partition:
+    start = datetime.strptime(key, _KEY_FORMATS[partition])
+    return Partition(
+        key,
+        start,
+        start + PARTITIONS[partition],
+        os.path.join(directory, f"calls-{key}.db")
+    )
+
+
+def list_partitions(directory: str, partition: str) -> List[Partition]:
+    """Partition files on disk, oldest first"""
+    if not os.path.isdir(directory):
+        return []
+    found = []
+    for name in os.listdir(directory):
+        match = _FILE_PATTERN.match(name)
+        if match and ("T" in match.group(1)) == (partition == "hour"):
+            found.append(partition_for_key(directory, match.group(1), partition))
+    return sorted(found, key=lambda p: p.start)
+
+
+def detect_partitioning(db_path: str) -> Optional[str]:
+    """Partition scheme of an existing database, None if it isn't partitioned"""
+    directory = partition_dir(db_path)
+    if not os.path.isdir(directory):
+        return None
+    for name in os.listdir(directory):
+        match = _FILE_PATTERN.match(name)
+        if match:
+            return "hour" if "T" in match.group(1) else "day"
+    return None
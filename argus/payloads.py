@@ -0,0 +1,107 @@
+"""
+Payloads - compressed, content-addressed call inputs and outputs
+
+Calls store a hash per payload instead of the payload itself. The bytes
+live once per database in the payloads table, however many calls share
+them, and are only read when a call's payloads are asked for.
+"""
+
+import hashlib
+import json
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Payloads shorter than this are stored as-is - zlib can't shrink them
+MIN_COMPRESS_BYTES = 64
+ZLIB_LEVEL = 6
+
+CODECS = ("raw", "zlib")
+
+# Canonical JSON - built once, json.dumps() with options makes a new encoder per call
+_encoder = json.JSONEncoder(sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _canonical(data: Any) -> Tuple[str, bytes]:
+    """(hash, canonical JSON) of a payload"""
+    text = _encoder.encode(data).encode()
+    return hashlib.blake2b(text, digest_size=16).hexdigest(), text
+
+
+def _compress(text: bytes) -> Tuple[str, bytes]:
+    """(codec, blob) - zlib unless that doesn't make it smaller"""
+    if len(text) >= MIN_COMPRESS_BYTES:
+        compressed = zlib.compress(text, ZLIB_LEVEL)
+        if len(compressed) < len(text):
+            return "zlib", compressed
+    return "raw", text
+
+
+def encode_payload(data: Any) -> Optional[Tuple[str, str, int, bytes]]:
+    """
+    Serialize a payload for the payloads table
+    
+    Args:
+        data: JSON-serializable input or output data
+    
+    Returns:
+        (hash, codec, size, blob), or None for a missing payload. The hash
+        is over the canonical JSON, so equal payloads share a row whatever
+        their key order.
+    """
+    if data is None:
+        return None
+    digest, text = _canonical(data)
+    codec, blob = _compress(text)
+    return digest, codec, len(text), blob
+
+
+def decode_payload(codec: str, blob: bytes) -> Any:
+    """Inverse of encode_payload()"""
+    return json.loads(decode_payload_text(codec, blob))
+
+
+def decode_payload_text(codec: str, blob: bytes) -> str:
+    """A stored payload as JSON text, without parsing it"""
+    if codec == "zlib":
+        blob = zlib.decompress(blob)
+    elif codec != "raw":
+        raise ValueError(f"Unknown payload codec '{codec}', expected one of {CODECS}")
+    return blob.decode()
+
+
+class PayloadBatch:
+    """
+    Payloads of one write batch, each compressed once
+    
+    Usage:
+        batch = PayloadBatch()
+        input_hash = batch.add(record["input_data"])
+        cursor.executemany(INSERT_PAYLOAD, batch.rows())
+    """
+    
+    def __init__(self):
+        self._rows: Dict[str, Tuple[str, str, int, bytes]] = {}
+    
+    def add(self, data: Any) -> Optional[str]:
+        """Hash referencing data (None if there's no payload)"""
+        if data is None:
+            return None
+        digest, text = _canonical(data)
+        if digest not in self._rows:
+            codec, blob = _compress(text)
+            self._rows[digest] = (digest, codec, len(text), blob)
+        return digest
+    
+    def rows(self, hashes: Optional[Iterable[str]] = None) -> List[Tuple[str, str, int, bytes]]:
+        """
+        (hash, codec, size, data) rows, one per distinct payload
+        
+        Args:
+            hashes: Only these payloads (None entries are ignored)
+        """
+        if hashes is None:
+            return list(self._rows.values())
+        return [self._rows[digest] for digest in dict.fromkeys(hashes) if digest is not None]
+    
+    def __len__(self) -> int:
+        return len(self._rows)
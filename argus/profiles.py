@@ -0,0 +1,69 @@
+"""
+Storage profiles - SQLite pragmas applied to every connection
+"""
+
+from typing import Dict, Union
+
+
+# Pragma values per profile. All profiles wait on locks instead of failing
+# with "database is locked". Only "concurrent" and "fast" switch the file to
+# WAL (so a dashboard can read while agents write) - journal_mode=WAL is
+# stored in the database file and outlives the process, so it's opt-in.
+PROFILES: Dict[str, Dict[str, Union[int, str]]] = {
+    # Every commit is fsynced - survives power loss
+    "durable": {
+        "synchronous": "FULL",
+        "cache_size": -16000,           # 16 MB
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 10000,
+    },
+    # Every commit is fsynced, bigger caches - the journal mode is left as
+    # the database has it
+    "balanced": {
+        "synchronous": "FULL",
+        "cache_size": -64000,           # 64 MB
+        "mmap_size": 268435456,         # 256 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # WAL, fsync at checkpoints only - an OS crash/power loss can lose the
+    # last commits, an application crash can't
+    "concurrent": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,           # 64 MB
+        "mmap_size": 268435456,         # 256 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # No fsync at all - for throwaway or easily rebuilt databases
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -256000,          # 256 MB
+        "mmap_size": 1073741824,        # 1 GB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+
+DEFAULT_PROFILE = "balanced"
+
+
+def check_profile(profile: str):
+    """Raise ValueError for an unknown profile name"""
+    if profile not in PROFILES:
+        raise ValueError(
+            f"Unknown storage profile '{profile}', expected one of {tuple(PROFILES)}"
+        )
+
+
+def apply_profile(dbapi_connection, profile: str):
+    """Run a profile's pragmas on a raw sqlite3 connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma, value in PROFILES[profile].items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+    finally:
+        cursor.close()
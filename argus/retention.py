@@ -0,0 +1,76 @@
+"""
+Retention - how long raw calls and rollups are kept
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from .rollups import RESOLUTIONS, parse_window
+
+
+DEFAULT_CALLS_TTL = "30d"
+DEFAULT_ROLLUP_TTLS = {"minute": "2d", "hour": "90d", "day": None}
+
+
+class RetentionPolicy:
+    """
+    What Watch.compact() deletes
+    
+    Raw calls expire first; their agent totals, rollups and percentiles
+    stay. Rollups expire later, coarse ones last. A TTL of None keeps data
+    forever.
+    
+    Usage:
+        watch.compact(RetentionPolicy(
+            calls_ttl="30d",                    # Raw calls: 30 days...
+            agent_ttls={"embedder": "2d"},      # ...but only 2 for a noisy agent
+            rollup_ttls={"minute": "1d", "hour": "180d", "day": None}
+        ))
+    """
+    
+    def __init__(
+        self,
+        calls_ttl: Any = DEFAULT_CALLS_TTL,
+        agent_ttls: Optional[Dict[str, Any]] = None,
+        rollup_ttls: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Args:
+            calls_ttl: Default age after which calls are deleted - a
+                timedelta, seconds or a string like "30d"
+            agent_ttls: Per-agent overrides of calls_ttl
+            rollup_ttls: TTL per rollup resolution ("minute", "hour",
+                "day"); missing resolutions use the defaults
+        """
+        rollup_ttls = {**DEFAULT_ROLLUP_TTLS, **(rollup_ttls or {})}
+        unknown = set(rollup_ttls) - set(RESOLUTIONS)
+        if unknown:
+            raise ValueError(
+                f"Unknown rollup resolution(s) {sorted(unknown)}, expected {tuple(RESOLUTIONS)}"
+            )
+        
+        self.calls_ttl = _ttl(calls_ttl)
+        self.agent_ttls = {name: _ttl(ttl) for name, ttl in (agent_ttls or {}).items()}
+        self.rollup_ttls = {res: _ttl(ttl) for res, ttl in rollup_ttls.items()}
+    
+    def cutoffs(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Timestamps before which data is deleted (None = keep)"""
+        now = now or datetime.utcnow()
+        
+        def cutoff(ttl):
+            return now - ttl if ttl is not None else None
+        
+        return {
+            "calls": cutoff(self.calls_ttl),
+            "agents": {name: cutoff(ttl) for name, ttl in self.agent_ttls.items()},
+            "rollups": {res: cutoff(ttl) for res, ttl in self.rollup_ttls.items()},
+        }
+
+
+def _ttl(value: Any) -> Optional[timedelta]:
+    if value is None:
+        return None
+    ttl = parse_window(value)
+    if ttl <= timedelta(0):
+        raise ValueError(f"TTL must be positive, got {value!r}")
+    return ttl
@@ -0,0 +1,157 @@
+"""
+Rollups - per-agent minute/hour/day buckets for time-windowed stats
+"""
+
+import json
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .sketch import LatencySketch
+
+
+RESOLUTIONS = {"minute": 60, "hour": 3600, "day": 86400}
+
+# Upper bounds (inclusive) of the latency histogram buckets; one more
+# bucket counts everything slower than the last bound
+LATENCY_BOUNDS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+_WINDOW_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_window(window: Union[str, int, float, timedelta]) -> timedelta:
+    """
+    Window length from a timedelta, seconds or a string like "15m", "24h", "7d"
+    """
+    if isinstance(window, timedelta):
+        return window
+    if isinstance(window, (int, float)):
+        return timedelta(seconds=window)
+    
+    value = window.strip().lower()
+    try:
+        if value and value[-1] in _WINDOW_UNITS:
+            return timedelta(seconds=float(value[:-1]) * _WINDOW_UNITS[value[-1]])
+        return timedelta(seconds=float(value))
+    except ValueError:
+        raise ValueError(
+            f"Invalid window '{window}', expected e.g. '30m', '24h' or '7d'"
+        ) from None
+
+
+def resolution_for(window: timedelta) -> str:
+    """Coarsest resolution that still gives a useful number of buckets"""
+    if window <= timedelta(hours=6):
+        return "minute"
+    if window <= timedelta(days=14):
+        return "hour"
+    return "day"
+
+
+def bucket_start(timestamp: datetime, resolution: str) -> datetime:
+    """Start of the bucket a timestamp falls into"""
+    if resolution == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    if resolution == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def latency_bucket(duration_ms: float) -> int:
+    return bisect_left(LATENCY_BOUNDS_MS, duration_ms)
+
+
+def histogram_labels() -> List[str]:
+    return [f"le_{b}" for b in LATENCY_BOUNDS_MS] + ["inf"]
+
+
+def merge_counts(a: Optional[str], b: Optional[str]) -> Optional[str]:
+    """
+    Add two JSON histograms element-wise
+    
+    Registered as the argus_merge_counts() SQL function so rollup upserts
+    stay a single statement.
+    """
+    if a is None:
+        return b
+    if b is None:
+        return a
+    left, right = json.loads(a), json.loads(b)
+    if len(left) < len(right):
+        left, right = right, left
+    for i, n in enumerate(right):
+        left[i] += n
+    return json.dumps(left)
+
+
+class RollupBatch:
+    """Folds a batch of calls into one row per (resolution, bucket, agent)"""
+    
+    def __init__(self):
+        # key -> [calls, errors, cost, sum, min, max, histogram, sketch]
+        self.buckets: Dict[Tuple[str, datetime, str], List[Any]] = {}
+    
+    def add(
+        self,
+        agent_name: str,
+        timestamp: datetime,
+        status: str,
+        duration_ms: float,
+        cost: float
+    ):
+        slot = latency_bucket(duration_ms)
+        is_error = status == "error"
+        for resolution in RESOLUTIONS:
+            key = (resolution, bucket_start(timestamp, resolution), agent_name)
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = [
+                    0, 0, 0.0, 0.0, duration_ms, duration_ms,
+                    [0] * (len(LATENCY_BOUNDS_MS) + 1), LatencySketch()
+                ]
+            bucket[0] += 1
+            if is_error:
+                bucket[1] += 1
+            bucket[2] += cost
+            bucket[3] += duration_ms
+            if duration_ms < bucket[4]:
+                bucket[4] = duration_ms
+            if duration_ms > bucket[5]:
+                bucket[5] = duration_ms
+            bucket[6][slot] += 1
+            bucket[7].add(duration_ms)
+    
+    def rows(self, format_timestamp: Callable[[datetime], str]) -> List[tuple]:
+        """Parameters for the rollup upsert"""
+        return [
+            (
+                resolution, format_timestamp(start), agent_name,
+                *bucket[:6], json.dumps(bucket[6]), bucket[7].to_bytes()
+            )
+            for (resolution, start, agent_name), bucket in self.buckets.items()
+        ]
+
+
+def summarize(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine rollup rows of one agent into a single summary"""
+    calls = sum(r["calls"] for r in rows)
+    errors = sum(r["errors"] for r in rows)
+    duration_sum = sum(r["sum_duration_ms"] for r in rows)
+    histogram = [0] * (len(LATENCY_BOUNDS_MS) + 1)
+    sketch = LatencySketch()
+    for r in rows:
+        for i, n in enumerate(r["histogram"]):
+            histogram[i] += n
+        if r["latency_sketch"]:
+            sketch.merge(LatencySketch.from_bytes(r["latency_sketch"]))
+    return {
+        "calls": calls,
+        "errors": errors,
+        "error_rate": errors / calls if calls else 0,
+        "cost": sum(r["cost"] for r in rows),
+        "avg_duration_ms": duration_sum / calls if calls else 0.0,
+        "min_duration_ms": min((r["min_duration_ms"] for r in rows), default=None),
+        "max_duration_ms": max((r["max_duration_ms"] for r in rows), default=None),
+        "latency_percentiles": sketch.percentiles(),
+        "latency_histogram": dict(zip(histogram_labels(), histogram)),
+    }
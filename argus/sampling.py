@@ -0,0 +1,85 @@
+"""
+Sampling - decide which calls get a row in the calls table
+"""
+
+import random
+from typing import Dict, Optional
+
+
+class Sampler:
+    """
+    Head + tail sampling policy for high-QPS agents
+
+    Head sampling decides up front, with probability rate, whether a call is
+    kept. Tail rules run once the call finished and keep it anyway if it
+    errored, was slow or was expensive. Calls that are dropped still count
+    towards the per-agent totals - only the row in the calls table is
+    skipped.
+
+    Usage:
+        watch = Watch(sampling=Sampler(
+            rate=0.01,                      # Keep 1% of calls...
+            agent_rates={"billing": 1.0},   # ...but every billing call
+            keep_errors=True,               # ...and every error
+            slow_ms=5000,                   # ...and anything over 5s
+            min_cost=0.10                   # ...or costing 10 cents or more
+        ))
+    """
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        agent_rates: Optional[Dict[str, float]] = None,
+        keep_errors: bool = True,
+        slow_ms: Optional[float] = None,
+        min_cost: Optional[float] = None
+    ):
+        """
+        Args:
+            rate: Head sampling probability, 0.0 - 1.0
+            agent_rates: Per-agent overrides of rate
+            keep_errors: Always keep failed calls
+            slow_ms: Always keep calls taking at least this long
+            min_cost: Always keep calls costing at least this much
+        """
+        for value in [rate, *(agent_rates or {}).values()]:
+            if not 0.0 <= value <= 1.0:
+                raise ValueError(f"Sample rate must be between 0 and 1, got {value}")
+
+        self.rate = rate
+        self.agent_rates = dict(agent_rates or {})
+        self.keep_errors = keep_errors
+        self.slow_ms = slow_ms
+        self.min_cost = min_cost
+
+    def with_rate(self, rate: float) -> "Sampler":
+        """Copy of this policy with a different head sampling rate"""
+        return Sampler(
+            rate=rate,
+            keep_errors=self.keep_errors,
+            slow_ms=self.slow_ms,
+            min_cost=self.min_cost
+        )
+
+    def head(self, agent_name: str) -> bool:
+        """Head decision, made when the call starts"""
+        rate = self.agent_rates.get(agent_name, self.rate)
+        return rate >= 1.0 or random.random() < rate
+
+    def keep(
+        self,
+        head_sampled: bool,
+        status: str,
+        duration_ms: float,
+        cost: float
+    ) -> bool:
+        """Final decision, made when the call ends"""
+        if head_sampled:
+            return True
+        if self.keep_errors and status == "error":
+            return True
+        if self.slow_ms is not None and duration_ms >= self.slow_ms:
+            return True
+        if self.min_cost is not None and cost >= self.min_cost:
+            return True
+        return False
@@ -0,0 +1,222 @@
+"""
+Sketch - mergeable latency quantiles in bounded memory
+"""
+
+import math
+import struct
+import sys
+from array import array
+from typing import Dict, Optional, Tuple
+
+
+PERCENTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99, "p99.9": 0.999}
+
+# Merged bin arrays longer than this have their lowest bins folded together
+_MAX_SERIALIZED_BINS = 2048
+
+
+class LatencySketch:
+    """
+    DDSketch-style quantile sketch
+    
+    Values are counted in logarithmic bins, so any quantile comes back
+    within relative_accuracy of the true value (1% by default) no matter
+    how many values were added. Sketches of different agents, time buckets
+    or processes merge by adding bin counts - nothing is sorted and no raw
+    durations are kept. Durations of 1ms to 1 hour fit in about 770 bins;
+    beyond max_bins the lowest bins are folded together.
+    """
+    
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        if not 0.0 < relative_accuracy < 1.0:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+    
+    def add(self, value: float, count: int = 1):
+        """Count a value (durations <= 0 go to a separate zero bin)"""
+        if value <= 0:
+            self.zero_count += count
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + count
+            if len(self.bins) > self.max_bins:
+                self._collapse()
+        self.count += count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+    
+    def merge(self, other: "LatencySketch"):
+        """Add another sketch's counts into this one"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Can only merge sketches with the same relative_accuracy")
+        for key, n in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + n
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+    
+    def _collapse(self):
+        keys = sorted(self.bins)
+        excess = keys[:len(keys) - self.max_bins + 1]
+        target = excess[-1]
+        self.bins[target] = sum(self.bins.pop(k) for k in excess[:-1]) + self.bins[target]
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated value at quantile q (0-1), None if empty"""
+        if self.count == 0:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        
+        seen = self.zero_count
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                value = 2 * self.gamma ** key / (self.gamma + 1)
+                # Never report outside what was actually seen
+                return min(max(value, self.min), self.max)
+        return self.max
+    
+    def percentiles(self) -> Dict[str, Optional[float]]:
+        """p50/p90/p99/p99.9, rounded to 0.01ms"""
+        result = {}
+        for name, q in PERCENTILES.items():
+            value = self.quantile(q)
+            result[name] = round(value, 2) if value is not None else None
+        return result
+    
+    def to_bytes(self) -> bytes:
+        """Compact binary form: a fixed header plus bins as a dense int64 array"""
+        if self.bins:
+            low, high = min(self.bins), max(self.bins)
+            counts = array("q", (self.bins.get(k, 0) for k in range(low, high + 1)))
+        else:
+            low, counts = 0, array("q")
+        return _pack(
+            self.relative_accuracy, self.count, self.zero_count,
+            self.min, self.max, low, counts
+        )
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "LatencySketch":
+        alpha, count, zero_count, min_, max_, low, counts = _unpack(data)
+        sketch = cls(alpha)
+        sketch.count = count
+        sketch.zero_count = zero_count
+        sketch.min = min_
+        sketch.max = max_
+        sketch.bins = {low + i: n for i, n in enumerate(counts) if n}
+        return sketch
+
+
+# relative accuracy, count, zero count, min, max (NaN = none), lowest bin key
+_HEADER = struct.Struct("<dqqddq")
+
+
+def _pack(alpha, count, zero_count, min_, max_, low, counts: array) -> bytes:
+    header = _HEADER.pack(
+        alpha, count, zero_count,
+        math.nan if min_ is None else min_,
+        math.nan if max_ is None else max_,
+        low
+    )
+    if sys.byteorder != "little":
+        counts = array("q", counts)
+        counts.byteswap()
+    return header + counts.tobytes()
+
+
+def _unpack(data: bytes) -> Tuple:
+    alpha, count, zero_count, min_, max_, low = _HEADER.unpack_from(data)
+    counts = array("q")
+    counts.frombytes(data[_HEADER.size:])
+    if sys.byteorder != "little":
+        counts.byteswap()
+    return (
+        alpha, count, zero_count,
+        None if math.isnan(min_) else min_,
+        None if math.isnan(max_) else max_,
+        low, counts
+    )
+
+
+def merge_sketches(a: Optional[bytes], b: Optional[bytes]) -> Optional[bytes]:
+    """
+    Merge two serialized sketches
+    
+    Registered as the argus_merge_sketch() SQL function so sketch updates
+    stay part of the single-statement upserts. Works on the packed arrays
+    directly and only loops over the smaller sketch's bins - this runs for
+    every agent and rollup bucket a batch touches.
+    """
+    if a is None:
+        return b
+    if b is None:
+        return a
+    left, right = _unpack(a), _unpack(b)
+    if left[0] != right[0]:
+        raise ValueError("Can only merge sketches with the same relative_accuracy")
+    if len(left[6]) < len(right[6]):
+        left, right = right, left
+    
+    low, counts = left[5], left[6]
+    other_low, other_counts = right[5], right[6]
+    if other_counts:
+        if not counts:
+            low, counts = other_low, other_counts
+        else:
+            if other_low < low:
+                counts = array("q", [0]) * (low - other_low) + counts
+                low = other_low
+            end = other_low + len(other_counts) - low
+            if end > len(counts):
+                counts.extend([0] * (end - len(counts)))
+            start = other_low - low
+            for i, n in enumerate(other_counts, start):
+                if n:
+                    counts[i] += n
+    
+    if len(counts) > _MAX_SERIALIZED_BINS:
+        # Same as LatencySketch._collapse(), but bounding the dense span that
+        # is stored rather than the number of non-empty bins
+        excess = len(counts) - _MAX_SERIALIZED_BINS
+        folded = sum(counts[:excess + 1])
+        counts = counts[excess:]
+        counts[0] = folded
+        low += excess
+    
+    mins = [m for m in (left[3], right[3]) if m is not None]
+    maxes = [m for m in (left[4], right[4]) if m is not None]
+    return _pack(
+        left[0], left[1] + right[1], left[2] + right[2],
+        min(mins) if mins else None,
+        max(maxes) if maxes else None,
+        low, counts
+    )
+
+
+def percentiles_of(data: Optional[bytes]) -> Dict[str, Optional[float]]:
+    """Percentiles of a serialized sketch (all None without one)"""
+    if not data:
+        return {name: None for name in PERCENTILES}
+    return LatencySketch.from_bytes(data).percentiles()
@@ -2,14 +2,46 @@
 Storage layer - SQLite database for Argus
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, JSON, Text
-from sqlalchemy.orm import declarative_base, sessionmaker
-from datetime import datetime
-from typing import Dict, Any, List, Optional
+from sqlalchemy import (
+    create_engine, event, func, select, tuple_, Column, Index, UniqueConstraint,
+    Integer, String, Float, DateTime, JSON, Text, LargeBinary
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import declarative_base, deferred, sessionmaker, undefer
+from sqlalchemy.pool import NullPool
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Any, Iterator, List, Optional, Sequence, Tuple
 import json
+import os
+import threading
+import time
+
+from .migrations import migrate
+from .profiles import DEFAULT_PROFILE, apply_profile, check_profile
+from .retention import RetentionPolicy
+from .ids import id_timestamp
+from .backends.base import (
+    EXPORT_COLUMNS, StorageBackend, check_limit, decode_cursor, encode_cursor
+)
+from .export import check_format, infer_compression
+from .payloads import PayloadBatch, decode_payload, decode_payload_text
+from .partitions import (
+    Partition,
+    check_partition,
+    key_for_timestamp,
+    list_partitions,
+    partition_dir,
+    partition_for_key
+)
+from .sketch import LatencySketch, merge_sketches, percentiles_of
+from .rollups import RollupBatch, merge_counts, bucket_start
 
 Base = declarative_base()
 
+# Same text format SQLAlchemy's DateTime uses on SQLite, so rows written
+# through the raw connection read back through the ORM unchanged
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
 
 class Agent(Base):
     __tablename__ = "agents"
@@ -20,97 +52,450 @@ class Agent(Base):
     total_calls = Column(Integer, default=0)
     total_cost = Column(Float, default=0.0)
     total_errors = Column(Integer, default=0)
+    # No longer maintained - averages are sum_duration_ms / total_calls
     avg_duration_ms = Column(Float, default=0.0)
+    sum_duration_ms = Column(Float, default=0.0)
+    min_duration_ms = Column(Float)
+    max_duration_ms = Column(Float)
+    latency_sketch = Column(LargeBinary)  # argus.sketch.LatencySketch
     created_at = Column(DateTime, default=datetime.utcnow)
     last_called_at = Column(DateTime)
 
 
 class Call(Base):
     __tablename__ = "calls"
+    # Keep in sync with argus.migrations, which adds them to older databases
+    __table_args__ = (
+        Index("ix_calls_agent_name_timestamp", "agent_name", "timestamp"),
+        Index("ix_calls_timestamp", "timestamp"),
+        Index("ix_calls_status_timestamp", "status", "timestamp"),
+        Index("ix_calls_input_hash", "input_hash"),
+        Index("ix_calls_output_hash", "output_hash"),
+        # Ids are never reused, so export watermarks can trust them
+        {"sqlite_autoincrement": True},
+    )
     
     id = Column(Integer, primary_key=True)
     call_id = Column(String(255), unique=True, nullable=False)
     agent_name = Column(String(255), nullable=False)
-    input_data = Column(JSON)
-    output_data = Column(JSON)
+    # Inline payloads of calls written before the payloads table existed -
+    # deferred so listing calls doesn't read them
+    input_data = deferred(Column(JSON))
+    output_data = deferred(Column(JSON))
+    input_hash = Column(String(32))   # payloads.hash
+    output_hash = Column(String(32))
     status = Column(String(50))  # success, error
     error = Column(Text)
     duration_ms = Column(Integer)
     cost = Column(Float, default=0.0)
     timestamp = Column(DateTime, default=datetime.utcnow)
+    trace_id = Column(String(32), index=True)
+    span_id = Column(String(16))
+    parent_span_id = Column(String(16))
+
+
+class Payload(Base):
+    """A call input or output, stored once per database (argus.payloads)"""
+    
+    __tablename__ = "payloads"
+    
+    id = Column(Integer, primary_key=True)
+    hash = Column(String(32), unique=True, nullable=False)
+    codec = Column(String(10), nullable=False)  # raw, zlib
+    size = Column(Integer)  # uncompressed bytes
+    data = Column(LargeBinary, nullable=False)
+
+
+class ExportWatermark(Base):
+    """How far export_since_watermark() has got for one destination"""
+    
+    __tablename__ = "export_watermarks"
+    
+    id = Column(Integer, primary_key=True)
+    name = Column(String(255), unique=True, nullable=False)
+    positions = Column(JSON)  # "main" / partition key -> last exported call id
+    pending_positions = Column(JSON)
+    pending_file = Column(Text)  # Set while an export is in flight
+    exported_calls = Column(Integer, default=0)
+    updated_at = Column(DateTime)
+
+
+class SegmentCheckpoint(Base):
+    """How far a segment log writer has been folded in (argus.backends.segments)"""
+    
+    __tablename__ = "segment_checkpoints"
+    
+    id = Column(Integer, primary_key=True)
+    writer = Column(String(255), unique=True, nullable=False)
+    segment = Column(Integer, nullable=False)
+    position = Column(Integer, nullable=False)  # Byte offset of the next record to fold
+
+
+class Rollup(Base):
+    """Per-agent totals for one minute/hour/day"""
+    
+    __tablename__ = "rollups"
+    __table_args__ = (
+        UniqueConstraint("resolution", "bucket_start", "agent_name"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    resolution = Column(String(10), nullable=False)  # minute, hour, day
+    bucket_start = Column(DateTime, nullable=False)
+    agent_name = Column(String(255), nullable=False)
+    calls = Column(Integer, default=0)
+    errors = Column(Integer, default=0)
+    cost = Column(Float, default=0.0)
+    sum_duration_ms = Column(Float, default=0.0)
+    min_duration_ms = Column(Float)
+    max_duration_ms = Column(Float)
+    histogram = Column(JSON)  # call counts per argus.rollups.LATENCY_BOUNDS_MS bucket
+    latency_sketch = Column(LargeBinary)
+
+
+_INSERT_CALL = (
+    "INSERT INTO calls (call_id, agent_name, input_hash, output_hash, status, "
+    "error, duration_ms, cost, timestamp, trace_id, span_id, parent_span_id) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_INSERT_CALL_OR_IGNORE = _INSERT_CALL.replace("INSERT", "INSERT OR IGNORE", 1)
+
+# Payloads are content-addressed, so one that's already stored is skipped
+_INSERT_PAYLOAD = (
+    "INSERT OR IGNORE INTO payloads (hash, codec, size, data) VALUES (?, ?, ?, ?)"
+)
+
+# Payloads no call in the same database refers to any more
+_ORPHAN_PAYLOADS = (
+    "NOT EXISTS (SELECT 1 FROM calls WHERE calls.input_hash = payloads.hash) "
+    "AND NOT EXISTS (SELECT 1 FROM calls WHERE calls.output_hash = payloads.hash)"
+)
 
+# One atomic statement per agent per batch: creates the row if it's missing
+# (tags only matter then) and otherwise adds to the counters in place, so
+# concurrent writers never lose updates
+_UPSERT_AGENT_TOTALS = (
+    "INSERT INTO agents (name, tags, total_calls, total_cost, total_errors, "
+    "sum_duration_ms, min_duration_ms, max_duration_ms, latency_sketch, "
+    "avg_duration_ms, created_at, last_called_at) "
+    "VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, 0.0, ?10, ?11) "
+    "ON CONFLICT (name) DO UPDATE SET "
+    "total_calls = total_calls + excluded.total_calls, "
+    "total_cost = total_cost + excluded.total_cost, "
+    "total_errors = total_errors + excluded.total_errors, "
+    "sum_duration_ms = COALESCE(sum_duration_ms, 0) + excluded.sum_duration_ms, "
+    "min_duration_ms = MIN(COALESCE(min_duration_ms, excluded.min_duration_ms), "
+    "excluded.min_duration_ms), "
+    "max_duration_ms = MAX(COALESCE(max_duration_ms, excluded.max_duration_ms), "
+    "excluded.max_duration_ms), "
+    "latency_sketch = argus_merge_sketch(latency_sketch, excluded.latency_sketch), "
+    "last_called_at = excluded.last_called_at"
+)
 
-class Storage:
+
+_UPSERT_ROLLUP = (
+    "INSERT INTO rollups (resolution, bucket_start, agent_name, calls, errors, "
+    "cost, sum_duration_ms, min_duration_ms, max_duration_ms, histogram, "
+    "latency_sketch) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (resolution, bucket_start, agent_name) DO UPDATE SET "
+    "calls = calls + excluded.calls, "
+    "errors = errors + excluded.errors, "
+    "cost = cost + excluded.cost, "
+    "sum_duration_ms = sum_duration_ms + excluded.sum_duration_ms, "
+    "min_duration_ms = MIN(min_duration_ms, excluded.min_duration_ms), "
+    "max_duration_ms = MAX(max_duration_ms, excluded.max_duration_ms), "
+    "histogram = argus_merge_counts(histogram, excluded.histogram), "
+    "latency_sketch = argus_merge_sketch(latency_sketch, excluded.latency_sketch)"
+)
+
+
+def _on_connect(dbapi_connection, profile: str):
+    # Lets compact() return free pages to the OS without a full VACUUM.
+    # Only takes effect on new databases, and has to come before any WAL
+    # profile switches the journal mode.
+    dbapi_connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    apply_profile(dbapi_connection, profile)
+    # SQL helpers used by the write path
+    dbapi_connection.create_function(
+        "argus_merge_counts", 2, merge_counts, deterministic=True
+    )
+    dbapi_connection.create_function(
+        "argus_merge_sketch", 2, merge_sketches, deterministic=True
+    )
+
+
+def _avg_duration(agent: Agent) -> float:
+    if not agent.total_calls:
+        return 0.0
+    return (agent.sum_duration_ms or 0.0) / agent.total_calls
+
+
+def _expired_call_filters(cutoffs: Dict[str, Any]) -> List[Tuple[str, List[Any]]]:
+    """(where clause, parameters) selecting calls past their TTL"""
+    filters = []
+    if cutoffs["calls"] is not None:
+        overridden = list(cutoffs["agents"])
+        where = "timestamp < ?"
+        if overridden:
+            where += f" AND agent_name NOT IN ({', '.join('?' * len(overridden))})"
+        filters.append((where, [_format_timestamp(cutoffs["calls"]), *overridden]))
+    for agent_name, cutoff in cutoffs["agents"].items():
+        if cutoff is not None:
+            filters.append((
+                "agent_name = ? AND timestamp < ?",
+                [agent_name, _format_timestamp(cutoff)]
+            ))
+    return filters
+
+
+def _fsync_directory(path: str):
+    """Make a rename into path's directory durable (no-op where unsupported)"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+# get_trace() looks this far past a trace's start for its spans
+MAX_TRACE_DURATION = timedelta(days=1)
+
+
+def _format_timestamp(value: Optional[datetime]) -> str:
+    return (value or datetime.utcnow()).strftime(_TIMESTAMP_FORMAT)
+
+
+def _call_summary(c: Call) -> Dict[str, Any]:
+    """A call as get_calls() lists it - no payloads"""
+    return {
+        "call_id": c.call_id,
+        "agent_name": c.agent_name,
+        "status": c.status,
+        "duration_ms": c.duration_ms,
+        "cost": c.cost,
+        "timestamp": c.timestamp.isoformat(),
+        "error": c.error,
+        "trace_id": c.trace_id,
+        "span_id": c.span_id,
+        "parent_span_id": c.parent_span_id
+    }
+
+
+def _load_payloads(
+    session,
+    hashes,
+    decode: Callable[[str, bytes], Any] = decode_payload
+) -> Dict[str, Any]:
+    """Decoded payloads by hash, read in chunks of 500 hashes"""
+    wanted = list({digest for digest in hashes if digest})
+    payloads = {}
+    for i in range(0, len(wanted), 500):
+        rows = (
+            session.query(Payload.hash, Payload.codec, Payload.data)
+            .filter(Payload.hash.in_(wanted[i:i + 500]))
+        )
+        for digest, codec, data in rows:
+            payloads[digest] = decode(codec, data)
+    return payloads
+
+
+def _with_payloads(call: Call, payloads: Dict[str, Any]) -> Tuple[Any, Any]:
+    """(input_data, output_data) of a call - inline on rows from before payloads"""
+    return (
+        payloads.get(call.input_hash) if call.input_hash else call.input_data,
+        payloads.get(call.output_hash) if call.output_hash else call.output_data
+    )
+
+
+class Storage(StorageBackend):
     """SQLite storage for Argus"""
     
-    def __init__(self, db_path: str = "argus.db"):
+    def __init__(self, db_path: str = "argus.db", profile: str = DEFAULT_PROFILE):
+        """
+        Args:
+            db_path: Path to SQLite database
+            profile: Pragma profile applied to every connection - "durable",
+                "balanced", "concurrent" (WAL) or "fast" (see argus.profiles)
+        """
+        check_profile(profile)
+        self.profile = profile
+        self.db_path = db_path
         self.engine = create_engine(f"sqlite:///{db_path}")
+        event.listen(
+            self.engine,
+            "connect",
+            lambda dbapi_connection, _: _on_connect(dbapi_connection, profile)
+        )
         Base.metadata.create_all(self.engine)
+        migrate(self.engine)
         self.Session = sessionmaker(bind=self.engine)
+        
+        # Agents this process has already registered: name -> tags
+        self._known_agents: Dict[str, Tuple[str, ...]] = {}
+        self._registry_lock = threading.Lock()
     
     def register_agent(self, name: str, tags: List[str]):
-        """Register or update an agent"""
-        session = self.Session()
-        try:
-            agent = session.query(Agent).filter_by(name=name).first()
-            if not agent:
-                agent = Agent(name=name, tags=tags)
-                session.add(agent)
+        """
+        Register or update an agent
+        
+        Cached per process - once an agent is registered with the same
+        tags, further calls return without touching the database.
+        """
+        tags_key = tuple(tags or ())
+        if self._known_agents.get(name) == tags_key:
+            return
+        
+        with self._registry_lock:
+            if self._known_agents.get(name) == tags_key:
+                return
+            
+            session = self.Session()
+            try:
+                agent = session.query(Agent).filter_by(name=name).first()
+                if not agent:
+                    agent = Agent(name=name, tags=list(tags_key))
+                    session.add(agent)
+                elif tuple(agent.tags or ()) != tags_key:
+                    agent.tags = list(tags_key)
                 session.commit()
-        finally:
-            session.close()
+            except IntegrityError:
+                # Another process registered it first
+                session.rollback()
+            finally:
+                session.close()
+            
+            self._known_agents[name] = tags_key
+    
+    def clear_agent_cache(self):
+        """Forget which agents were registered by this process"""
+        with self._registry_lock:
+            self._known_agents.clear()
+    
+    def log_calls(self, calls: List[Dict[str, Any]]):
+        """
+        Log a batch of agent calls in a single transaction
+        
+        Each item takes the same keys as log_call() ("sampled" and the
+        trace fields are optional).
+        Items may also carry "tags" - the agent is then registered if it
+        doesn't exist yet.
+        
+        This is the write hot path, so it skips the ORM: rows go through
+        one prepared INSERT with executemany() on the sqlite3 connection,
+        and each agent's totals and minute/hour/day rollups are folded in
+        with a single upsert per agent (and bucket) per batch. Input and
+        output data go to the payloads table, compressed and stored once
+        per distinct payload; the call row only keeps their hashes.
+        """
+        self._log_calls(calls)
     
-    def log_call(
+    def _log_calls(
         self,
-        call_id: str,
-        agent_name: str,
-        input_data: Dict[str, Any],
-        output_data: Dict[str, Any],
-        status: str,
-        error: Optional[str],
-        duration_ms: int,
-        cost: float,
-        timestamp: datetime
+        calls: List[Dict[str, Any]],
+        statements: Sequence[Tuple[str, Sequence[Any]]] = (),
+        replay: bool = False
     ):
-        """Log an agent call"""
-        session = self.Session()
-        try:
-            # Create call record
-            call = Call(
-                call_id=call_id,
-                agent_name=agent_name,
-                input_data=input_data,
-                output_data=output_data,
-                status=status,
-                error=error,
-                duration_ms=duration_ms,
-                cost=cost,
-                timestamp=timestamp
-            )
-            session.add(call)
+        """
+        log_calls(), also running statements (SQL, parameters) in its transaction
+        
+        replay marks a batch that may have been partly written before, by
+        a run that crashed in between committing partition files and the
+        main database (see PartitionedStorage._insert_calls()).
+        """
+        if not calls:
+            return
+        
+        for record in calls:
+            if "tags" in record:
+                self.register_agent(record["agent_name"], record["tags"])
+        
+        rows = []
+        payloads = PayloadBatch()
+        totals: Dict[str, List[Any]] = {}
+        rollups = RollupBatch()
+        for record in calls:
+            agent_name = record["agent_name"]
+            status = record["status"]
+            duration_ms = record["duration_ms"]
+            cost = record["cost"]
+            called_at = record["timestamp"] or datetime.utcnow()
+            timestamp = _format_timestamp(called_at)
             
-            # Update agent stats
-            agent = session.query(Agent).filter_by(name=agent_name).first()
-            if agent:
-                agent.total_calls += 1
-                agent.total_cost += cost
-                if status == "error":
-                    agent.total_errors += 1
-                
-                # Update average duration
-                if agent.total_calls == 1:
-                    agent.avg_duration_ms = duration_ms
-                else:
-                    agent.avg_duration_ms = (
-                        (agent.avg_duration_ms * (agent.total_calls - 1) + duration_ms)
-                        / agent.total_calls
-                    )
-                
-                agent.last_called_at = timestamp
+            if record.get("sampled", True):
+                rows.append((
+                    record["call_id"],
+                    agent_name,
+                    payloads.add(record["input_data"]),
+                    payloads.add(record["output_data"]),
+                    status,
+                    record["error"],
+                    duration_ms,
+                    cost,
+                    timestamp,
+                    record.get("trace_id"),
+                    record.get("span_id"),
+                    record.get("parent_span_id")
+                ))
             
-            session.commit()
+            # calls, cost, errors, duration sum/min/max, sketch, last called
+            agent_totals = totals.get(agent_name)
+            if agent_totals is None:
+                agent_totals = totals[agent_name] = [
+                    0, 0.0, 0, 0.0, duration_ms, duration_ms, LatencySketch(), None
+                ]
+            agent_totals[0] += 1
+            agent_totals[1] += cost
+            if status == "error":
+                agent_totals[2] += 1
+            agent_totals[3] += duration_ms
+            if duration_ms < agent_totals[4]:
+                agent_totals[4] = duration_ms
+            if duration_ms > agent_totals[5]:
+                agent_totals[5] = duration_ms
+            agent_totals[6].add(duration_ms)
+            agent_totals[7] = timestamp
+            
+            rollups.add(agent_name, called_at, status, duration_ms, cost)
+        
+        created_at = _format_timestamp(datetime.utcnow())
+        conn = self.engine.raw_connection()
+        try:
+            cursor = conn.cursor()
+            if rows:
+                self._insert_calls(cursor, rows, payloads, replay)
+            cursor.executemany(_UPSERT_AGENT_TOTALS, [
+                (
+                    agent_name,
+                    # Only used if the row doesn't exist yet - e.g. the
+                    # database was wiped after this process registered it
+                    json.dumps(list(self._known_agents.get(agent_name, ()))),
+                    *agent_totals[:6],
+                    agent_totals[6].to_bytes(),
+                    created_at,
+                    agent_totals[7]
+                )
+                for agent_name, agent_totals in totals.items()
+            ])
+            cursor.executemany(_UPSERT_ROLLUP, rollups.rows(_format_timestamp))
+            for sql, params in statements:
+                cursor.execute(sql, params)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
         finally:
-            session.close()
+            conn.close()
+    
+    def _insert_calls(self, cursor, rows: List[tuple], payloads: PayloadBatch, replay: bool = False):
+        """Write call rows (_INSERT_CALL parameters) and their payloads as part of the batch"""
+        cursor.executemany(_INSERT_PAYLOAD, payloads.rows())
+        cursor.executemany(_INSERT_CALL, rows)
     
     def get_stats(self, agent_name: Optional[str] = None) -> Dict[str, Any]:
         """Get statistics"""
@@ -126,7 +511,10 @@ class Storage:
                     "total_calls": agent.total_calls,
                     "total_cost": agent.total_cost,
                     "total_errors": agent.total_errors,
-                    "avg_duration_ms": agent.avg_duration_ms,
+                    "avg_duration_ms": _avg_duration(agent),
+                    "min_duration_ms": agent.min_duration_ms,
+                    "max_duration_ms": agent.max_duration_ms,
+                    "latency_percentiles": percentiles_of(agent.latency_sketch),
                     "error_rate": agent.total_errors / agent.total_calls if agent.total_calls > 0 else 0,
                     "last_called_at": agent.last_called_at.isoformat() if agent.last_called_at else None
                 }
@@ -141,7 +529,8 @@ class Storage:
                             "name": a.name,
                             "total_calls": a.total_calls,
                             "total_cost": a.total_cost,
-                            "avg_duration_ms": a.avg_duration_ms
+                            "avg_duration_ms": _avg_duration(a),
+                            "latency_percentiles": percentiles_of(a.latency_sketch)
                         }
                         for a in agents
                     ]
@@ -161,7 +550,10 @@ class Storage:
                     "total_calls": a.total_calls,
                     "total_cost": a.total_cost,
                     "total_errors": a.total_errors,
-                    "avg_duration_ms": a.avg_duration_ms,
+                    "avg_duration_ms": _avg_duration(a),
+                    "min_duration_ms": a.min_duration_ms,
+                    "max_duration_ms": a.max_duration_ms,
+                    "latency_percentiles": percentiles_of(a.latency_sketch),
                     "last_called_at": a.last_called_at.isoformat() if a.last_called_at else None
                 }
                 for a in agents
@@ -169,72 +561,918 @@ class Storage:
         finally:
             session.close()
     
-    def get_calls(
+    def _rollup_rows(
         self,
-        agent_name: Optional[str] = None,
-        limit: int = 100
+        resolution: str,
+        agent_name: Optional[str],
+        since: Optional[datetime],
+        until: Optional[datetime]
     ) -> List[Dict[str, Any]]:
-        """Get recent calls"""
+        """Rollup rows including their serialized sketches"""
         session = self.Session()
         try:
-            query = session.query(Call)
+            query = session.query(Rollup).filter(Rollup.resolution == resolution)
+            if since is not None:
+                query = query.filter(Rollup.bucket_start >= bucket_start(since, resolution))
+            if until is not None:
+                query = query.filter(Rollup.bucket_start < until)
             if agent_name:
-                query = query.filter_by(agent_name=agent_name)
-            
-            calls = query.order_by(Call.timestamp.desc()).limit(limit).all()
+                query = query.filter(Rollup.agent_name == agent_name)
             
             return [
                 {
+                    "agent_name": r.agent_name,
+                    "bucket_start": r.bucket_start.isoformat(),
+                    "calls": r.calls,
+                    "errors": r.errors,
+                    "cost": r.cost,
+                    "sum_duration_ms": r.sum_duration_ms,
+                    "min_duration_ms": r.min_duration_ms,
+                    "max_duration_ms": r.max_duration_ms,
+                    "histogram": r.histogram,
+                    "latency_sketch": r.latency_sketch
+                }
+                for r in query.order_by(Rollup.bucket_start, Rollup.agent_name).all()
+            ]
+        finally:
+            session.close()
+    
+    def _call_sessions(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[sessionmaker]:
+        """
+        Session factories for every database holding calls in [since, until)
+        
+        Newest data first. A single-file Storage only has its own.
+        """
+        return [self.Session]
+    
+    def _call_stores(self) -> List[Tuple[str, sessionmaker]]:
+        """(key, session factory) of every database holding calls, oldest first"""
+        return [("main", self.Session)]
+    
+    def get_calls_page(
+        self,
+        agent_name: Optional[str] = None,
+        limit: int = 100,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        status: Optional[str] = None,
+        min_duration_ms: Optional[float] = None,
+        max_duration_ms: Optional[float] = None,
+        min_cost: Optional[float] = None,
+        tags: Optional[List[str]] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        One page of calls, newest first
+        
+        Pages are keyset-paginated on (timestamp, id): pass next_cursor
+        back in to get the page after this one. Nothing is skipped with
+        OFFSET, so every page costs the same however deep it is. Agent,
+        tags and status filters walk the (agent_name, timestamp) and
+        (status, timestamp) indexes; duration and cost are checked on the
+        rows those indexes lead to.
+        
+        Args:
+            agent_name: Only this agent's calls
+            limit: Max calls on the page
+            since: Only calls at or after this time
+            until: Only calls before this time
+            status: Only calls with this status ("success", "error")
+            min_duration_ms: Only calls taking at least this long
+            max_duration_ms: Only calls taking at most this long
+            min_cost: Only calls costing at least this much
+            tags: Only calls of agents that have all of these tags
+            cursor: next_cursor of the previous page
+        
+        Returns:
+            {"calls": [...], "next_cursor": str, or None on the last page}
+        
+        Raises:
+            ValueError: limit below 1, or a cursor that isn't one
+        """
+        check_limit(limit)
+        # One extra row tells us whether there is a next page
+        calls = self._newest_calls(
+            limit + 1,
+            decode_cursor(cursor) if cursor else None,
+            agent_name=agent_name,
+            since=since,
+            until=until,
+            status=status,
+            min_duration_ms=min_duration_ms,
+            max_duration_ms=max_duration_ms,
+            min_cost=min_cost,
+            tags=tags
+        )
+        
+        next_cursor = None
+        if len(calls) > limit:
+            calls = calls[:limit]
+            next_cursor = encode_cursor(calls[-1].timestamp, calls[-1].id)
+        
+        return {"calls": [_call_summary(c) for c in calls], "next_cursor": next_cursor}
+    
+    def _newest_calls(
+        self,
+        wanted: int,
+        after: Optional[Tuple[datetime, int]],
+        agent_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        status: Optional[str] = None,
+        min_duration_ms: Optional[float] = None,
+        max_duration_ms: Optional[float] = None,
+        min_cost: Optional[float] = None,
+        tags: Optional[List[str]] = None,
+        by_call_id: bool = False
+    ) -> List[Call]:
+        """
+        Up to wanted matching calls before keyset position after, newest first
+        
+        Calls with the same timestamp are ordered by row id, or by call_id
+        if by_call_id (after then holds a call_id).
+        """
+        agent_names = None
+        if tags:
+            agent_names = self._agents_tagged(tags)
+            if agent_name is not None:
+                agent_names = [name for name in agent_names if name == agent_name]
+            if not agent_names:
+                return []
+        elif agent_name is not None:
+            agent_names = [agent_name]
+        
+        # Partitions newer than the cursor can't hold the next page
+        upper = until
+        if after is not None:
+            past_cursor = after[0] + timedelta(microseconds=1)
+            upper = past_cursor if upper is None else min(upper, past_cursor)
+        
+        tie_break = Call.call_id if by_call_id else Call.id
+        calls = []
+        for Session in self._call_sessions(since, upper):
+            session = Session()
+            try:
+                query = session.query(Call)
+                if status is not None:
+                    query = query.filter(Call.status == status)
+                if since is not None:
+                    query = query.filter(Call.timestamp >= since)
+                if until is not None:
+                    query = query.filter(Call.timestamp < until)
+                if min_duration_ms is not None:
+                    query = query.filter(Call.duration_ms >= min_duration_ms)
+                if max_duration_ms is not None:
+                    query = query.filter(Call.duration_ms <= max_duration_ms)
+                if min_cost is not None:
+                    query = query.filter(Call.cost >= min_cost)
+                if after is not None:
+                    query = query.filter(tuple_(Call.timestamp, tie_break) < after)
+                query = query.order_by(Call.timestamp.desc(), tie_break.desc())
+                
+                needed = wanted - len(calls)
+                if agent_names is None:
+                    calls.extend(query.limit(needed).all())
+                else:
+                    # One index range per agent, merged - an IN list would
+                    # sort every matching row to find the newest
+                    found = []
+                    for name in agent_names:
+                        found.extend(query.filter(Call.agent_name == name).limit(needed).all())
+                    found.sort(
+                        key=lambda c: (c.timestamp, c.call_id if by_call_id else c.id),
+                        reverse=True
+                    )
+                    calls.extend(found[:needed])
+            finally:
+                session.close()
+            if len(calls) >= wanted:
+                break
+        
+        return calls
+    
+    def _agents_tagged(self, tags: List[str]) -> List[str]:
+        """Names of the agents that have every one of tags"""
+        wanted = set(tags)
+        session = self.Session()
+        try:
+            return [
+                name
+                for name, agent_tags in session.query(Agent.name, Agent.tags)
+                if wanted <= set(agent_tags or ())
+            ]
+        finally:
+            session.close()
+    
+    def _id_sessions(self, value: str) -> List[sessionmaker]:
+        """Session factories that can hold calls of a call or trace id"""
+        # Ids are ULIDs, so they tell us when the call or trace started
+        started = None
+        if len(value) == 26:
+            try:
+                started = id_timestamp(value).replace(tzinfo=None)
+            except (KeyError, ValueError, OverflowError, OSError):
+                pass
+        if started is not None:
+            return self._call_sessions(started, started + MAX_TRACE_DURATION)
+        return self._call_sessions()
+    
+    def get_call(self, call_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get one call with its input and output data
+        
+        Listing calls never reads payloads; this is where they're loaded.
+        
+        Returns:
+            The call, or None if it doesn't exist (or wasn't sampled)
+        """
+        for Session in self._id_sessions(call_id):
+            session = Session()
+            try:
+                c = (
+                    session.query(Call)
+                    .options(undefer(Call.input_data), undefer(Call.output_data))
+                    .filter_by(call_id=call_id)
+                    .first()
+                )
+                if c is None:
+                    continue
+                input_data, output_data = _with_payloads(
+                    c, _load_payloads(session, [c.input_hash, c.output_hash])
+                )
+                return {
                     "call_id": c.call_id,
                     "agent_name": c.agent_name,
+                    "input_data": input_data,
+                    "output_data": output_data,
                     "status": c.status,
                     "duration_ms": c.duration_ms,
                     "cost": c.cost,
                     "timestamp": c.timestamp.isoformat(),
-                    "error": c.error
+                    "error": c.error,
+                    "trace_id": c.trace_id,
+                    "span_id": c.span_id,
+                    "parent_span_id": c.parent_span_id
+                }
+            finally:
+                session.close()
+        return None
+    
+    def get_trace(self, trace_id: str) -> List[Dict[str, Any]]:
+        """Get every span of a trace, oldest first"""
+        calls = []
+        for Session in self._id_sessions(trace_id):
+            session = Session()
+            try:
+                calls.extend(
+                    session.query(Call)
+                    .filter_by(trace_id=trace_id)
+                    .order_by(Call.timestamp, Call.id)
+                    .all()
+                )
+            finally:
+                session.close()
+        calls.sort(key=lambda c: c.timestamp)
+        
+        return [
+            {
+                "call_id": c.call_id,
+                "agent_name": c.agent_name,
+                "trace_id": c.trace_id,
+                "span_id": c.span_id,
+                "parent_span_id": c.parent_span_id,
+                "status": c.status,
+                "duration_ms": c.duration_ms,
+                "cost": c.cost,
+                "timestamp": c.timestamp.isoformat(),
+                "error": c.error
+            }
+            for c in calls
+        ]
+    
+    def compact(
+        self,
+        retention: Optional[RetentionPolicy] = None,
+        chunk_size: int = 5000,
+        vacuum: bool = True,
+        full_vacuum: bool = False,
+        pause: float = 0.01
+    ) -> Dict[str, Any]:
+        """
+        Delete expired calls and rollups, then give the space back
+        
+        Rows are deleted in chunks of chunk_size, each in its own short
+        transaction with a pause in between, so agents writing at the same
+        time only ever wait for one chunk. Agent totals are never touched.
+        
+        Args:
+            retention: What to delete (default: RetentionPolicy())
+            chunk_size: Rows deleted per transaction
+            vacuum: Return free pages to the OS with an incremental vacuum
+                (databases created before auto_vacuum was enabled need one
+                full_vacuum first)
+            full_vacuum: Rebuild the whole file with VACUUM - blocks
+                writers while it runs, and enables incremental vacuum for
+                next time
+            pause: Seconds to sleep between chunks
+        
+        Returns:
+            Rows deleted per table (payloads no remaining call refers to
+            are deleted too), the bytes reclaimed and which vacuum ran
+            ("incremental", "full", "skipped" or "needs full_vacuum")
+        """
+        retention = retention or RetentionPolicy()
+        cutoffs = retention.cutoffs()
+        size_before = self._file_size()
+        started = time.perf_counter()
+        
+        calls_deleted, payloads_deleted = self._expire_calls(cutoffs, chunk_size, pause)
+        
+        expired_rollups = [
+            ("resolution = ? AND bucket_start < ?", [resolution, _format_timestamp(cutoff)])
+            for resolution, cutoff in cutoffs["rollups"].items()
+            if cutoff is not None
+        ]
+        
+        conn = self.engine.raw_connection()
+        try:
+            rollups_deleted = sum(
+                self._delete_in_chunks(conn, "rollups", where, params, chunk_size, pause)
+                for where, params in expired_rollups
+            )
+            
+            cursor = conn.cursor()
+            if full_vacuum:
+                conn.commit()
+                dbapi_connection = conn.driver_connection
+                isolation_level = dbapi_connection.isolation_level
+                dbapi_connection.isolation_level = None
+                try:
+                    cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                    cursor.execute("VACUUM")
+                finally:
+                    dbapi_connection.isolation_level = isolation_level
+                vacuumed = "full"
+            elif not vacuum:
+                vacuumed = "skipped"
+            elif cursor.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                vacuumed = "needs full_vacuum"
+            else:
+                # A few hundred pages at a time, same as the deletes
+                while cursor.execute("PRAGMA freelist_count").fetchone()[0]:
+                    cursor.execute("PRAGMA incremental_vacuum(500)").fetchall()
+                    conn.commit()
+                    time.sleep(pause)
+                vacuumed = "incremental"
+            cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+            conn.commit()
+        finally:
+            conn.close()
+        
+        size_after = self._file_size()
+        return {
+            "calls_deleted": calls_deleted,
+            "payloads_deleted": payloads_deleted,
+            "rollups_deleted": rollups_deleted,
+            "size_before": size_before,
+            "size_after": size_after,
+            "reclaimed_bytes": max(size_before - size_after, 0),
+            "vacuum": vacuumed,
+            "duration_s": round(time.perf_counter() - started, 3)
+        }
+    
+    def _expire_calls(
+        self,
+        cutoffs: Dict[str, Any],
+        chunk_size: int,
+        pause: float
+    ) -> Tuple[int, int]:
+        """Delete calls past their TTL; returns (calls, payloads) deleted"""
+        conn = self.engine.raw_connection()
+        try:
+            return self._expire_calls_in(conn, cutoffs, chunk_size, pause)
+        finally:
+            conn.close()
+    
+    @classmethod
+    def _expire_calls_in(
+        cls,
+        conn,
+        cutoffs: Dict[str, Any],
+        chunk_size: int,
+        pause: float
+    ) -> Tuple[int, int]:
+        """Expire calls in one database, then the payloads they orphaned"""
+        calls_deleted = sum(
+            cls._delete_in_chunks(conn, "calls", where, params, chunk_size, pause)
+            for where, params in _expired_call_filters(cutoffs)
+        )
+        payloads_deleted = 0
+        if calls_deleted:
+            payloads_deleted = cls._delete_in_chunks(
+                conn, "payloads", _ORPHAN_PAYLOADS, [], chunk_size, pause
+            )
+        return calls_deleted, payloads_deleted
+    
+    @staticmethod
+    def _delete_in_chunks(
+        conn,
+        table: str,
+        where: str,
+        params: List[Any],
+        chunk_size: int,
+        pause: float
+    ) -> int:
+        """DELETE matching rows chunk_size at a time, committing after each"""
+        cursor = conn.cursor()
+        deleted = 0
+        while True:
+            cursor.execute(
+                f"DELETE FROM {table} WHERE id IN "
+                f"(SELECT id FROM {table} WHERE {where} LIMIT ?)",
+                [*params, chunk_size]
+            )
+            conn.commit()
+            deleted += cursor.rowcount
+            if cursor.rowcount < chunk_size:
+                return deleted
+            time.sleep(pause)
+    
+    def _file_size(self) -> int:
+        """Bytes used on disk by the database and its WAL"""
+        return sum(
+            os.path.getsize(path)
+            for path in (self.db_path, self.db_path + "-wal")
+            if os.path.exists(path)
+        )
+    
+    def _call_chunks(
+        self,
+        payloads: bool,
+        chunk_size: int,
+        decode: Callable[[str, bytes], Any] = decode_payload,
+        agent_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        id_ranges: Optional[Dict[str, Tuple[int, int]]] = None
+    ) -> Iterator[Tuple[List[Any], Dict[str, Any]]]:
+        """
+        Matching call rows, chunk_size at a time
+        
+        Each chunk is its own short read, keyset-paginated, so memory
+        stays flat and no read transaction is held open while the caller
+        works through the rows.
+        
+        Args:
+            id_ranges: Instead of the filters, calls with after < id <= upto
+                in each database ("main" or a partition key -> (after,
+                upto)), in insertion order
+        
+        Yields:
+            (rows, payloads by hash decoded with decode) - rows have the
+            EXPORT_COLUMNS, plus hashes and inline payloads if payloads
+        """
+        table = Call.__table__
+        columns = [table.c[name] for name in EXPORT_COLUMNS] + [table.c.id]
+        if payloads:
+            columns += [
+                table.c.input_hash, table.c.output_hash,
+                table.c.input_data, table.c.output_data
+            ]
+        
+        query = select(*columns)
+        if id_ranges is not None:
+            # Oldest first by time, within each database by insertion
+            query = query.order_by(table.c.id)
+            chunks = [
+                (Session, query.where(table.c.id <= id_ranges[key][1]), id_ranges[key][0])
+                for key, Session in self._call_stores()
+                if key in id_ranges
+            ]
+        else:
+            if agent_name is not None:
+                query = query.where(table.c.agent_name == agent_name)
+            if since is not None:
+                query = query.where(table.c.timestamp >= since)
+            if until is not None:
+                query = query.where(table.c.timestamp < until)
+            query = query.order_by(table.c.timestamp, table.c.id)
+            chunks = [(Session, query, None) for Session in reversed(self._call_sessions(since, until))]
+        
+        for Session, query, after in chunks:
+            query = query.limit(chunk_size)
+            while True:
+                session = Session()
+                try:
+                    chunk = query
+                    if id_ranges is not None:
+                        chunk = chunk.where(table.c.id > after)
+                    elif after is not None:
+                        chunk = chunk.where(tuple_(table.c.timestamp, table.c.id) > after)
+                    rows = session.execute(chunk).all()
+                    loaded = _load_payloads(session, (
+                        digest for row in rows for digest in (row.input_hash, row.output_hash)
+                    ), decode) if payloads else {}
+                finally:
+                    session.close()
+                
+                if rows:
+                    yield rows, loaded
+                if len(rows) < chunk_size:
+                    break
+                after = rows[-1].id if id_ranges is not None else (rows[-1].timestamp, rows[-1].id)
+    
+    def iter_calls(
+        self,
+        agent_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        payloads: bool = True,
+        chunk_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Every matching call, oldest first, read chunk_size rows at a time
+        
+        Args:
+            agent_name: Only this agent's calls
+            since: Only calls at or after this time
+            until: Only calls before this time
+            payloads: Include input_data/output_data
+            chunk_size: Rows per read
+        """
+        return self._iter_calls(
+            payloads, chunk_size, agent_name=agent_name, since=since, until=until
+        )
+    
+    def _iter_calls(self, payloads: bool, chunk_size: int, **selection: Any) -> Iterator[Dict[str, Any]]:
+        """iter_calls() over any _call_chunks() selection"""
+        for rows, loaded in self._call_chunks(payloads, chunk_size, **selection):
+            for row in rows:
+                call = {
+                    "call_id": row.call_id,
+                    "agent_name": row.agent_name,
+                    "status": row.status,
+                    "duration_ms": row.duration_ms,
+                    "cost": row.cost,
+                    "timestamp": row.timestamp.isoformat(),
+                    "error": row.error,
+                    "trace_id": row.trace_id,
+                    "span_id": row.span_id,
+                    "parent_span_id": row.parent_span_id
+                }
+                if payloads:
+                    call["input_data"], call["output_data"] = _with_payloads(row, loaded)
+                yield call
+    
+    def _iter_call_columns(
+        self,
+        payloads: bool,
+        chunk_size: int,
+        **selection: Any
+    ) -> Iterator[Dict[str, Sequence[Any]]]:
+        """iter_call_columns() over any _call_chunks() selection"""
+        for rows, loaded in self._call_chunks(
+            payloads, chunk_size, decode_payload_text, **selection
+        ):
+            values = list(zip(*rows))
+            columns = dict(zip(EXPORT_COLUMNS, values))
+            if payloads:
+                n = len(EXPORT_COLUMNS) + 1
+                for name, hashes, inline in (
+                    ("input_data", values[n], values[n + 2]),
+                    ("output_data", values[n + 1], values[n + 3])
+                ):
+                    columns[name] = [
+                        loaded.get(digest) if digest
+                        else None if data is None else json.dumps(data)
+                        for digest, data in zip(hashes, inline)
+                    ]
+            yield columns
+    
+    def export_since_watermark(
+        self,
+        name: str,
+        filename: str,
+        format: str = "jsonl",
+        compression: Optional[str] = None,
+        chunk_size: Optional[int] = None
+    ) -> int:
+        """
+        Export only the calls added since the last export under name
+        
+        Each watermark remembers the last call id exported from each
+        database. An export reads just the new id range, so it costs time
+        proportional to the new calls, not to the whole history.
+        
+        Exactly once across crashes and restarts: filename + ".tmp" is
+        created, the range is recorded as pending, and the calls are
+        written to the temp file, fsynced and renamed into place before
+        the range is committed. A run that finds a pending range exports
+        it again if the temp file is still there, and commits it
+        otherwise (the rename happened). Only the database and the temp
+        file decide - filename can be shipped, deleted or reused as soon
+        as this returns. Run one export per name at a time.
+        
+        Args:
+            name: Watermark (destination) name
+            filename: Output path - nothing is written if there's nothing new
+            format: "csv", "json", "jsonl" or "parquet"
+            compression: As for export()
+            chunk_size: As for export()
+        
+        Returns:
+            Number of calls exported
+        """
+        check_format(format)
+        if compression is None and format != "parquet":
+            # From filename - the temp file's extension is always .tmp
+            compression = infer_compression(filename)
+        positions = self._recover_watermark(name)
+        
+        # SQLite hands out ids in commit order and never reuses them
+        # (AUTOINCREMENT), so everything up to the current max is final -
+        # later calls get higher ids
+        pending, ranges = {}, {}
+        for key, Session in self._call_stores():
+            session = Session()
+            try:
+                upto = session.query(func.max(Call.id)).scalar() or 0
+            finally:
+                session.close()
+            after = positions.get(key, 0)
+            if upto < after:
+                # A different file under the same key - the partition was
+                # dropped and created again
+                after = 0
+            if upto > after:
+                ranges[key] = (after, upto)
+            # Dropped partitions fall out of the watermark here
+            pending[key] = upto
+        
+        if not ranges:
+            return 0
+        
+        # The temp file exists for as long as the range is pending and
+        # not yet renamed, so recovery never has to look at filename
+        temp_path = filename + ".tmp"
+        open(temp_path, "wb").close()
+        self._set_watermark(name, pending_positions=pending, pending_file=os.path.abspath(filename))
+        
+        exported = self._export(temp_path, format, compression, chunk_size, id_ranges=ranges)
+        with open(temp_path, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(temp_path, filename)
+        _fsync_directory(filename)
+        
+        self._commit_watermark(name, exported)
+        return exported
+    
+    def _recover_watermark(self, name: str) -> Dict[str, int]:
+        """Finish or roll back an interrupted export; returns committed positions"""
+        session = self.Session()
+        try:
+            watermark = session.query(ExportWatermark).filter_by(name=name).first()
+            if watermark is None:
+                return {}
+            if watermark.pending_file is not None:
+                temp_path = watermark.pending_file + ".tmp"
+                if os.path.exists(temp_path):
+                    # Never renamed into place - export the range again
+                    os.remove(temp_path)
+                else:
+                    # Renamed into place, crashed before committing
+                    watermark.positions = watermark.pending_positions
+                watermark.pending_positions = None
+                watermark.pending_file = None
+                session.commit()
+            return dict(watermark.positions or {})
+        finally:
+            session.close()
+    
+    def _set_watermark(self, name: str, **values: Any):
+        session = self.Session()
+        try:
+            watermark = session.query(ExportWatermark).filter_by(name=name).first()
+            if watermark is None:
+                watermark = ExportWatermark(name=name, positions={}, exported_calls=0)
+                session.add(watermark)
+            for key, value in values.items():
+                setattr(watermark, key, value)
+            watermark.updated_at = datetime.utcnow()
+            session.commit()
+        finally:
+            session.close()
+    
+    def _commit_watermark(self, name: str, exported: int):
+        session = self.Session()
+        try:
+            watermark = session.query(ExportWatermark).filter_by(name=name).one()
+            watermark.positions = watermark.pending_positions
+            watermark.pending_positions = None
+            watermark.pending_file = None
+            watermark.exported_calls = (watermark.exported_calls or 0) + exported
+            watermark.updated_at = datetime.utcnow()
+            session.commit()
+        finally:
+            session.close()
+    
+    def get_watermarks(self) -> List[Dict[str, Any]]:
+        """Every export watermark: positions, calls exported, last update"""
+        session = self.Session()
+        try:
+            return [
+                {
+                    "name": w.name,
+                    "positions": w.positions or {},
+                    "exported_calls": w.exported_calls or 0,
+                    "pending": w.pending_file,
+                    "updated_at": w.updated_at.isoformat() if w.updated_at else None
                 }
-                for c in calls
+                for w in session.query(ExportWatermark).order_by(ExportWatermark.name)
             ]
         finally:
             session.close()
     
-    def export(self, filename: str, format: str = "csv"):
-        """Export data"""
+    def reset_watermark(self, name: str):
+        """Forget a watermark - the next export under name starts from the beginning"""
         session = self.Session()
         try:
-            calls = session.query(Call).all()
-            
-            if format == "csv":
-                import csv
-                with open(filename, 'w', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow([
-                        "call_id", "agent_name", "status", "duration_ms",
-                        "cost", "timestamp", "error"
-                    ])
-                    for c in calls:
-                        writer.writerow([
-                            c.call_id, c.agent_name, c.status, c.duration_ms,
-                            c.cost, c.timestamp.isoformat(), c.error or ""
-                        ])
-            
-            elif format == "json":
-                data = [
-                    {
-                        "call_id": c.call_id,
-                        "agent_name": c.agent_name,
-                        "input_data": c.input_data,
-                        "output_data": c.output_data,
-                        "status": c.status,
-                        "duration_ms": c.duration_ms,
-                        "cost": c.cost,
-                        "timestamp": c.timestamp.isoformat(),
-                        "error": c.error
-                    }
-                    for c in calls
-                ]
-                with open(filename, 'w') as f:
-                    json.dump(data, f, indent=2)
+            session.query(ExportWatermark).filter_by(name=name).delete()
+            session.commit()
+        finally:
+            session.close()
+
+
+class PartitionedStorage(Storage):
+    """
+    Storage with calls split into one SQLite file per day or hour
+    
+    Agents, rollups and sketches stay in the main database; calls are
+    routed to argus_calls/calls-<day>.db by their timestamp. Queries with a
+    time range only open the partitions that overlap it, inserts only
+    lock the partition they write to, and expiring a partition is deleting
+    its file. Calls already in the main database (from before partitioning
+    was turned on) are still read, and expired chunk by chunk.
+    
+    A batch's calls and its agent totals are committed in separate
+    transactions (one per file touched), not atomically together.
+    """
+    
+    def __init__(
+        self,
+        db_path: str = "argus.db",
+        profile: str = DEFAULT_PROFILE,
+        partition: str = "day"
+    ):
+        """
+        Args:
+            db_path: Path to the main SQLite database
+            profile: Pragma profile for the main database and partitions
+            partition: "day" or "hour"
+        """
+        check_partition(partition)
+        self.partition = partition
+        self.partition_dir = partition_dir(db_path)
+        # key -> (engine, sessionmaker), opened on first use
+        self._partitions: Dict[str, Tuple[Any, sessionmaker]] = {}
+        self._partitions_lock = threading.Lock()
+        super().__init__(db_path, profile)
+    
+    def partitions(self) -> List[Partition]:
+        """Partition files on disk, oldest first"""
+        return list_partitions(self.partition_dir, self.partition)
+    
+    def _open_partition(self, key: str) -> Tuple[Any, sessionmaker]:
+        """Engine and session factory of a partition, creating it if needed"""
+        opened = self._partitions.get(key)
+        if opened is not None:
+            return opened
         
+        with self._partitions_lock:
+            opened = self._partitions.get(key)
+            if opened is None:
+                path = partition_for_key(self.partition_dir, key, self.partition).path
+                os.makedirs(self.partition_dir, exist_ok=True)
+                # No pool: a pooled connection holds the file (and its -wal
+                # and -shm) open for good, and there can be thousands of
+                # partitions
+                engine = create_engine(f"sqlite:///{path}", poolclass=NullPool)
+                profile = self.profile
+                event.listen(
+                    engine,
+                    "connect",
+                    lambda dbapi_connection, _: _on_connect(dbapi_connection, profile)
+                )
+                Base.metadata.create_all(engine, tables=[Call.__table__, Payload.__table__])
+                migrate(engine, partition=True)
+                opened = self._partitions[key] = (engine, sessionmaker(bind=engine))
+        return opened
+    
+    def _insert_calls(self, cursor, rows: List[tuple], payloads: PayloadBatch, replay: bool = False):
+        # Partition files commit before the main database, whose
+        # transaction holds the totals. A replayed batch skips the rows a
+        # crash in between left behind, and its totals are still applied.
+        insert = _INSERT_CALL_OR_IGNORE if replay else _INSERT_CALL
+        by_partition: Dict[str, List[tuple]] = {}
+        for row in rows:
+            # row[8] is the formatted timestamp
+            key = key_for_timestamp(row[8], self.partition)
+            by_partition.setdefault(key, []).append(row)
+        
+        for key, partition_rows in by_partition.items():
+            engine, _ = self._open_partition(key)
+            conn = engine.raw_connection()
+            try:
+                partition_cursor = conn.cursor()
+                # Each partition keeps the payloads of its own calls
+                partition_cursor.executemany(_INSERT_PAYLOAD, payloads.rows(
+                    digest for row in partition_rows for digest in row[2:4]
+                ))
+                partition_cursor.executemany(insert, partition_rows)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+    
+    def _call_sessions(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[sessionmaker]:
+        sessions = [
+            self._open_partition(p.key)[1]
+            for p in reversed(self.partitions())
+            if (since is None or p.end > since) and (until is None or p.start < until)
+        ]
+        # Unpartitioned calls from before, oldest of all
+        sessions.append(self.Session)
+        return sessions
+    
+    def _call_stores(self) -> List[Tuple[str, sessionmaker]]:
+        # Partition keys never collide with "main"
+        return [("main", self.Session)] + [
+            (p.key, self._open_partition(p.key)[1]) for p in self.partitions()
+        ]
+    
+    def _expire_calls(
+        self,
+        cutoffs: Dict[str, Any],
+        chunk_size: int,
+        pause: float
+    ) -> Tuple[int, int]:
+        deleted, payloads_deleted = super()._expire_calls(cutoffs, chunk_size, pause)
+        
+        # A partition can go as a whole once it's expired for every agent
+        agent_cutoffs = [cutoffs["calls"], *cutoffs["agents"].values()]
+        drop_before = None if None in agent_cutoffs else min(agent_cutoffs)
+        # ...and needs row-by-row deletes if it's expired for some of them
+        known_cutoffs = [c for c in agent_cutoffs if c is not None]
+        
+        for partition in self.partitions():
+            if drop_before is not None and partition.end <= drop_before:
+                # Its payloads go with the file
+                deleted += self.drop_partition(partition.key)
+            elif known_cutoffs and partition.start < max(known_cutoffs):
+                engine, _ = self._open_partition(partition.key)
+                conn = engine.raw_connection()
+                try:
+                    calls_deleted, orphans_deleted = self._expire_calls_in(
+                        conn, cutoffs, chunk_size, pause
+                    )
+                finally:
+                    conn.close()
+                deleted += calls_deleted
+                payloads_deleted += orphans_deleted
+        return deleted, payloads_deleted
+    
+    def drop_partition(self, key: str) -> int:
+        """Delete a partition file; returns the number of calls it held"""
+        engine, Session = self._open_partition(key)
+        session = Session()
+        try:
+            count = session.query(Call).count()
         finally:
             session.close()
+        
+        with self._partitions_lock:
+            self._partitions.pop(key, None)
+        engine.dispose()
+        path = partition_for_key(self.partition_dir, key, self.partition).path
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        return count
+    
+    def _file_size(self) -> int:
+        return super()._file_size() + sum(
+            os.path.getsize(path)
+            for p in self.partitions()
+            for path in (p.path, p.path + "-wal")
+            if os.path.exists(path)
+        )
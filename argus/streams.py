@@ -0,0 +1,265 @@
+"""
+Stream instrumentation - time generators and async iterators returned by agents
+"""
+
+import queue
+import time
+import weakref
+from types import AsyncGeneratorType, GeneratorType
+from typing import Any, Callable, Dict, Optional
+
+# Stream classes of LLM SDKs, by top-level package - matched by name so the
+# SDKs never have to be imported
+_SDK_STREAMS = {
+    "openai": ("Stream", "AsyncStream"),
+    "anthropic": ("Stream", "AsyncStream", "MessageStream", "AsyncMessageStream"),
+}
+
+
+# Streams garbage collected before they finished, as (on_finish, stats,
+# end_time) - put there by a finalizer, which mustn't take locks or write
+_collected: "queue.SimpleQueue" = queue.SimpleQueue()
+
+
+def _collect(on_finish: Callable, stats: "StreamStats"):
+    _collected.put((on_finish, stats, time.time()))
+
+
+def finish_collected():
+    """
+    Log the calls of streams garbage collected since the last call
+    
+    Called by Watch on its next write, flush or close - outside any
+    finalizer, so on_finish is free to take locks.
+    """
+    pending = []
+    while True:
+        try:
+            pending.append(_collected.get_nowait())
+        except queue.Empty:
+            break
+    
+    # Taken all at once - on_finish writes, which calls back in here
+    for on_finish, stats, end_time in pending:
+        try:
+            on_finish("success", None, stats, end_time, True)
+        except Exception:
+            import logging
+            logging.getLogger(__name__).exception("Argus: failed to log a collected stream")
+
+
+def _is_sdk_stream(obj: Any, asynchronous: bool) -> bool:
+    for cls in type(obj).__mro__:
+        names = _SDK_STREAMS.get(cls.__module__.partition(".")[0])
+        if names and cls.__name__ in names and cls.__name__.startswith("Async") == asynchronous:
+            return True
+    return False
+
+
+def is_stream(obj: Any) -> bool:
+    """
+    True for generators and LLM SDK stream objects
+    
+    Other iterators (map, zip, cursors, files, ...) are returned untouched -
+    wrapping them would change what the agent returns.
+    """
+    return isinstance(obj, GeneratorType) or _is_sdk_stream(obj, asynchronous=False)
+
+
+def is_async_stream(obj: Any) -> bool:
+    """True for async generators and async LLM SDK stream objects"""
+    return isinstance(obj, AsyncGeneratorType) or _is_sdk_stream(obj, asynchronous=True)
+
+
+class StreamStats:
+    """
+    Timing of a stream of items
+    
+    Tracks time-to-first-item, total duration, item count and inter-item
+    latency (min/mean/max) without keeping the items or their timestamps.
+    """
+    
+    def __init__(self, start_time: float):
+        self.start_time = start_time
+        self.first_item_time: Optional[float] = None
+        self.last_item_time: Optional[float] = None
+        self.items = 0
+        self.gap_sum = 0.0
+        self.gap_min: Optional[float] = None
+        self.gap_max: Optional[float] = None
+        self.last_item: Any = None
+    
+    def record(self, item: Any):
+        now = time.time()
+        if self.last_item_time is None:
+            self.first_item_time = now
+        else:
+            gap = now - self.last_item_time
+            self.gap_sum += gap
+            if self.gap_min is None or gap < self.gap_min:
+                self.gap_min = gap
+            if self.gap_max is None or gap > self.gap_max:
+                self.gap_max = gap
+        self.last_item_time = now
+        self.items += 1
+        self.last_item = item
+    
+    def to_dict(self, end_time: float) -> Dict[str, Any]:
+        gaps = self.items - 1
+        return {
+            "items": self.items,
+            "ttft_ms": (
+                round((self.first_item_time - self.start_time) * 1000, 3)
+                if self.first_item_time is not None else None
+            ),
+            "duration_ms": round((end_time - self.start_time) * 1000, 3),
+            "inter_item_ms": {
+                "mean": round(self.gap_sum / gaps * 1000, 3),
+                "min": round(self.gap_min * 1000, 3),
+                "max": round(self.gap_max * 1000, 3)
+            } if gaps > 0 else None
+        }
+
+
+class _StreamBase:
+    """Shared bookkeeping for sync and async stream proxies"""
+    
+    def __init__(
+        self,
+        stream: Any,
+        start_time: float,
+        on_finish: Callable[[str, Optional[str], StreamStats, float], None]
+    ):
+        """
+        Args:
+            stream: The iterator returned by the agent
+            start_time: When the agent call started
+            on_finish: Called exactly once with (status, error, stats,
+                end_time, collected) when the stream is exhausted, closed
+                or fails - or by finish_collected() once it was garbage
+                collected (collected=True)
+        """
+        self._stream = stream
+        self._stats = StreamStats(start_time)
+        self._on_finish = on_finish
+        self._finished = False
+        # Only queues the call - see finish_collected()
+        self._finalizer = weakref.finalize(self, _collect, on_finish, self._stats)
+    
+    def _finish(self, status: str = "success", error: Optional[str] = None):
+        if self._finished:
+            return
+        self._finished = True
+        self._finalizer.detach()
+        self._on_finish(status, error, self._stats, time.time(), False)
+    
+    def __getattr__(self, name: str) -> Any:
+        # Anything we don't proxy (response headers, etc.) comes from the stream
+        if name in ("_stream", "_stats", "_on_finish", "_finished", "_finalizer"):
+            raise AttributeError(name)
+        return getattr(self._stream, name)
+
+
+class WatchedStream(_StreamBase):
+    """Proxy for a sync iterator/generator that logs the call when it ends"""
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self) -> Any:
+        try:
+            item = next(self._stream)
+        except StopIteration:
+            self._finish()
+            raise
+        except Exception as e:
+            self._finish("error", str(e))
+            raise
+        self._stats.record(item)
+        return item
+    
+    def send(self, value: Any) -> Any:
+        send = self._stream.send
+        try:
+            item = send(value)
+        except StopIteration:
+            self._finish()
+            raise
+        except Exception as e:
+            self._finish("error", str(e))
+            raise
+        self._stats.record(item)
+        return item
+    
+    def throw(self, *args) -> Any:
+        throw = self._stream.throw
+        try:
+            item = throw(*args)
+        except StopIteration:
+            self._finish()
+            raise
+        except Exception as e:
+            self._finish("error", str(e))
+            raise
+        self._stats.record(item)
+        return item
+    
+    def close(self):
+        try:
+            close = getattr(self._stream, "close", None)
+            if close:
+                close()
+        finally:
+            self._finish()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncWatchedStream(_StreamBase):
+    """Proxy for an async iterator/generator that logs the call when it ends"""
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self) -> Any:
+        try:
+            item = await self._stream.__anext__()
+        except StopAsyncIteration:
+            self._finish()
+            raise
+        except BaseException as e:
+            self._finish("error", str(e) or type(e).__name__)
+            raise
+        self._stats.record(item)
+        return item
+    
+    async def asend(self, value: Any) -> Any:
+        asend = self._stream.asend
+        try:
+            item = await asend(value)
+        except StopAsyncIteration:
+            self._finish()
+            raise
+        except BaseException as e:
+            self._finish("error", str(e) or type(e).__name__)
+            raise
+        self._stats.record(item)
+        return item
+    
+    async def aclose(self):
+        try:
+            aclose = getattr(self._stream, "aclose", None)
+            if aclose:
+                await aclose()
+        finally:
+            self._finish()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
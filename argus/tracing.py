@@ -0,0 +1,87 @@
+"""
+Tracing - trace/span ids propagated through nested agent calls
+"""
+
+import os
+from contextvars import ContextVar, Token
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from .ids import new_id
+
+
+class SpanContext(NamedTuple):
+    """Identity of the span currently running"""
+    
+    trace_id: str
+    span_id: str
+    sampled: bool = True
+
+
+_current_span: ContextVar[Optional[SpanContext]] = ContextVar(
+    "argus_current_span",
+    default=None
+)
+
+
+def new_trace_id() -> str:
+    # Time-ordered, so the trace_id index stays append-only too
+    return new_id()
+
+
+def new_span_id() -> str:
+    return os.urandom(8).hex()
+
+
+def current_span() -> Optional[SpanContext]:
+    """The innermost active span in this thread/task, if any"""
+    return _current_span.get()
+
+
+def child_span(head: Callable[[], bool]) -> Tuple[SpanContext, Optional[str]]:
+    """
+    Create a span under the current one (or a new trace)
+    
+    Args:
+        head: Head sampling decision, only consulted for new traces -
+            child spans inherit their parent's decision so traces are kept
+            or dropped as a whole
+    
+    Returns:
+        (span, parent_span_id)
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return SpanContext(new_trace_id(), new_span_id(), head()), None
+    return SpanContext(parent.trace_id, new_span_id(), parent.sampled), parent.span_id
+
+
+def activate(span: SpanContext) -> Token:
+    """Make span the current span; pass the token to deactivate()"""
+    return _current_span.set(span)
+
+
+def deactivate(token: Token):
+    _current_span.reset(token)
+
+
+class Span:
+    """
+    Handle for a watch.span() block
+    
+    Set output_data and cost before the block ends to have them logged.
+    """
+    
+    def __init__(self, name: str, context: SpanContext, parent_span_id: Optional[str]):
+        self.name = name
+        self.context = context
+        self.parent_span_id = parent_span_id
+        self.output_data = {}
+        self.cost = 0.0
+    
+    @property
+    def trace_id(self) -> str:
+        return self.context.trace_id
+    
+    @property
+    def span_id(self) -> str:
+        return self.context.span_id
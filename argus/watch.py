@@ -2,14 +2,27 @@
 Core Watch class - Main API for Argus
 """
 
+import os
+import sys
+import threading
 import time
-import uuid
+from contextlib import contextmanager
 from functools import wraps
-from typing import Callable, Any, Optional, Dict, List
+from typing import Callable, Any, Optional, Dict, List, Iterator
 from datetime import datetime
 
-from .storage import Storage
-from .dashboard import start_dashboard
+from .backends import BACKENDS, MemoryBackend, SegmentLogBackend
+from .writer import BatchWriter, QUEUE_POLICIES
+from .profiles import DEFAULT_PROFILE, check_profile
+from .partitions import check_partition
+from .capture import CapturePolicy, DEFAULT_LIMIT, resolve_payloads
+from .sampling import Sampler
+from .retention import RetentionPolicy
+from .streams import (
+    WatchedStream, AsyncWatchedStream, finish_collected, is_stream, is_async_stream
+)
+from .ids import new_id
+from .tracing import Span, SpanContext, child_span, activate, deactivate
 from .pricing import (
     calculate_cost,
     extract_openai_usage,
@@ -17,6 +30,27 @@ from .pricing import (
 )
 
 
+def _env_flag(name: str, default: bool) -> bool:
+    """Read a boolean environment variable"""
+    value = os.environ.get(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() not in ("0", "false", "no", "off")
+
+
+def _on_event_loop() -> bool:
+    """True when called from inside a running asyncio event loop"""
+    # No need to import asyncio just to find out it isn't running
+    asyncio = sys.modules.get("asyncio")
+    if asyncio is None:
+        return False
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
 class Watch:
     """
     Main Argus class
@@ -29,9 +63,139 @@ class Watch:
             return "result"
     """
     
-    def __init__(self, db_path: str = "argus.db"):
-        self.storage = Storage(db_path)
+    def __init__(
+        self,
+        db_path: str = "argus.db",
+        profile: str = DEFAULT_PROFILE,
+        partition: Optional[str] = None,
+        async_writes: bool = False,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_queue_size: int = 10000,
+        queue_policy: str = "block",
+        capture: str = "bounded",
+        capture_limit: int = DEFAULT_LIMIT,
+        spill_dir: Optional[str] = None,
+        sampling: Optional[Sampler] = None,
+        enabled: Optional[bool] = None,
+        retention: Optional[RetentionPolicy] = None,
+        backend: Any = None
+    ):
+        """
+        Args:
+            db_path: Path to SQLite database
+            profile: SQLite pragma profile - "durable" (fsync every
+                commit), "balanced" (default), "concurrent" (WAL, so readers
+                never wait on writers) or "fast" (WAL, no fsync)
+            partition: Store calls in one file per "day" or "hour" next
+                to the database (default: everything in one file)
+            async_writes: Queue calls and write them in batches from a
+                background thread instead of on the calling thread
+            batch_size: Calls per batch (async_writes only)
+            flush_interval: Max seconds a call waits before being written
+                (async_writes only)
+            max_queue_size: Bound on queued calls, 0 = unbounded
+                (async_writes only)
+            queue_policy: "block" or "drop" when the queue is full
+                (async_writes only)
+            capture: How arguments/results are stored - "off", "bounded"
+                (bounded repr of capture_limit chars) or "full" (large
+                payloads spill to files in spill_dir)
+            capture_limit: Max characters stored per captured value
+            spill_dir: Directory for "full" capture payloads
+                (default: <db name>_spill next to the database)
+            sampling: Sampler deciding which calls get a row in the calls
+                table (default: all of them). Agent totals always count
+                every call.
+            enabled: Turn tracking on/off (default: ARGUS_ENABLED env var,
+                on unless set to 0/false/no/off). Agents listed in
+                ARGUS_DISABLED_AGENTS (comma-separated) start disabled.
+            retention: What compact() deletes (default: calls after 30
+                days, minute/hour rollups after 2/90 days)
+            backend: Where data is kept - "sqlite" (default, the database
+                at db_path), "segments" (calls appended to log files,
+                folded into db_path in the background), "memory" (recent
+                calls in a ring buffer, nothing written to disk) or a
+                StorageBackend instance
+        """
+        check_profile(profile)
+        if partition is not None:
+            check_partition(partition)
+        if isinstance(backend, str) and backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+        if queue_policy not in QUEUE_POLICIES:
+            raise ValueError(
+                f"Unknown queue policy '{queue_policy}', expected one of {QUEUE_POLICIES}"
+            )
+        
+        # Storage (SQLAlchemy engine + database file) is opened on first use
+        self.db_path = db_path
+        self.profile = profile
+        self.partition = partition
+        self.backend = "sqlite" if backend is None else backend
+        self._storage = None if isinstance(self.backend, str) else self.backend
+        self._storage_lock = threading.Lock()
         self._active_calls = {}
+        self._spill_dir = spill_dir or os.path.splitext(db_path)[0] + "_spill"
+        self._capture = CapturePolicy(capture, capture_limit, self._spill_dir)
+        self._sampling = sampling
+        self._retention = retention
+        
+        # Read on every call - keep these plain attributes
+        if enabled is None:
+            enabled = _env_flag("ARGUS_ENABLED", default=True)
+        self._enabled = enabled
+        self._disabled_agents = {
+            a.strip() for a in os.environ.get("ARGUS_DISABLED_AGENTS", "").split(",")
+            if a.strip()
+        }
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._writer = None
+        self._writer_options = None
+        if async_writes:
+            # Started with the first call, together with the storage
+            self._writer_options = {
+                "batch_size": batch_size,
+                "flush_interval": flush_interval,
+                "max_queue_size": max_queue_size,
+                "policy": queue_policy
+            }
+    
+    @property
+    def storage(self):
+        """Storage backend, opened on first use"""
+        if self._storage is None:
+            with self._storage_lock:
+                if self._storage is None:
+                    if self.backend == "memory":
+                        self._storage = MemoryBackend()
+                    elif self.backend == "segments":
+                        self._storage = SegmentLogBackend(
+                            self.db_path, profile=self.profile, partition=self.partition
+                        )
+                    elif self.partition:
+                        from .storage import PartitionedStorage
+                        self._storage = PartitionedStorage(
+                            self.db_path, profile=self.profile, partition=self.partition
+                        )
+                    else:
+                        from .storage import Storage
+                        self._storage = Storage(self.db_path, profile=self.profile)
+        return self._storage
+    
+    @storage.setter
+    def storage(self, storage):
+        self._storage = storage
+    
+    def _get_writer(self) -> Optional[BatchWriter]:
+        """Background writer (async_writes only), started on first use"""
+        if self._writer is None and self._writer_options is not None:
+            storage = self.storage
+            with self._storage_lock:
+                if self._writer is None:
+                    self._writer = BatchWriter(storage, **self._writer_options)
+        return self._writer
     
     def agent(
         self,
@@ -40,7 +204,10 @@ class Watch:
         cost_per_call: Optional[float] = None,
         timeout: Optional[int] = None,
         provider: Optional[str] = None,
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        capture: Optional[str] = None,
+        capture_limit: Optional[int] = None,
+        sample_rate: Optional[float] = None
     ) -> Callable:
         """
         Decorator to watch an agent function
@@ -52,6 +219,23 @@ class Watch:
             timeout: Timeout in seconds
             provider: LLM provider ("openai", "anthropic", "cohere") for auto cost calculation
             model: Model name for auto cost calculation
+            capture: Override the Watch capture mode for this agent
+                ("off", "bounded" or "full")
+            capture_limit: Override the capture limit for this agent
+            sample_rate: Head sampling rate for this agent (tail rules from
+                the Watch sampler still apply)
+        
+        Coroutine functions (async def) are wrapped with an async wrapper
+        that times the awaited call and logs it without blocking the event
+        loop - call watch.flush() before reading stats in tests.
+        
+        Calls made while another watched call or span is running are
+        recorded as child spans of it (same trace_id, parent_span_id set).
+        
+        Generators, async generators and other iterators returned by the
+        agent are wrapped so the call is logged when the stream is
+        exhausted, closed or fails, with time-to-first-item, item count and
+        inter-item latency in output_data["stream"].
         
         Example:
             @watch.agent(name="email-bot", tags=["production"])
@@ -63,24 +247,148 @@ class Watch:
             def ask_gpt(prompt):
                 response = openai.ChatCompletion.create(...)
                 return response
+            
+            # Async agents work the same way:
+            @watch.agent(name="async-bot")
+            async def ask(prompt):
+                return await client.chat.completions.create(...)
         """
+        policy = self._capture_policy(capture, capture_limit)
+        sampler = self._sampling
+        if sample_rate is not None:
+            sampler = (sampler or Sampler()).with_rate(sample_rate)
+        
+        def head() -> bool:
+            return sampler.head(name) if sampler else True
+        
+        def finish(call_id, start_time, span, parent_span_id, input_data, output_data,
+                   status, error, cost, background=False, end_time=None):
+            """Apply tail sampling and persist a finished call"""
+            duration_ms = int(((end_time or time.time()) - start_time) * 1000)
+            sampled = span.sampled
+            if sampler:
+                sampled = sampler.keep(sampled, status, duration_ms, cost)
+            
+            record = {
+                "call_id": call_id,
+                "agent_name": name,
+                "input_data": input_data,
+                "output_data": output_data or {},
+                "status": status,
+                "error": error,
+                "duration_ms": duration_ms,
+                "cost": cost,
+                "timestamp": datetime.utcnow(),
+                "sampled": sampled,
+                "trace_id": span.trace_id,
+                "span_id": span.span_id,
+                "parent_span_id": parent_span_id
+            }
+            if background:
+                self._persist_in_background(record, tags=tags or [])
+            else:
+                self._persist(record, tags=tags or [])
+        
+        def watch_stream(result, call_id, start_time, span, parent_span_id,
+                         input_data, default_cost, background=False):
+            """Wrap a streamed result so the call is logged when it ends"""
+            background = background or is_async_stream(result)
+            
+            def on_finish(status, error, stats, end_time, collected):
+                output_data = {"stream": stats.to_dict(end_time)}
+                if policy.mode != "off":
+                    output_data["result"] = f"<stream of {stats.items} items>"
+                
+                # Usage usually arrives on the last chunk
+                cost = default_cost
+                if stats.last_item is not None:
+                    cost = self._resolve_cost(stats.last_item, default_cost, provider, model)
+                
+                # A garbage-collected stream is finished on some later write,
+                # which may be on an event loop - keep it off the caller
+                finish(call_id, start_time, span, parent_span_id, input_data, output_data,
+                       status, error, cost, background=background or collected,
+                       end_time=end_time)
+            
+            if is_async_stream(result):
+                return AsyncWatchedStream(result, start_time, on_finish)
+            return WatchedStream(result, start_time, on_finish)
+        
         def decorator(func: Callable) -> Callable:
+            import inspect  # Slow to import - only needed once something is decorated
+            
+            if inspect.iscoroutinefunction(func):
+                @wraps(func)
+                async def async_wrapper(*args, **kwargs) -> Any:
+                    if not self._enabled or name in self._disabled_agents:
+                        return await func(*args, **kwargs)
+                    
+                    # Start tracking
+                    call_id = new_id()
+                    start_time = time.time()
+                    span, parent_span_id = child_span(head)
+                    token = activate(span)
+                    
+                    # Capture input (rendered now unless async_writes is on)
+                    input_data = policy.capture_input(
+                        call_id, args, kwargs, snapshot=self._writer_options is None
+                    )
+                    
+                    # Execute coroutine
+                    error = None
+                    output_data = None
+                    status = "success"
+                    calculated_cost = cost_per_call or 0.0
+                    streaming = False
+                    
+                    try:
+                        result = await func(*args, **kwargs)
+                        
+                        # Streamed responses are logged when the stream ends
+                        if is_async_stream(result) or is_stream(result):
+                            streaming = True
+                            return watch_stream(
+                                result, call_id, start_time, span, parent_span_id,
+                                input_data, calculated_cost, background=True
+                            )
+                        
+                        output_data = policy.capture_output(call_id, result)
+                        calculated_cost = self._resolve_cost(
+                            result, calculated_cost, provider, model
+                        )
+                        return result
+                        
+                    except BaseException as e:
+                        # Includes asyncio.CancelledError
+                        error = str(e) or type(e).__name__
+                        status = "error"
+                        raise
+                        
+                    finally:
+                        deactivate(token)
+                        
+                        # Log call off the event loop
+                        if not streaming:
+                            finish(call_id, start_time, span, parent_span_id,
+                                   input_data, output_data, status, error,
+                                   calculated_cost, background=True)
+                
+                return async_wrapper
+            
             @wraps(func)
             def wrapper(*args, **kwargs) -> Any:
+                if not self._enabled or name in self._disabled_agents:
+                    return func(*args, **kwargs)
+                
                 # Start tracking
-                call_id = str(uuid.uuid4())
+                call_id = new_id()
                 start_time = time.time()
+                span, parent_span_id = child_span(head)
+                token = activate(span)
                 
-                # Prepare input data (sanitize)
-                input_data = {
-                    "args": str(args)[:500],  # Truncate
-                    "kwargs": {k: str(v)[:500] for k, v in kwargs.items()}
-                }
-                
-                # Register agent if not exists
-                self.storage.register_agent(
-                    name=name,
-                    tags=tags or []
+                # Capture input (rendered now unless async_writes is on)
+                input_data = policy.capture_input(
+                    call_id, args, kwargs, snapshot=self._writer_options is None
                 )
                 
                 # Execute function
@@ -88,34 +396,23 @@ class Watch:
                 output_data = None
                 status = "success"
                 calculated_cost = cost_per_call or 0.0
+                streaming = False
                 
                 try:
                     result = func(*args, **kwargs)
-                    output_data = {"result": str(result)[:500]}
-                    
-                    # Extract cost from result if it's a dict with 'cost' key
-                    if isinstance(result, dict) and 'cost' in result:
-                        calculated_cost = result['cost']
                     
-                    # Auto-calculate cost from LLM response
-                    elif provider and model:
-                        usage = None
-                        
-                        # Try to extract usage from response
-                        if provider.lower() == "openai":
-                            usage = extract_openai_usage(result)
-                        elif provider.lower() == "anthropic":
-                            usage = extract_anthropic_usage(result)
-                        
-                        # Calculate cost if usage found
-                        if usage:
-                            calculated_cost = calculate_cost(
-                                provider=provider,
-                                model=model,
-                                input_tokens=usage.get('input_tokens', 0),
-                                output_tokens=usage.get('output_tokens', 0)
-                            )
+                    # Generators/streams are logged when the stream ends
+                    if is_stream(result) or is_async_stream(result):
+                        streaming = True
+                        return watch_stream(
+                            result, call_id, start_time, span, parent_span_id,
+                            input_data, calculated_cost
+                        )
                     
+                    output_data = policy.capture_output(call_id, result)
+                    calculated_cost = self._resolve_cost(
+                        result, calculated_cost, provider, model
+                    )
                     return result
                     
                 except Exception as e:
@@ -124,25 +421,94 @@ class Watch:
                     raise
                     
                 finally:
-                    # Calculate metrics
-                    duration_ms = int((time.time() - start_time) * 1000)
+                    deactivate(token)
                     
                     # Log call
-                    self.storage.log_call(
-                        call_id=call_id,
-                        agent_name=name,
-                        input_data=input_data,
-                        output_data=output_data or {},
-                        status=status,
-                        error=error,
-                        duration_ms=duration_ms,
-                        cost=calculated_cost,
-                        timestamp=datetime.utcnow()
-                    )
+                    if not streaming:
+                        finish(call_id, start_time, span, parent_span_id,
+                               input_data, output_data, status, error,
+                               calculated_cost)
             
             return wrapper
         return decorator
     
+    def enable(self, agent: Optional[str] = None):
+        """
+        Turn tracking back on - globally, or for one agent
+        
+        Args:
+            agent: Agent name (default: all agents)
+        """
+        if agent is None:
+            self._enabled = True
+        else:
+            self._disabled_agents = self._disabled_agents - {agent}
+    
+    def disable(self, agent: Optional[str] = None):
+        """
+        Turn tracking off - decorated functions run untouched
+        
+        Args:
+            agent: Agent name (default: all agents)
+        """
+        if agent is None:
+            self._enabled = False
+        else:
+            self._disabled_agents = self._disabled_agents | {agent}
+    
+    def is_enabled(self, agent: Optional[str] = None) -> bool:
+        """Whether calls (of agent, if given) are being tracked"""
+        if not self._enabled:
+            return False
+        return agent is None or agent not in self._disabled_agents
+    
+    def _capture_policy(
+        self,
+        capture: Optional[str],
+        capture_limit: Optional[int]
+    ) -> CapturePolicy:
+        """Watch-wide capture policy, or a per-agent override"""
+        if capture is None and capture_limit is None:
+            return self._capture
+        return CapturePolicy(
+            capture or self._capture.mode,
+            capture_limit or self._capture.limit,
+            self._spill_dir
+        )
+    
+    @staticmethod
+    def _resolve_cost(
+        result: Any,
+        default_cost: float,
+        provider: Optional[str],
+        model: Optional[str]
+    ) -> float:
+        """Work out the cost of a call from its result"""
+        # Extract cost from result if it's a dict with 'cost' key
+        if isinstance(result, dict) and 'cost' in result:
+            return result['cost']
+        
+        # Auto-calculate cost from LLM response
+        if provider and model:
+            usage = None
+            
+            # Try to extract usage from response
+            if provider.lower() == "openai":
+                usage = extract_openai_usage(result)
+            elif provider.lower() == "anthropic":
+                usage = extract_anthropic_usage(result)
+            
+            # Calculate cost if usage found
+            if usage:
+                return calculate_cost(
+                    provider=provider,
+                    model=model,
+                    input_tokens=usage.get('input_tokens', 0),
+                    output_tokens=usage.get('output_tokens', 0)
+                )
+        
+        return default_cost
+    
     def start(
         self,
         agent_name: str,
@@ -154,11 +520,20 @@ class Watch:
         Returns:
             call_id: Use this to end tracking
         """
-        call_id = str(uuid.uuid4())
+        call_id = new_id()
+        if not self.is_enabled(agent_name):
+            self._active_calls[call_id] = None
+            return call_id
+        
+        span, parent_span_id = child_span(
+            lambda: self._sampling.head(agent_name) if self._sampling else True
+        )
         self._active_calls[call_id] = {
             "agent_name": agent_name,
             "input_data": input_data,
-            "start_time": time.time()
+            "start_time": time.time(),
+            "span": span,
+            "parent_span_id": parent_span_id
         }
         return call_id
     
@@ -176,41 +551,370 @@ class Watch:
             raise ValueError(f"Call ID {call_id} not found")
         
         call = self._active_calls.pop(call_id)
+        if call is None:
+            # Started while tracking was disabled
+            return
+        
         duration_ms = int((time.time() - call["start_time"]) * 1000)
+        status = "error" if error else "success"
+        
+        span = call["span"]
+        sampled = span.sampled
+        if self._sampling:
+            sampled = self._sampling.keep(sampled, status, duration_ms, cost)
+        
+        self._persist({
+            "call_id": call_id,
+            "agent_name": call["agent_name"],
+            "input_data": call["input_data"],
+            "output_data": output_data,
+            "status": status,
+            "error": error,
+            "duration_ms": duration_ms,
+            "cost": cost,
+            "timestamp": datetime.utcnow(),
+            "sampled": sampled,
+            "trace_id": span.trace_id,
+            "span_id": span.span_id,
+            "parent_span_id": call["parent_span_id"]
+        })
+    
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        tags: Optional[List[str]] = None,
+        input_data: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Span]:
+        """
+        Track a block of code as a span of the current trace
         
-        self.storage.log_call(
-            call_id=call_id,
-            agent_name=call["agent_name"],
-            input_data=call["input_data"],
-            output_data=output_data,
-            status="error" if error else "success",
-            error=error,
-            duration_ms=duration_ms,
-            cost=cost,
-            timestamp=datetime.utcnow()
+        The span is logged as a call of agent `name`. Watched calls made
+        inside the block become its children.
+        
+        Example:
+            with watch.span("retrieval", input_data={"query": q}) as span:
+                docs = search(q)
+                span.output_data = {"docs": len(docs)}
+        """
+        if not self.is_enabled(name):
+            yield Span(name, SpanContext("", "", False), None)
+            return
+        
+        sampler = self._sampling
+        context, parent_span_id = child_span(
+            lambda: sampler.head(name) if sampler else True
         )
+        handle = Span(name, context, parent_span_id)
+        token = activate(context)
+        start_time = time.time()
+        status = "success"
+        error = None
+        
+        try:
+            yield handle
+        except Exception as e:
+            error = str(e)
+            status = "error"
+            raise
+        finally:
+            deactivate(token)
+            duration_ms = int((time.time() - start_time) * 1000)
+            
+            sampled = context.sampled
+            if sampler:
+                sampled = sampler.keep(sampled, status, duration_ms, handle.cost)
+            
+            record = {
+                "call_id": new_id(),
+                "agent_name": name,
+                "input_data": input_data or {},
+                "output_data": handle.output_data or {},
+                "status": status,
+                "error": error,
+                "duration_ms": duration_ms,
+                "cost": handle.cost,
+                "timestamp": datetime.utcnow(),
+                "sampled": sampled,
+                "trace_id": context.trace_id,
+                "span_id": context.span_id,
+                "parent_span_id": parent_span_id
+            }
+            if _on_event_loop():
+                self._persist_in_background(record, tags=tags or [])
+            else:
+                self._persist(record, tags=tags or [])
     
-    def stats(self, agent_name: Optional[str] = None) -> Dict[str, Any]:
+    def _persist(self, record: Dict[str, Any], tags: Optional[List[str]] = None):
+        """
+        Write a finished call - inline, or via the background writer
+        
+        Deferred input/output data is rendered here, or by the writer
+        thread when async_writes is on.
+        
+        Args:
+            record: log_call() keyword arguments
+            tags: Register the agent with these tags if it doesn't exist
+        """
+        finish_collected()
+        writer = self._get_writer()
+        if writer:
+            writer.submit(self._writer_record(record, tags))
+            return
+        
+        if not record.get("sampled", True):
+            # Only the totals are kept - skip rendering payloads
+            record["input_data"] = record["output_data"] = {}
+        
+        if tags is not None:
+            self.storage.register_agent(name=record["agent_name"], tags=tags)
+        self.storage.log_call(**resolve_payloads(record))
+    
+    @staticmethod
+    def _writer_record(record: Dict[str, Any], tags: Optional[List[str]]) -> Dict[str, Any]:
+        """A finished call as the batch writer takes it"""
+        if not record.get("sampled", True):
+            # Only the totals are kept - skip rendering payloads
+            record["input_data"] = record["output_data"] = {}
+        if tags is not None:
+            record["tags"] = tags
+        return record
+    
+    def _persist_in_background(
+        self,
+        record: Dict[str, Any],
+        tags: Optional[List[str]] = None
+    ):
+        """
+        Write a finished call without blocking the caller
+        
+        Used by async agents so SQLite I/O never runs on the event loop.
+        Goes straight onto the batch writer's queue when that needn't wait,
+        otherwise through a single-thread executor (one thread keeps SQLite
+        writes serialized) - which also opens the storage and starts the
+        writer on first use, off the loop.
+        """
+        finish_collected()
+        writer = self._writer
+        if writer is not None and writer.offer(self._writer_record(record, tags)):
+            return
+        
+        with self._executor_lock:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1,
+                    thread_name_prefix="argus-persist"
+                )
+            self._executor.submit(self._persist_safely, record, tags)
+    
+    def _persist_safely(self, record: Dict[str, Any], tags: Optional[List[str]]):
+        try:
+            self._persist(record, tags=tags)
+        except Exception:
+            import logging
+            logging.getLogger(__name__).exception(
+                "Argus: failed to log call %s", record["call_id"]
+            )
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until all queued calls are written
+        
+        Only needed with async_writes=True or async agents - everything
+        else is written before the wrapper returns.
+        
+        Returns:
+            True if everything was written within timeout
+        """
+        finish_collected()
+        with self._executor_lock:
+            executor = self._executor
+        if executor:
+            from concurrent.futures import TimeoutError as FutureTimeout
+            try:
+                executor.submit(lambda: None).result(timeout)
+            except FutureTimeout:
+                return False
+        
+        if self._writer:
+            return self._writer.flush(timeout)
+        return True
+    
+    def close(self):
+        """Flush queued calls and stop background threads"""
+        finish_collected()
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True)
+        
+        if self._writer:
+            self._writer.close()
+        
+        # Fold what's still in the segment log - a backend instance passed
+        # in is the caller's to close
+        if self.backend == "segments" and self._storage is not None:
+            self._storage.close()
+    
+    def stats(
+        self,
+        agent_name: Optional[str] = None,
+        window: Any = None
+    ) -> Dict[str, Any]:
         """
         Get statistics
         
         Args:
             agent_name: Filter by agent (optional)
+            window: Only the most recent period, e.g. "24h", "30m", "7d"
+                or a timedelta - answered from the rollup tables
+                (default: all time)
         
         Returns:
             Statistics dictionary
         """
+        if window is not None:
+            return self.storage.get_window_stats(window, agent_name)
         return self.storage.get_stats(agent_name)
     
-    def export(self, filename: str, format: str = "csv"):
+    def compact(
+        self,
+        retention: Optional[RetentionPolicy] = None,
+        chunk_size: int = 5000,
+        vacuum: bool = True,
+        full_vacuum: bool = False
+    ) -> Dict[str, Any]:
         """
-        Export data to file
+        Delete expired calls and rollups and reclaim the disk space
+        
+        Safe to run while agents are writing - deletes go in small
+        transactions. Agent totals are kept.
+        
+        Args:
+            retention: What to delete (default: the Watch's retention policy)
+            chunk_size: Rows deleted per transaction
+            vacuum: Return freed pages to the OS (incremental vacuum)
+            full_vacuum: Rebuild the file with VACUUM - blocks writers,
+                needed once for databases created before Argus enabled
+                incremental vacuum
+        
+        Returns:
+            Rows deleted and bytes reclaimed
+        """
+        self.flush()
+        return self.storage.compact(
+            retention or self._retention,
+            chunk_size=chunk_size,
+            vacuum=vacuum,
+            full_vacuum=full_vacuum
+        )
+    
+    def export(
+        self,
+        filename: str,
+        format: str = "csv",
+        agent_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        compression: Optional[str] = None
+    ) -> int:
+        """
+        Export calls to file
+        
+        Calls are streamed, so exports of any size use the same memory.
         
         Args:
             filename: Output filename
-            format: "csv" or "json"
+            format: "csv", "json", "jsonl" or "parquet" (needs pyarrow)
+            agent_name: Only this agent's calls
+            since: Only calls at or after this time (UTC)
+            until: Only calls before this time (UTC)
+            compression: "gzip" or "zstd" (default: from the extension,
+                e.g. calls.jsonl.gz); for Parquet the column codec
+        
+        Returns:
+            Number of calls exported
         """
-        self.storage.export(filename, format)
+        return self.storage.export(
+            filename,
+            format,
+            agent_name=agent_name,
+            since=since,
+            until=until,
+            compression=compression
+        )
+    
+    def export_since_watermark(
+        self,
+        name: str,
+        filename: str,
+        format: str = "jsonl",
+        compression: Optional[str] = None
+    ) -> int:
+        """
+        Export the calls logged since the last export under name
+        
+        Each destination keeps its own watermark, so run this on a timer to
+        ship every call exactly once, even across crashes. Keep each file
+        in place until the next run under the same name.
+        
+        Usage:
+            n = watch.export_since_watermark("s3", f"calls-{stamp}.jsonl.gz")
+        
+        Args:
+            name: Watermark (destination) name
+            filename: Output filename - not created if there's nothing new
+            format: "csv", "json", "jsonl" or "parquet"
+            compression: As for export()
+        
+        Returns:
+            Number of calls exported
+        """
+        self.flush()
+        return self.storage.export_since_watermark(
+            name, filename, format=format, compression=compression
+        )
+    
+    def to_arrow(
+        self,
+        agent_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        payloads: bool = False
+    ) -> Any:
+        """
+        Calls as a pyarrow Table, oldest first (needs pyarrow)
+        
+        Args:
+            agent_name: Only this agent's calls
+            since: Only calls at or after this time (UTC)
+            until: Only calls before this time (UTC)
+            payloads: Include input_data/output_data as JSON text
+        """
+        return self.storage.to_arrow(agent_name, since=since, until=until, payloads=payloads)
+    
+    def to_dataframe(
+        self,
+        agent_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        payloads: bool = False
+    ) -> Any:
+        """
+        Calls as a pandas DataFrame, oldest first (needs pyarrow and pandas)
+        
+        Usage:
+            df = watch.to_dataframe(since=datetime.utcnow() - timedelta(days=7))
+            df.groupby("agent_name")["duration_ms"].quantile(0.99)
+        
+        Args:
+            agent_name: Only this agent's calls
+            since: Only calls at or after this time (UTC)
+            until: Only calls before this time (UTC)
+            payloads: Include input_data/output_data as JSON text
+        """
+        return self.storage.to_dataframe(agent_name, since=since, until=until, payloads=payloads)
     
     def dashboard(self, port: int = 3000, debug: bool = False):
         """
@@ -220,6 +924,8 @@ class Watch:
             port: Port to run on
             debug: Debug mode
         """
+        # Flask is only imported when the dashboard is actually started
+        from .dashboard import start_dashboard
         start_dashboard(self.storage, port=port, debug=debug)
     
     def list_agents(self) -> List[Dict[str, Any]]:
@@ -229,7 +935,10 @@ class Watch:
     def get_calls(
         self,
         agent_name: Optional[str] = None,
-        limit: int = 100
+        limit: int = 100,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        **filters: Any
     ) -> List[Dict[str, Any]]:
         """
         Get recent calls
@@ -237,5 +946,55 @@ class Watch:
         Args:
             agent_name: Filter by agent (optional)
             limit: Max number of calls
+            since: Only calls at or after this time (UTC)
+            until: Only calls before this time (UTC)
+            **filters: status, min_duration_ms, max_duration_ms, min_cost,
+                tags or cursor - see get_calls_page()
+        """
+        return self.storage.get_calls(agent_name, limit, since=since, until=until, **filters)
+    
+    def get_calls_page(
+        self,
+        agent_name: Optional[str] = None,
+        limit: int = 100,
+        **filters: Any
+    ) -> Dict[str, Any]:
+        """
+        Get one page of calls, newest first
+        
+        Usage:
+            page = watch.get_calls_page(status="error", limit=50)
+            while page["next_cursor"]:
+                page = watch.get_calls_page(
+                    status="error", limit=50, cursor=page["next_cursor"]
+                )
+        
+        Args:
+            agent_name: Filter by agent (optional)
+            limit: Max calls per page
+            **filters: since, until, status, min_duration_ms,
+                max_duration_ms, min_cost, tags and cursor (the previous
+                page's next_cursor)
+        
+        Returns:
+            {"calls": [...], "next_cursor": str, or None on the last page}
+        """
+        return self.storage.get_calls_page(agent_name, limit, **filters)
+    
+    def get_call(self, call_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get one call, including its input and output data
+        
+        Args:
+            call_id: call_id from get_calls()
+        """
+        return self.storage.get_call(call_id)
+    
+    def get_trace(self, trace_id: str) -> List[Dict[str, Any]]:
+        """
+        Get all spans of a trace, oldest first
+        
+        Args:
+            trace_id: trace_id of any call in the trace
         """
-        return self.storage.get_calls(agent_name, limit)
+        return self.storage.get_trace(trace_id)
@@ -0,0 +1,200 @@
+"""
+Background batched writer - keeps SQLite off the call path
+"""
+
+import atexit
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .capture import resolve_payloads
+
+
+QUEUE_POLICIES = ("block", "drop")
+
+
+class _Flush:
+    """Queue marker - set once every record queued before it is written"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+class BatchWriter:
+    """
+    Background writer that persists call records in batches
+    
+    Records pushed with submit() land on a bounded in-memory queue. A daemon
+    thread drains it, renders any deferred capture data and hands the
+    records to Storage.log_calls() in a single transaction whenever
+    batch_size records are pending or flush_interval seconds have passed
+    since the last write.
+    
+    Usage:
+        writer = BatchWriter(storage, batch_size=200, flush_interval=0.5)
+        writer.submit(record)
+        writer.flush()
+    """
+    
+    def __init__(
+        self,
+        storage,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_queue_size: int = 10000,
+        policy: str = "block"
+    ):
+        """
+        Args:
+            storage: Storage instance records are written to
+            batch_size: Write as soon as this many records are pending
+            flush_interval: Max seconds a record waits before being written
+            max_queue_size: Queue bound (0 = unbounded)
+            policy: What submit() does when the queue is full -
+                "block" waits for room, "drop" discards the record
+        """
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(
+                f"Unknown queue policy '{policy}', expected one of {QUEUE_POLICIES}"
+            )
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        
+        self.storage = storage
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.dropped = 0
+        self.failed = 0
+        
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="argus-writer",
+            daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def submit(self, record: Dict[str, Any]) -> bool:
+        """
+        Queue a call record for writing
+        
+        Returns:
+            False if the record was dropped (full queue with "drop" policy,
+            or writer already closed)
+        """
+        if self._closed:
+            self.dropped += 1
+            return False
+        
+        if self.policy == "drop":
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+                return False
+        else:
+            self._queue.put(record)
+        return True
+    
+    def offer(self, record: Dict[str, Any]) -> bool:
+        """
+        Queue a call record without ever waiting (for event loops)
+        
+        Returns:
+            False if the queue is full under the "block" policy - the
+            record was not queued; submit() it from a thread that can wait
+        """
+        if self._closed or self.policy == "drop":
+            self.submit(record)
+            return True
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            return False
+        return True
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every record submitted so far has been written
+        
+        Returns:
+            True if the flush completed within timeout
+        """
+        if self._closed or not self._thread.is_alive():
+            return True
+        
+        marker = _Flush()
+        self._queue.put(marker)
+        return marker.done.wait(timeout)
+    
+    def close(self, timeout: Optional[float] = 10.0):
+        """Write pending records and stop the background thread"""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+        
+        try:
+            atexit.unregister(self.close)
+        except Exception:
+            pass
+    
+    @property
+    def pending(self) -> int:
+        """Approximate number of queued records"""
+        return self._queue.qsize()
+    
+    def _run(self):
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval
+        
+        while True:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            
+            if item is _STOP:
+                self._write(batch)
+                return
+            
+            if isinstance(item, _Flush):
+                self._write(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+                item.done.set()
+                continue
+            
+            if item is not None:
+                batch.append(item)
+            
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._write(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+    
+    def _write(self, batch: List[Dict[str, Any]]):
+        if not batch:
+            return
+        try:
+            self.storage.log_calls([resolve_payloads(r) for r in batch])
+        except Exception:
+            # Never let a bad batch kill the writer thread
+            import logging
+            self.failed += len(batch)
+            logging.getLogger(__name__).exception(
+                "Argus: failed to write %d call(s)", len(batch)
+            )
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark argument/result capture overhead as payload size grows
+
+Compares the old str(x)[:500] capture with argus.capture.bounded_repr.
+Bounded capture should stay flat; str() grows with the payload.
+"""
+
+import sys
+sys.path.insert(0, '.')
+
+import timeit
+
+from argus.capture import bounded_repr
+
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+class Frame:
+    """Stand-in for a DataFrame or SDK response: repr() renders everything"""
+
+    def __init__(self, size: int):
+        self.rows = ["z" * 100] * (size // 100)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __repr__(self):
+        return "\n".join(self.rows)
+
+
+def payloads(size: int):
+    return {
+        "str": "x" * size,
+        "list": list(range(size // 4)),
+        "dict": {f"key{i}": "v" * 8 for i in range(size // 16)},
+        "nested": [{"doc": "y" * 100, "ids": list(range(20))}] * (size // 200),
+        "object": Frame(size),
+    }
+
+
+def per_call_us(func, payload, number: int) -> float:
+    return timeit.timeit(lambda: func(payload), number=number) / number * 1e6
+
+
+def main():
+    print("📏 Capture overhead (µs per value)")
+    print("=" * 64)
+    print(f"{'payload':<10}{'size':>12}{'str()[:500]':>20}{'bounded_repr':>20}")
+
+    for size in SIZES:
+        number = max(3, 200_000 // size)
+        for kind, payload in payloads(size).items():
+            old = per_call_us(lambda x: str(x)[:500], payload, number)
+            new = per_call_us(lambda x: bounded_repr(x, 500), payload, number)
+            print(f"{kind:<10}{size:>12,}{old:>20.1f}{new:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark export memory and throughput as the calls table grows
+
+Fills a database with synthetic calls (straight through sqlite3, so
+setting up 10M rows takes seconds, not hours), then exports it at each
+size in a fresh process and prints rows/s and peak RSS. Streaming export
+should keep peak RSS flat however many rows there are.
+
+The export runs with the "durable" profile by default: the page cache
+and mmap of the other profiles are counted in RSS and would fill up with
+the file, hiding what the export itself holds on to.
+    
+    python scripts/benchmark_export.py --rows 10000000 --format jsonl
+"""
+
+import sys
+sys.path.insert(0, '.')
+
+import argparse
+import json
+import os
+import resource
+import sqlite3
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from argus.payloads import encode_payload
+from argus.profiles import PROFILES
+from argus.storage import Storage
+
+
+def fill(path: str, start: int, rows: int):
+    """Append calls start..start+rows, sharing a few payloads"""
+    payloads = [encode_payload({"args": f"prompt {n} " * 50}) for n in range(20)]
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT OR IGNORE INTO payloads (hash, codec, size, data) VALUES (?, ?, ?, ?)",
+        payloads
+    )
+    base = datetime(2026, 1, 1)
+    batch = 100_000
+    for offset in range(start, start + rows, batch):
+        n = min(batch, start + rows - offset)
+        conn.executemany(
+            "INSERT INTO calls (call_id, agent_name, input_hash, output_hash, status, "
+            "duration_ms, cost, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    f"call-{i}", f"agent-{i % 10}", payloads[i % 20][0], payloads[i % 7][0],
+                    "error" if i % 50 == 0 else "success", i % 5000, 0.001,
+                    (base + timedelta(milliseconds=50 * i)).strftime("%Y-%m-%d %H:%M:%S.%f")
+                )
+                for i in range(offset, offset + n)
+            ]
+        )
+        conn.commit()
+    conn.close()
+
+
+def child(db_path: str, format: str, out_path: str, profile: str):
+    """Run one export and report rows, seconds and peak RSS as JSON"""
+    storage = Storage(db_path, profile=profile)
+    started = time.perf_counter()
+    rows = storage.export(out_path, format=format)
+    elapsed = time.perf_counter() - started
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"rows": rows, "seconds": elapsed, "peak_mb": peak_kb / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["csv", "json", "jsonl"], default="jsonl")
+    parser.add_argument("--compress", action="store_true", help="Write .gz output")
+    parser.add_argument("--profile", choices=list(PROFILES), default="durable")
+    parser.add_argument("--child", nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        child(*args.child)
+        return
+    
+    directory = tempfile.mkdtemp()
+    db_path = os.path.join(directory, "argus.db")
+    Storage(db_path).engine.dispose()
+    out_path = os.path.join(directory, f"calls.{args.format}" + (".gz" if args.compress else ""))
+    
+    sizes = [n for n in (10_000, 100_000, 1_000_000, 10_000_000) if n < args.rows] + [args.rows]
+    
+    print(f"\n📤 Export ({args.format}{', gzip' if args.compress else ''})")
+    print("=" * 52)
+    print(f"{'rows':>14}{'rows/s':>14}{'peak RSS MB':>14}{'file MB':>10}")
+    
+    filled = 0
+    for size in sizes:
+        fill(db_path, filled, size - filled)
+        filled = size
+        result = json.loads(subprocess.run(
+            [sys.executable, __file__, "--child", db_path, args.format, out_path, args.profile],
+            check=True, capture_output=True, text=True
+        ).stdout)
+        print(
+            f"{result['rows']:>14,}{result['rows'] / result['seconds']:>14,.0f}"
+            f"{result['peak_mb']:>14.1f}{os.path.getsize(out_path) / 1e6:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark insert throughput with random vs time-ordered call ids
+
+Inserts rows into a table with a unique index on call_id, keyed either by
+uuid4 strings or by argus.ids.new_id(), and prints rows/s as the table
+grows. Random keys slow down once the index no longer fits in the page
+cache; time-ordered keys keep appending to the right edge of the B-tree.
+    
+    python scripts/benchmark_ids.py --rows 10000000
+"""
+
+import sys
+sys.path.insert(0, '.')
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+
+from argus.ids import new_id
+
+
+def run(label: str, make_id, rows: int, batch: int, report_every: int):
+    path = os.path.join(tempfile.mkdtemp(), f"{label}.db")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA cache_size=-16000")  # 16 MB, like a modest default
+    conn.execute(
+        "CREATE TABLE calls (id INTEGER PRIMARY KEY, call_id VARCHAR(255) UNIQUE NOT NULL, "
+        "agent_name VARCHAR(255), duration_ms INTEGER)"
+    )
+    
+    print(f"\n{label}")
+    print(f"{'rows in table':>16}{'rows/s':>14}")
+    
+    inserted = 0
+    window_start = time.perf_counter()
+    window_rows = 0
+    while inserted < rows:
+        n = min(batch, rows - inserted)
+        conn.executemany(
+            "INSERT INTO calls (call_id, agent_name, duration_ms) VALUES (?, ?, ?)",
+            [(make_id(), "bench-agent", 100) for _ in range(n)]
+        )
+        conn.commit()
+        inserted += n
+        window_rows += n
+        
+        if inserted % report_every == 0 or inserted == rows:
+            elapsed = time.perf_counter() - window_start
+            print(f"{inserted:>16,}{window_rows / elapsed:>14,.0f}")
+            window_start = time.perf_counter()
+            window_rows = 0
+    
+    conn.close()
+    size_mb = os.path.getsize(path) / 1e6
+    print(f"{'file size':>16}{size_mb:>13.1f}M")
+    os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark call id schemes")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--batch", type=int, default=10_000)
+    args = parser.parse_args()
+    
+    report_every = max(args.batch, args.rows // 10 // args.batch * args.batch)
+    run("uuid4", lambda: str(uuid.uuid4()), args.rows, args.batch, report_every)
+    run("new_id (ULID)", new_id, args.rows, args.batch, report_every)
+
+
+if __name__ == "__main__":
+    main()
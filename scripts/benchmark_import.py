@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark `import argus` time
+
+Runs the import in fresh interpreters and fails (exit code 1) if the median
+is over budget, so it can be used as a CI gate:
+    
+    python scripts/benchmark_import.py --budget-ms 100
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("flask", "sqlalchemy", "asyncio", "werkzeug", "jinja2")
+
+MEASURE = """
+import sys, time
+t = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - t) * 1000
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+
+def measure(module: str) -> tuple:
+    env = dict(os.environ, PYTHONPATH=PACKAGE_ROOT)
+    out = subprocess.run(
+        [sys.executable, "-c", MEASURE.format(module=module, heavy=HEAVY_MODULES)],
+        env=env,
+        cwd=os.path.join(PACKAGE_ROOT, "scripts"),
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout.split()
+    return float(out[0]), out[1] if len(out) > 1 else ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark `import argus`")
+    parser.add_argument("--runs", type=int, default=15, help="Fresh interpreters to run")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="Max median import time")
+    args = parser.parse_args()
+    
+    baseline = statistics.median(measure("json")[0] for _ in range(args.runs))
+    timings = []
+    heavy = ""
+    for _ in range(args.runs):
+        elapsed, heavy = measure("argus")
+        timings.append(elapsed)
+    
+    median = statistics.median(timings)
+    print("⏱️  import argus")
+    print("=" * 50)
+    print(f"Median:          {median:.1f}ms  (budget {args.budget_ms:.0f}ms)")
+    print(f"Min / max:       {min(timings):.1f}ms / {max(timings):.1f}ms")
+    print(f"import json:     {baseline:.1f}ms  (reference)")
+    print(f"Heavy modules:   {heavy or 'none'}")
+    
+    if median > args.budget_ms or heavy:
+        print("\n❌ Over budget")
+        sys.exit(1)
+    print("\n✅ Within budget")
+
+
+if __name__ == "__main__":
+    main()
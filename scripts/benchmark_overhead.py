@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark @watch.agent wrapper overhead
+
+Compares undecorated calls with the same functions decorated by a disabled
+Watch and by an enabled one. The disabled wrapper costs a fixed ~0.2µs
+(one extra call frame and two attribute checks), which is within a few
+percent of any function doing real work.
+"""
+
+import sys
+sys.path.insert(0, '.')
+
+import os
+import tempfile
+import timeit
+
+from argus import Watch
+
+
+def trivial(x):
+    return x + 1
+
+
+def small_work(x):
+    # ~10µs - still far cheaper than any LLM or tool call
+    return sum(range(1000)) + x
+
+
+def measure(func, number: int) -> float:
+    """Best of 7, in ns per call"""
+    return min(timeit.repeat(lambda: func(1), number=number, repeat=7)) / number * 1e9
+
+
+def main():
+    db_path = os.path.join(tempfile.mkdtemp(), "overhead.db")
+    
+    disabled = Watch(db_path=db_path, enabled=False)
+    per_agent = Watch(db_path=db_path)
+    per_agent.disable(agent="work")
+    enabled = Watch(db_path=db_path)
+    
+    print("⚡ @watch.agent overhead")
+    print("=" * 64)
+    print(f"{'function':<12}{'mode':<20}{'ns/call':>12}{'overhead':>12}")
+    
+    for func in (trivial, small_work):
+        number = 1_000_000 if func is trivial else 100_000
+        baseline = measure(func, number)
+        rows = [
+            ("undecorated", baseline),
+            ("disabled", measure(disabled.agent(name="work")(func), number)),
+            ("disabled (agent)", measure(per_agent.agent(name="work")(func), number)),
+            ("enabled", measure(enabled.agent(name="work")(func), 1_000)),
+        ]
+        for mode, ns in rows:
+            pct = (ns - baseline) / baseline * 100
+            print(f"{func.__name__:<12}{mode:<20}{ns:>12.0f}{pct:>+11.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark inline vs content-addressed call payloads
+
+Writes the same calls - a few system prompts repeated with short user
+questions, the way agents usually look - once with input/output JSON
+inline in the calls table and once through Storage.log_calls(), which
+keeps compressed payloads in the payloads table. Prints file size and the
+time of a metrics-only scan over every call.
+    
+    python scripts/benchmark_payloads.py --calls 200000
+"""
+
+import sys
+sys.path.insert(0, '.')
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+from argus.storage import Storage
+
+
+PROMPTS = [f"System prompt {n}: " + "Follow the house style guide. " * 80 for n in range(5)]
+
+
+def make_calls(n: int):
+    rng = random.Random(42)
+    return [
+        {
+            "call_id": f"call-{i}",
+            "agent_name": f"agent-{i % 10}",
+            "input_data": {
+                "args": f"({rng.choice(PROMPTS)!r}, 'question {rng.randrange(1000)}')",
+                "kwargs": {}
+            },
+            "output_data": {"result": f"answer {rng.randrange(1000)}"},
+            "status": "success",
+            "error": None,
+            "duration_ms": rng.randrange(50, 5000),
+            "cost": 0.001,
+            "timestamp": datetime.utcnow()
+        }
+        for i in range(n)
+    ]
+
+
+def write_inline(path: str, calls):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE calls (id INTEGER PRIMARY KEY, call_id VARCHAR(255) UNIQUE NOT NULL, "
+        "agent_name VARCHAR(255), input_data JSON, output_data JSON, status VARCHAR(50), "
+        "error TEXT, duration_ms INTEGER, cost FLOAT, timestamp DATETIME)"
+    )
+    conn.executemany(
+        "INSERT INTO calls (call_id, agent_name, input_data, output_data, status, error, "
+        "duration_ms, cost, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (c["call_id"], c["agent_name"], json.dumps(c["input_data"]),
+             json.dumps(c["output_data"]), c["status"], c["error"], c["duration_ms"],
+             c["cost"], str(c["timestamp"]))
+            for c in calls
+        ]
+    )
+    conn.commit()
+    conn.close()
+
+
+def scan(path: str) -> float:
+    """Seconds to read the metric columns of every call"""
+    conn = sqlite3.connect(path)
+    started = time.perf_counter()
+    conn.execute(
+        "SELECT agent_name, status, duration_ms, cost, timestamp FROM calls"
+    ).fetchall()
+    elapsed = time.perf_counter() - started
+    conn.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=50_000)
+    args = parser.parse_args()
+    
+    calls = make_calls(args.calls)
+    directory = tempfile.mkdtemp()
+    
+    inline_path = os.path.join(directory, "inline.db")
+    write_inline(inline_path, calls)
+    
+    store_path = os.path.join(directory, "payloads.db")
+    storage = Storage(store_path, profile="fast")
+    for i in range(0, len(calls), 10_000):
+        storage.log_calls(calls[i:i + 10_000])
+    storage.compact(vacuum=False)  # Checkpoint the WAL into the file
+    storage.engine.dispose()
+    
+    print(f"\n📦 Payload storage, {args.calls:,} calls")
+    print("=" * 48)
+    print(f"{'':>14}{'file MB':>12}{'scan ms':>12}")
+    for label, path in (("inline", inline_path), ("payloads", store_path)):
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"{label:>14}{size_mb:>12.1f}{scan(path) * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark write and read throughput per SQLite storage profile
+
+Writes are measured two ways: one transaction per call (log_call, what a
+synchronous Watch does) and batches (log_calls, what the background
+writer does). Reads run the dashboard's recent-calls query.
+    
+    python scripts/benchmark_profiles.py --calls 5000
+"""
+
+import sys
+sys.path.insert(0, '.')
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from argus.ids import new_id
+from argus.profiles import PROFILES
+from argus.storage import Storage
+
+
+def record(i: int):
+    return {
+        "call_id": new_id(),
+        "agent_name": "bench-agent",
+        "input_data": {"args": f"({i},)", "kwargs": {}},
+        "output_data": {"result": "ok"},
+        "status": "success",
+        "error": None,
+        "duration_ms": 100 + i % 900,
+        "cost": 0.001,
+        "timestamp": datetime.utcnow()
+    }
+
+
+def bench(profile: str, calls: int, batch_size: int, reads: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Storage(os.path.join(tmp, "bench.db"), profile=profile)
+        storage.register_agent("bench-agent", [])
+        
+        start = time.perf_counter()
+        for i in range(calls):
+            storage.log_call(**record(i))
+        single = calls / (time.perf_counter() - start)
+        
+        batches = [
+            [record(i) for i in range(n, min(n + batch_size, calls * 10))]
+            for n in range(0, calls * 10, batch_size)
+        ]
+        start = time.perf_counter()
+        for batch in batches:
+            storage.log_calls(batch)
+        bulk = calls * 10 / (time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        for _ in range(reads):
+            storage.get_calls(agent_name="bench-agent", limit=100)
+        read = reads / (time.perf_counter() - start)
+        
+        storage.engine.dispose()
+    return single, bulk, read
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark storage profiles")
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--reads", type=int, default=500)
+    args = parser.parse_args()
+    
+    print("🗄️  Storage profiles")
+    print("=" * 64)
+    print(f"{'profile':<12}{'log_call/s':>16}{'batched rows/s':>18}{'queries/s':>16}")
+    
+    for profile in PROFILES:
+        single, bulk, read = bench(profile, args.calls, args.batch_size, args.reads)
+        print(f"{profile:<12}{single:>16,.0f}{bulk:>18,.0f}{read:>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark ingest rate of the segment log backend against plain SQLite
+
+Each thread logs calls one at a time (log_call, what a synchronous Watch
+does) or in batches. Segments are folded at the end, and that time is
+reported separately - the callers never wait for it.
+    
+    python scripts/benchmark_segments.py --calls 20000 --threads 4
+"""
+
+import sys
+sys.path.insert(0, '.')
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from argus.backends import SegmentLogBackend
+from argus.ids import new_id
+from argus.storage import Storage
+
+
+def record(i: int):
+    return {
+        "call_id": new_id(),
+        "agent_name": "bench-agent",
+        "input_data": {"args": f"({i},)", "kwargs": {}},
+        "output_data": {"result": "ok"},
+        "status": "success",
+        "error": None,
+        "duration_ms": 100 + i % 900,
+        "cost": 0.001,
+        "timestamp": datetime.utcnow()
+    }
+
+
+def ingest(backend, calls: int, threads: int, batch_size: int) -> float:
+    """Calls per second logged from threads at once"""
+    per_thread = calls // threads
+    
+    def work():
+        if batch_size == 1:
+            for i in range(per_thread):
+                backend.log_call(**record(i))
+        else:
+            for n in range(0, per_thread, batch_size):
+                backend.log_calls([record(i) for i in range(n, min(n + batch_size, per_thread))])
+    
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return per_thread * threads / (time.perf_counter() - start)
+
+
+def bench(name: str, calls: int, threads: int, batch_size: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        if name == "sqlite":
+            backend = Storage(db_path)
+        else:
+            backend = SegmentLogBackend(db_path, fold_interval=3600)
+        backend.register_agent("bench-agent", [])
+        
+        rate = ingest(backend, calls, threads, batch_size)
+        
+        fold = None
+        if name == "segments":
+            start = time.perf_counter()
+            backend.fold()
+            fold = backend.get_stats()["total_calls"] / (time.perf_counter() - start)
+            backend.close()
+            backend = backend.store
+        backend.engine.dispose()
+    return rate, fold
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the segment log backend")
+    parser.add_argument("--calls", type=int, default=10000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+    
+    print("📼 Segment log vs SQLite ingest")
+    print("=" * 64)
+    print(f"{'backend':<12}{'log_call/s':>16}{'batched rows/s':>18}{'fold rows/s':>16}")
+    
+    for name in ("sqlite", "segments"):
+        single, _ = bench(name, args.calls, args.threads, 1)
+        bulk, fold = bench(name, args.calls * 10, args.threads, args.batch_size)
+        folded = f"{fold:>16,.0f}" if fold else f"{'-':>16}"
+        print(f"{name:<12}{single:>16,.0f}{bulk:>18,.0f}{folded}")
+
+
+if __name__ == "__main__":
+    main()
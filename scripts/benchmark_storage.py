@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark Storage write throughput: ORM path vs raw sqlite3 bulk path
+
+The ORM path is how log_calls() used to work - one Call object per row
+and the Agent row mutated through the session. The bulk path is the
+current Storage.log_calls(): executemany() on the sqlite3 connection and
+INSERT ... ON CONFLICT DO UPDATE upserts of the per-agent totals and
+rollup buckets, which add the counts and merge latency sketches and
+histograms in SQL with argus_merge_sketch() and argus_merge_counts().
+    
+    python scripts/benchmark_storage.py --batches 1000 10000 100000
+"""
+
+import sys
+sys.path.insert(0, '.')
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from argus.ids import new_id
+from argus.storage import Agent, Call, Storage
+
+
+AGENTS = ["research", "summarize", "classify", "embed"]
+
+
+def make_batch(size: int):
+    now = datetime.utcnow()
+    return [
+        {
+            "call_id": new_id(),
+            "agent_name": AGENTS[i % len(AGENTS)],
+            "input_data": {"args": f"('question {i}',)", "kwargs": {}},
+            "output_data": {"result": "answer " * 10},
+            "status": "error" if i % 50 == 0 else "success",
+            "error": "timeout" if i % 50 == 0 else None,
+            "duration_ms": 100 + i % 900,
+            "cost": 0.002,
+            "timestamp": now
+        }
+        for i in range(size)
+    ]
+
+
+def orm_log_calls(storage: Storage, calls):
+    """The previous ORM write path"""
+    session = storage.Session()
+    try:
+        agents = {}
+        for record in calls:
+            name = record["agent_name"]
+            if name not in agents:
+                agents[name] = session.query(Agent).filter_by(name=name).first()
+            
+            session.add(Call(**record))
+            
+            agent = agents[name]
+            agent.total_calls += 1
+            agent.total_cost += record["cost"]
+            if record["status"] == "error":
+                agent.total_errors += 1
+            agent.avg_duration_ms = (
+                (agent.avg_duration_ms * (agent.total_calls - 1) + record["duration_ms"])
+                / agent.total_calls
+            )
+            agent.last_called_at = record["timestamp"]
+        session.commit()
+    finally:
+        session.close()
+
+
+def rows_per_second(write, batch_size: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Storage(os.path.join(tmp, "bench.db"))
+        for name in AGENTS:
+            storage.register_agent(name, [])
+        
+        batch = make_batch(batch_size)
+        start = time.perf_counter()
+        write(storage, batch)
+        elapsed = time.perf_counter() - start
+        storage.engine.dispose()
+    return batch_size / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Storage write paths")
+    parser.add_argument("--batches", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+    
+    print("💾 Storage write throughput (rows/s)")
+    print("=" * 56)
+    print(f"{'batch':>10}{'ORM':>14}{'log_calls()':>16}{'speedup':>12}")
+    
+    for size in args.batches:
+        orm = rows_per_second(orm_log_calls, size)
+        bulk = rows_per_second(Storage.log_calls, size)
+        print(f"{size:>10,}{orm:>14,.0f}{bulk:>16,.0f}{bulk / orm:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -30,6 +30,11 @@ setup(
         "sqlalchemy>=2.0.0",
         "click>=8.0.0",
     ],
+    extras_require={
+        "zstd": ["zstandard>=0.18.0"],
+        "arrow": ["pyarrow>=10.0.0"],
+        "pandas": ["pyarrow>=10.0.0", "pandas>=1.5.0"],
+    },
     entry_points={
         "console_scripts": [
             "argus=argus.cli:main",
@@ -0,0 +1,32 @@
+"""
+Shared fixtures and call records for the storage tests
+"""
+
+import pytest
+import os
+from datetime import datetime, timedelta
+
+
+START = datetime(2026, 3, 1, 12, 0)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Database path in a temporary directory - partition files go next to it"""
+    return os.path.join(tmp_path, "argus.db")
+
+
+def record(i, agent_name="a", status="success", **fields):
+    """
+    A log_calls() item for call c<i>, logged i seconds after START
+    
+    Any other field can be given to override its default.
+    """
+    call = dict(
+        call_id=f"c{i:05d}", agent_name=agent_name, input_data={"args": f"q{i}"},
+        output_data={"result": i}, status=status,
+        error="boom" if status == "error" else None, duration_ms=10, cost=0.01,
+        timestamp=START + timedelta(seconds=i)
+    )
+    call.update(fields)
+    return call
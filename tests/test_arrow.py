@@ -0,0 +1,111 @@
+"""
+Tests for columnar (Arrow/Parquet) export
+"""
+
+import pytest
+import json
+import sqlite3
+import tempfile
+import os
+import shutil
+from datetime import datetime, timedelta
+from argus import arrow
+from argus.storage import Storage
+
+
+@pytest.fixture
+def storage():
+    """Storage with a few calls, in its own directory"""
+    directory = tempfile.mkdtemp()
+    storage = Storage(os.path.join(directory, "argus.db"))
+    storage.log_calls([
+        dict(
+            call_id=f"c{i}", agent_name="ab"[i % 2], input_data={"args": f"q{i}"},
+            output_data={"result": i}, status="error" if i == 3 else "success",
+            error="boom" if i == 3 else None, duration_ms=10 * i, cost=0.5,
+            timestamp=datetime(2026, 3, 1) + timedelta(seconds=i)
+        )
+        for i in range(10)
+    ])
+    yield storage
+    shutil.rmtree(directory)
+
+
+def test_columns_without_row_dicts(storage):
+    """Test chunks come back as column lists, oldest first"""
+    chunks = list(storage.iter_call_columns(chunk_size=4))
+    
+    assert [len(c["call_id"]) for c in chunks] == [4, 4, 2]
+    assert list(chunks[0]["call_id"]) == ["c0", "c1", "c2", "c3"]
+    assert list(chunks[0]["duration_ms"]) == [0, 10, 20, 30]
+    assert chunks[0]["timestamp"][1] == datetime(2026, 3, 1, 0, 0, 1)
+    assert "input_data" not in chunks[0]
+
+
+def test_payload_columns_are_stored_json(storage):
+    """Test payload columns hold JSON text, for hashed and inline rows alike"""
+    conn = sqlite3.connect(storage.db_path)
+    conn.execute(
+        "INSERT INTO calls (call_id, agent_name, input_data, status, duration_ms, cost, timestamp) "
+        "VALUES ('inline', 'a', '{\"args\": \"old\"}', 'success', 1, 0, '2026-03-02 00:00:00.000000')"
+    )
+    conn.commit()
+    conn.close()
+    
+    columns = next(storage.iter_call_columns(payloads=True))
+    
+    assert json.loads(columns["input_data"][0]) == {"args": "q0"}
+    assert json.loads(columns["output_data"][9]) == {"result": 9}
+    assert json.loads(columns["input_data"][-1]) == {"args": "old"}
+    assert columns["output_data"][-1] is None
+
+
+@pytest.mark.skipif(arrow.PYARROW_AVAILABLE, reason="pyarrow is installed")
+def test_missing_pyarrow_is_explained(storage):
+    """Test Parquet/Arrow calls say what to install"""
+    with pytest.raises(ImportError, match="pyarrow"):
+        storage.to_arrow()
+    with pytest.raises(ImportError, match="pyarrow"):
+        storage.export(storage.db_path + ".parquet", format="parquet")
+
+
+def test_to_arrow_types(storage):
+    """Test the table is typed, not strings"""
+    pa = pytest.importorskip("pyarrow")
+    
+    table = storage.to_arrow(agent_name="a")
+    
+    assert table.num_rows == 5
+    assert table.schema.field("duration_ms").type == pa.int64()
+    assert table.schema.field("timestamp").type == pa.timestamp("us")
+    assert table.column("cost").to_pylist() == [0.5] * 5
+    assert "input_data" not in table.schema.names
+
+
+def test_parquet_row_groups(storage):
+    """Test Parquet is written one row group per chunk"""
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    path = storage.db_path + ".parquet"
+    
+    assert storage.export(path, format="parquet", chunk_size=4, compression="zstd") == 10
+    
+    parquet = pq.ParquetFile(path)
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert table.column("call_id").to_pylist() == [f"c{i}" for i in range(10)]
+    assert json.loads(table.column("input_data")[3].as_py()) == {"args": "q3"}
+    assert table.column("error").to_pylist()[3] == "boom"
+
+
+def test_to_dataframe(storage):
+    """Test the DataFrame API"""
+    pytest.importorskip("pyarrow")
+    pytest.importorskip("pandas")
+    
+    df = storage.to_dataframe()
+    
+    assert len(df) == 10
+    assert df.groupby("agent_name", observed=True)["duration_ms"].sum().to_dict() == {
+        "a": 200, "b": 250
+    }
@@ -0,0 +1,147 @@
+"""
+Tests for async agent support
+"""
+
+import pytest
+import asyncio
+import tempfile
+import os
+from argus import Watch
+
+
+@pytest.fixture
+def watch():
+    """Create a Watch instance with temporary database"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+    
+    w = Watch(db_path=db_path)
+    yield w
+    w.close()
+    
+    # Cleanup
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+def test_async_agent_times_awaited_call(watch):
+    """Test duration covers the awaited coroutine, not its creation"""
+    
+    @watch.agent(name="async-agent", tags=["async"])
+    async def slow(x):
+        await asyncio.sleep(0.05)
+        return x * 2
+    
+    assert asyncio.run(slow(21)) == 42
+    assert watch.flush(timeout=5)
+    
+    calls = watch.get_calls(agent_name="async-agent")
+    assert len(calls) == 1
+    assert calls[0]["duration_ms"] >= 50
+    assert watch.list_agents()[0]["tags"] == ["async"]
+
+
+def test_async_agent_error(watch):
+    """Test async errors are logged and re-raised"""
+    
+    @watch.agent(name="async-error")
+    async def broken():
+        await asyncio.sleep(0)
+        raise ValueError("async boom")
+    
+    with pytest.raises(ValueError):
+        asyncio.run(broken())
+    watch.flush(timeout=5)
+    
+    stats = watch.stats(agent_name="async-error")
+    assert stats["total_calls"] == 1
+    assert stats["total_errors"] == 1
+
+
+def test_async_agent_concurrent_calls(watch):
+    """Test many in-flight calls are all tracked"""
+    
+    @watch.agent(name="async-many", cost_per_call=0.01)
+    async def call(i):
+        await asyncio.sleep(0.01)
+        return i
+    
+    async def main():
+        return await asyncio.gather(*(call(i) for i in range(200)))
+    
+    assert asyncio.run(main()) == list(range(200))
+    watch.flush(timeout=10)
+    
+    stats = watch.stats(agent_name="async-many")
+    assert stats["total_calls"] == 200
+    assert stats["total_cost"] == pytest.approx(2.0)
+
+
+def test_async_agent_with_batch_writer():
+    """Test async agents go through the batch writer when enabled"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+    watch = Watch(db_path=db_path, async_writes=True, flush_interval=60)
+    
+    @watch.agent(name="async-batched")
+    async def call():
+        return "ok"
+    
+    async def main():
+        await asyncio.gather(*(call() for _ in range(20)))
+    
+    asyncio.run(main())
+    watch.close()
+    
+    assert watch.stats(agent_name="async-batched")["total_calls"] == 20
+    os.remove(db_path)
+
+
+def test_async_agent_never_blocks_the_loop():
+    """Test storage opens off the loop and a full writer queue doesn't stall it"""
+    import threading
+    from argus import storage as storage_module
+    
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+    watch = Watch(db_path=db_path, async_writes=True, batch_size=1, max_queue_size=1)
+    
+    opened_on = []
+    init = storage_module.Storage.__init__
+    
+    def tracked_init(self, *args, **kwargs):
+        opened_on.append(threading.current_thread())
+        init(self, *args, **kwargs)
+    
+    release = threading.Event()
+    
+    @watch.agent(name="async-full")
+    async def call():
+        return "ok"
+    
+    async def main():
+        await call()
+        # Wait for the storage and writer, then stall the writer thread
+        await asyncio.get_running_loop().run_in_executor(None, watch.flush)
+        log_calls = watch.storage.log_calls
+        
+        def slow(batch):
+            release.wait(5)
+            log_calls(batch)
+        
+        watch.storage.log_calls = slow
+        loop_thread = threading.current_thread()
+        await asyncio.wait_for(asyncio.gather(*(call() for _ in range(10))), 2)
+        return loop_thread
+    
+    storage_module.Storage.__init__ = tracked_init
+    try:
+        loop_thread = asyncio.run(main())
+    finally:
+        storage_module.Storage.__init__ = init
+    
+    assert opened_on and loop_thread not in opened_on
+    release.set()
+    watch.close()
+    assert watch.stats(agent_name="async-full")["total_calls"] == 11
+    os.remove(db_path)
@@ -0,0 +1,214 @@
+"""
+Tests for pluggable storage backends and the in-memory backend
+"""
+
+import pytest
+import json
+import os
+from datetime import datetime, timedelta
+from argus import Watch, RetentionPolicy
+from argus.backends import MemoryBackend, StorageBackend
+from argus.storage import Storage
+from .conftest import record
+
+
+NOW = datetime.utcnow().replace(microsecond=0)
+
+
+def recent(i, **fields):
+    """record() logged 30 - i minutes ago, slower and costlier as i grows"""
+    defaults = dict(
+        duration_ms=10 * (i + 1), cost=0.01 * i, timestamp=NOW - timedelta(minutes=30 - i)
+    )
+    return record(i, **dict(defaults, **fields))
+
+
+def workload():
+    calls = [
+        recent(i, agent_name="ab"[i % 2], status="error" if i % 5 == 0 else "success",
+               trace_id="t1" if i < 3 else None)
+        for i in range(20)
+    ]
+    # Not sampled: counted in totals and rollups, but not kept
+    calls.append(recent(20, agent_name="a", sampled=False))
+    # Logged late with an older timestamp
+    calls.append(recent(21, agent_name="b", timestamp=NOW - timedelta(hours=2)))
+    return calls
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        return Storage(os.path.join(tmp_path, "argus.db"))
+    return MemoryBackend()
+
+
+def fill(backend):
+    backend.register_agent("a", ["prod", "search"])
+    backend.register_agent("b", ["prod"])
+    backend.log_calls(workload())
+    backend.log_call(**recent(22, agent_name="c"))
+
+
+def test_backends_implement_interface():
+    """Test both backends are StorageBackends"""
+    assert issubclass(Storage, StorageBackend)
+    assert isinstance(MemoryBackend(), StorageBackend)
+    with pytest.raises(TypeError):
+        StorageBackend()
+
+
+def test_same_results_as_sqlite(tmp_path):
+    """Test the memory backend answers every read like SQLite does"""
+    sqlite, memory = Storage(os.path.join(tmp_path, "argus.db")), MemoryBackend()
+    fill(sqlite)
+    fill(memory)
+    
+    def same(read):
+        assert read(memory) == read(sqlite)
+    
+    same(lambda s: s.get_stats())
+    same(lambda s: s.get_stats("a"))
+    same(lambda s: s.get_stats("missing"))
+    same(lambda s: s.list_agents())
+    for resolution in ("minute", "hour", "day"):
+        same(lambda s: s.get_rollups(resolution))
+    same(lambda s: s.get_rollups("minute", "b", since=NOW - timedelta(minutes=10)))
+    same(lambda s: s.get_window_stats("1h"))
+    same(lambda s: s.get_window_stats("7d", agent_name="a"))
+    same(lambda s: s.get_calls(limit=50))
+    same(lambda s: s.get_calls("b", limit=3, since=NOW - timedelta(minutes=25)))
+    same(lambda s: s.get_calls(status="error", min_duration_ms=20, max_duration_ms=150))
+    same(lambda s: s.get_calls(min_cost=0.1, tags=["search"]))
+    same(lambda s: s.get_calls(tags=["prod"], agent_name="c"))
+    same(lambda s: s.get_call("c00003"))
+    same(lambda s: s.get_call("c00020"))
+    same(lambda s: s.get_trace("t1"))
+    same(lambda s: list(s.iter_calls(agent_name="a", since=NOW - timedelta(minutes=20))))
+    same(lambda s: list(s.iter_calls(payloads=False)))
+
+
+def test_pages_cover_every_call(backend):
+    """Test cursors walk through all calls once, newest first"""
+    fill(backend)
+    
+    seen = []
+    page = backend.get_calls_page(limit=4)
+    seen.extend(page["calls"])
+    while page["next_cursor"]:
+        page = backend.get_calls_page(limit=4, cursor=page["next_cursor"])
+        seen.extend(page["calls"])
+    
+    assert len(seen) == 22
+    assert len({c["call_id"] for c in seen}) == 22
+    assert [c["timestamp"] for c in seen] == sorted((c["timestamp"] for c in seen), reverse=True)
+    
+    with pytest.raises(ValueError):
+        backend.get_calls_page(cursor="not a cursor")
+
+
+def test_compact(backend):
+    """Test retention deletes old calls and rollups, and keeps totals"""
+    fill(backend)
+    
+    report = backend.compact(RetentionPolicy(
+        calls_ttl="1h", agent_ttls={"a": "15m"}, rollup_ttls={"minute": "1h"}
+    ))
+    
+    assert report["calls_deleted"] == 9  # c21, and a's 8 calls before 15m ago
+    assert report["rollups_deleted"] == 1
+    assert backend.get_call("c00021") is None
+    assert backend.get_call("c00002") is None
+    assert backend.get_call("c00016") is not None
+    assert backend.get_stats()["total_calls"] == 23
+
+
+def test_ring_buffer_evicts_oldest():
+    """Test only the newest capacity calls are kept, totals count all"""
+    backend = MemoryBackend(capacity=5)
+    for i in range(12):
+        backend.log_call(**record(i))
+    
+    assert len(backend) == 5
+    assert [c["call_id"] for c in backend.get_calls()] == [f"c{i:05d}" for i in range(11, 6, -1)]
+    assert backend.get_call("c00006") is None
+    assert backend.get_call("c00007")["output_data"] == {"result": 7}
+    assert backend.get_stats("a")["total_calls"] == 12
+    assert sum(r["calls"] for r in backend.get_rollups("day")) == 12
+    
+    with pytest.raises(ValueError):
+        MemoryBackend(capacity=0)
+
+
+def test_memory_export(tmp_path):
+    """Test export works the same on top of any backend"""
+    backend = MemoryBackend()
+    fill(backend)
+    path = os.path.join(tmp_path, "calls.jsonl")
+    
+    assert backend.export(path, format="jsonl", agent_name="a") == 10
+    with open(path) as f:
+        calls = [json.loads(line) for line in f]
+    assert calls[0]["input_data"] == {"args": "q0"}
+    assert [c["timestamp"] for c in calls] == sorted(c["timestamp"] for c in calls)
+    
+
+
+def test_memory_watermark_export(tmp_path):
+    """Test watermark exports pick up new calls, and evicted calls are skipped"""
+    backend = MemoryBackend(capacity=15)
+    backend.log_calls([record(i) for i in range(10)])
+    first = os.path.join(tmp_path, "1.jsonl")
+    second = os.path.join(tmp_path, "2.jsonl")
+    
+    def exported_ids(path):
+        with open(path) as f:
+            return [json.loads(line)["call_id"] for line in f]
+    
+    assert backend.export_since_watermark("ship", first) == 10
+    assert exported_ids(first) == [f"c{i:05d}" for i in range(10)]
+    assert backend.export_since_watermark("ship", second) == 0
+    assert not os.path.exists(second)
+    
+    # c00010-c00014 are evicted before the next export
+    backend.log_calls([record(i) for i in range(10, 30)])
+    assert backend.export_since_watermark("ship", second) == 15
+    assert exported_ids(second) == [f"c{i:05d}" for i in range(15, 30)]
+    assert backend.export_since_watermark("other", os.path.join(tmp_path, "3.jsonl")) == 15
+
+
+def test_watch_memory_backend(tmp_path):
+    """Test Watch(backend="memory") tracks calls without touching disk"""
+    db_path = os.path.join(tmp_path, "argus.db")
+    watch = Watch(db_path=db_path, backend="memory")
+    
+    @watch.agent(name="mem", tags=["test"])
+    def double(x):
+        return x * 2
+    
+    for i in range(3):
+        double(i)
+    
+    assert isinstance(watch.storage, MemoryBackend)
+    assert watch.stats("mem")["total_calls"] == 3
+    assert len(watch.get_calls("mem")) == 3
+    assert watch.list_agents()[0]["tags"] == ["test"]
+    assert os.listdir(tmp_path) == []
+
+
+def test_watch_backend_instance():
+    """Test Watch uses a backend instance it's given"""
+    backend = MemoryBackend(capacity=10)
+    watch = Watch(backend=backend, async_writes=True)
+    
+    @watch.agent(name="queued")
+    def f():
+        return 1
+    
+    f()
+    watch.flush()
+    assert watch.storage is backend
+    assert backend.get_stats("queued")["total_calls"] == 1
+    
+    with pytest.raises(ValueError):
+        Watch(backend="cassandra")
@@ -0,0 +1,137 @@
+"""
+Tests for argument/result capture
+"""
+
+import pytest
+import tempfile
+import os
+import shutil
+from argus import Watch
+from argus.capture import bounded_repr, CapturePolicy
+
+
+@pytest.fixture
+def watch():
+    """Create a Watch instance with temporary database"""
+    tmpdir = tempfile.mkdtemp()
+    w = Watch(db_path=os.path.join(tmpdir, "argus.db"))
+    yield w
+    w.close()
+    
+    # Cleanup
+    shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def test_bounded_repr_small_values():
+    """Test small values render like before"""
+    assert bounded_repr("hello") == "hello"
+    assert bounded_repr((1, "a")) == str((1, "a"))
+    assert bounded_repr({"k": 1}) == str({"k": 1})
+
+
+def test_bounded_repr_large_values():
+    """Test large payloads are cut to the budget"""
+    payloads = [
+        "x" * 1_000_000,
+        b"y" * 1_000_000,
+        list(range(1_000_000)),
+        {i: "v" * 1000 for i in range(100_000)},
+        [[["deep"] * 1000] * 1000],
+    ]
+    for payload in payloads:
+        assert len(bounded_repr(payload, 100)) <= 100
+
+
+def test_capture_off(watch):
+    """Test capture="off" stores no payloads"""
+    
+    @watch.agent(name="private", capture="off")
+    def func(secret):
+        return secret
+    
+    func("password")
+    
+    call = watch.get_call(watch.get_calls()[0]["call_id"])
+    assert "password" not in str(call["input_data"]) + str(call["output_data"])
+
+
+def test_capture_limit(watch):
+    """Test per-agent capture limit"""
+    
+    @watch.agent(name="short", capture_limit=10)
+    def func(text):
+        return text
+    
+    func("a" * 100)
+    
+    output = watch.get_call(watch.get_calls()[0]["call_id"])["output_data"]
+    assert output == {"result": "aaaaaaaaaa"}
+
+
+def test_capture_full_spills(watch):
+    """Test capture="full" writes large payloads to spill files"""
+    
+    @watch.agent(name="full", capture="full", capture_limit=20)
+    def func(text):
+        return text.upper()
+    
+    func("small")
+    func("b" * 1000)
+    
+    spilled = os.listdir(watch._spill_dir)
+    assert len(spilled) == 2
+    with open(os.path.join(watch._spill_dir, sorted(spilled)[0])) as f:
+        assert len(f.read()) >= 1000
+
+
+def test_invalid_capture_mode():
+    """Test unknown capture modes are rejected"""
+    with pytest.raises(ValueError):
+        CapturePolicy("everything")
+
+
+def test_bounded_repr_never_renders_unknown_objects():
+    """Test objects with expensive reprs are described, not rendered"""
+    from collections import namedtuple
+    
+    class Huge:
+        shape = (1000000, 8)
+        
+        def __repr__(self):
+            raise AssertionError("rendered")
+    
+    class Response:
+        def __len__(self):
+            return 3
+    
+    Point = namedtuple("Point", "x y")
+    
+    assert bounded_repr(Huge()).endswith("Huge object, shape=(1000000, 8)>")
+    assert bounded_repr([Response()], 100).endswith("Response object, len=3>]")
+    assert bounded_repr(Point(1, "a" * 1000), 50).startswith("Point(x=1, y='aaaa")
+    assert bounded_repr((1.5, None, True)) == "(1.5, None, True)"
+
+
+def test_capture_full_renders_like_bounded():
+    """Test full mode renders args, kwargs and results the same way"""
+    policy = CapturePolicy("full", limit=100, spill_dir=tempfile.gettempdir())
+    rendered = policy.render_input("c1", ("a", 1), {"text": "b", "n": [1]})
+    
+    assert rendered == {"args": "('a', 1)", "kwargs": {"text": "b", "n": "[1]"}}
+    assert policy.render_output("c1", [2]) == {"result": "[2]"}
+
+
+@pytest.mark.parametrize("capture", ["bounded", "full"])
+def test_mutated_args_captured_as_passed(watch, capture):
+    """Test an agent mutating its arguments doesn't change the logged input"""
+    
+    @watch.agent(name="mutator", capture=capture)
+    def func(items, options=None):
+        items.append("added")
+        options["seen"] = True
+        return len(items)
+    
+    func(["a"], options={})
+    
+    call = watch.get_call(watch.get_calls()[0]["call_id"])
+    assert call["input_data"] == {"args": "(['a'],)", "kwargs": {"options": "{}"}}
@@ -0,0 +1,95 @@
+"""
+Tests for disabling tracking
+"""
+
+import pytest
+import tempfile
+import os
+from argus import Watch
+
+
+@pytest.fixture
+def db_path():
+    """Temporary database path"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        path = f.name
+    os.remove(path)
+    
+    yield path
+    
+    # Cleanup
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def test_disabled_watch_never_touches_storage(db_path):
+    """Test a disabled Watch runs functions without logging anything"""
+    watch = Watch(db_path=db_path, enabled=False)
+    
+    @watch.agent(name="off")
+    def func(x):
+        return x * 2
+    
+    with watch.span("off-span"):
+        assert func(2) == 4
+    watch.end(watch.start("off", {}), {})
+    
+    assert watch._storage is None
+    assert not os.path.exists(db_path)
+
+
+def test_toggle_at_runtime(db_path):
+    """Test tracking can be switched off and on again"""
+    watch = Watch(db_path=db_path)
+    
+    @watch.agent(name="toggled")
+    def func():
+        return 1
+    
+    func()
+    watch.disable()
+    assert not watch.is_enabled()
+    func()
+    watch.enable()
+    func()
+    
+    assert watch.stats(agent_name="toggled")["total_calls"] == 2
+
+
+def test_per_agent_switch(db_path):
+    """Test disabling one agent leaves the others tracked"""
+    watch = Watch(db_path=db_path)
+    
+    @watch.agent(name="quiet")
+    def quiet():
+        return 1
+    
+    @watch.agent(name="loud")
+    def loud():
+        return 1
+    
+    watch.disable(agent="quiet")
+    quiet()
+    loud()
+    assert not watch.is_enabled("quiet")
+    assert watch.is_enabled("loud")
+    
+    watch.enable(agent="quiet")
+    quiet()
+    
+    assert watch.stats(agent_name="quiet")["total_calls"] == 1
+    assert watch.stats(agent_name="loud")["total_calls"] == 1
+
+
+def test_environment_variables(db_path, monkeypatch):
+    """Test ARGUS_ENABLED and ARGUS_DISABLED_AGENTS"""
+    monkeypatch.setenv("ARGUS_ENABLED", "false")
+    assert not Watch(db_path=db_path).is_enabled()
+    
+    monkeypatch.setenv("ARGUS_ENABLED", "1")
+    monkeypatch.setenv("ARGUS_DISABLED_AGENTS", "a, b")
+    watch = Watch(db_path=db_path)
+    assert watch.is_enabled()
+    assert not watch.is_enabled("a")
+    assert not watch.is_enabled("b")
+    assert watch.is_enabled("c")
@@ -0,0 +1,139 @@
+"""
+Tests for streaming export
+"""
+
+import pytest
+import csv
+import gzip
+import json
+import tracemalloc
+import os
+from datetime import timedelta
+from argus.storage import Storage, PartitionedStorage
+from .conftest import START, record
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = Storage(os.path.join(tmp_path, "argus.db"))
+    storage.log_calls([record(i, agent_name="ab"[i % 2]) for i in range(25)])
+    return storage
+
+
+def read_jsonl(path, opener=open):
+    with opener(path, "rt") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_jsonl_streams_every_call(storage, tmp_path):
+    """Test JSON Lines export in small chunks, oldest first, with payloads"""
+    path = os.path.join(tmp_path, "calls.jsonl")
+    
+    assert storage.export(path, format="jsonl", chunk_size=4) == 25
+    
+    calls = read_jsonl(path)
+    assert [c["call_id"] for c in calls] == [f"c{i:05d}" for i in range(25)]
+    assert calls[3]["input_data"] == {"args": "q3"}
+    assert calls[3]["output_data"] == {"result": 3}
+
+
+def test_json_matches_json_dump(storage, tmp_path):
+    """Test streamed JSON is byte-for-byte what json.dump(indent=2) writes"""
+    path = os.path.join(tmp_path, "calls.json")
+    storage.export(path, format="json", chunk_size=7)
+    
+    calls = list(storage.iter_calls())
+    with open(path) as f:
+        assert f.read() == json.dumps(calls, indent=2)
+    
+    empty = os.path.join(tmp_path, "empty.json")
+    assert storage.export(empty, format="json", agent_name="nobody") == 0
+    with open(empty) as f:
+        assert json.load(f) == []
+
+
+def test_csv_has_metric_columns(storage, tmp_path):
+    """Test CSV keeps its columns and skips payloads"""
+    path = os.path.join(tmp_path, "calls.csv")
+    storage.export(path)
+    
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == [
+        "call_id", "agent_name", "status", "duration_ms", "cost", "timestamp", "error"
+    ]
+    assert len(rows) == 26
+
+
+def test_gzip_from_extension(storage, tmp_path):
+    """Test .gz exports are compressed on the fly"""
+    path = os.path.join(tmp_path, "calls.jsonl.gz")
+    storage.export(path, format="jsonl")
+    
+    with open(path, "rb") as f:
+        assert f.read(2) == b"\x1f\x8b"
+    assert len(read_jsonl(path, gzip.open)) == 25
+
+
+def test_zstd(storage, tmp_path):
+    """Test zstd compression when zstandard is installed"""
+    zstandard = pytest.importorskip("zstandard")
+    path = os.path.join(tmp_path, "calls.jsonl.zst")
+    storage.export(path, format="jsonl")
+    
+    with open(path, "rb") as f:
+        text = zstandard.ZstdDecompressor().stream_reader(f).read().decode()
+    assert len(text.splitlines()) == 25
+
+
+def test_filters(storage, tmp_path):
+    """Test agent and time range filters"""
+    path = os.path.join(tmp_path, "calls.jsonl")
+    
+    assert storage.export(path, format="jsonl", agent_name="b") == 12
+    assert {c["agent_name"] for c in read_jsonl(path)} == {"b"}
+    
+    storage.export(
+        path, format="jsonl",
+        since=START + timedelta(seconds=5), until=START + timedelta(seconds=10)
+    )
+    assert [c["call_id"] for c in read_jsonl(path)] == [f"c{i:05d}" for i in range(5, 10)]
+
+
+def test_unknown_format_and_compression(storage, tmp_path):
+    """Test bad options fail before anything is written"""
+    with pytest.raises(ValueError):
+        storage.export(os.path.join(tmp_path, "calls.xml"), format="xml")
+    with pytest.raises(ValueError):
+        storage.export(os.path.join(tmp_path, "calls.csv"), compression="rar")
+
+
+def test_partitions_exported_in_time_order(tmp_path):
+    """Test exports walk partition files oldest first"""
+    storage = PartitionedStorage(os.path.join(tmp_path, "argus.db"), partition="hour")
+    storage.log_calls([record(i, timestamp=START + timedelta(minutes=13 * i)) for i in range(30)])
+    path = os.path.join(tmp_path, "calls.jsonl")
+    
+    storage.export(path, format="jsonl", chunk_size=4)
+    
+    assert [c["call_id"] for c in read_jsonl(path)] == [f"c{i:05d}" for i in range(30)]
+
+
+def test_memory_does_not_grow_with_rows(tmp_path):
+    """Test peak memory is set by chunk_size, not by the number of calls"""
+    storage = Storage(os.path.join(tmp_path, "argus.db"))
+    payload = {"args": "x" * 500}
+    
+    def peak_for(rows):
+        storage.log_calls([
+            dict(record(i), call_id=f"r{rows}-{i}", input_data=payload) for i in range(rows)
+        ])
+        tracemalloc.start()
+        storage.export(os.path.join(tmp_path, "calls.jsonl"), format="jsonl", chunk_size=200)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+    
+    small = peak_for(1_000)
+    large = peak_for(10_000)   # 11k calls in the table now
+    assert large < small * 1.5
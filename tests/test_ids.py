@@ -0,0 +1,84 @@
+"""
+Tests for time-ordered call ids
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from argus.ids import new_id, id_timestamp, CROCKFORD
+
+
+def test_ids_are_compact_ulids():
+    """Test ids are 26 Crockford base32 characters"""
+    value = new_id()
+    
+    assert len(value) == 26
+    assert set(value) <= set(CROCKFORD)
+
+
+def test_ids_are_strictly_increasing():
+    """Test ids created in a tight loop sort in creation order"""
+    ids = [new_id() for _ in range(10000)]
+    
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_ids_unique_across_threads():
+    """Test concurrent generators never collide"""
+    results = []
+    
+    def worker():
+        results.append([new_id() for _ in range(2000)])
+    
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    
+    all_ids = [i for chunk in results for i in chunk]
+    assert len(set(all_ids)) == len(all_ids)
+    for chunk in results:
+        assert chunk == sorted(chunk)
+
+
+def test_id_timestamp_round_trip():
+    """Test the creation time can be read back from an id"""
+    before = datetime.now(timezone.utc)
+    value = new_id()
+    after = datetime.now(timezone.utc)
+    
+    created = id_timestamp(value)
+    assert before - timedelta(milliseconds=1) <= created <= after + timedelta(milliseconds=1)
+
+
+def test_later_ids_sort_after_earlier_ones():
+    """Test ids from different milliseconds sort by time"""
+    first = new_id()
+    time.sleep(0.002)
+    second = new_id()
+    
+    assert first < second
+    assert id_timestamp(first) < id_timestamp(second)
+
+
+def test_watch_uses_time_ordered_ids(tmp_path):
+    """Test calls and traces get ULIDs instead of uuid4 strings"""
+    from argus import Watch
+    
+    w = Watch(db_path=str(tmp_path / "ids.db"))
+    
+    @w.agent(name="id-agent")
+    def func(x):
+        return x
+    
+    for i in range(5):
+        func(i)
+    
+    calls = w.get_calls(agent_name="id-agent")
+    assert all(len(c["call_id"]) == 26 for c in calls)
+    assert all(len(c["trace_id"]) == 26 for c in calls)
+    assert not any(c["call_id"].count("-") == 4 for c in calls)
+    w.close()
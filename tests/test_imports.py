@@ -0,0 +1,53 @@
+"""
+Tests for import-time side effects
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code, cwd):
+    env = dict(os.environ, PYTHONPATH=PACKAGE_ROOT)
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return result.stdout.strip()
+
+
+def test_import_is_lazy():
+    """Test `import argus` loads no Flask/SQLAlchemy and creates no database"""
+    with tempfile.TemporaryDirectory() as cwd:
+        out = run_python(
+            "import sys, argus\n"
+            "print(sorted(m for m in ('flask', 'sqlalchemy', 'asyncio') if m in sys.modules))",
+            cwd
+        )
+        assert out == "[]"
+        assert os.listdir(cwd) == []
+
+
+def test_storage_created_on_first_use():
+    """Test the database is created the first time it's needed"""
+    with tempfile.TemporaryDirectory() as cwd:
+        out = run_python(
+            "import os\n"
+            "from argus import watch\n"
+            "print(os.path.exists('argus.db'))\n"
+            "@watch.agent(name='lazy')\n"
+            "def f():\n"
+            "    return 1\n"
+            "print(os.path.exists('argus.db'))\n"
+            "f()\n"
+            "print(os.path.exists('argus.db'), watch.stats('lazy')['total_calls'])",
+            cwd
+        )
+        assert out.splitlines() == ["False", "False", "True 1"]
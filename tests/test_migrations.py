@@ -0,0 +1,182 @@
+"""
+Tests for schema migrations and call indexes
+"""
+
+import pytest
+import sqlite3
+import tempfile
+import os
+from sqlalchemy.exc import IntegrityError
+from argus import migrations
+from argus.migrations import MIGRATIONS, SCHEMA_VERSION, schema_version
+from argus.storage import Storage
+
+
+# Schema of databases created by Argus 0.1.0
+V0_SCHEMA = """
+    CREATE TABLE agents (
+        id INTEGER PRIMARY KEY, name VARCHAR(255) UNIQUE NOT NULL, tags JSON,
+        total_calls INTEGER, total_cost FLOAT, total_errors INTEGER,
+        avg_duration_ms FLOAT, created_at DATETIME, last_called_at DATETIME
+    );
+    CREATE TABLE calls (
+        id INTEGER PRIMARY KEY, call_id VARCHAR(255) UNIQUE NOT NULL,
+        agent_name VARCHAR(255) NOT NULL, input_data JSON, output_data JSON,
+        status VARCHAR(50), error TEXT, duration_ms INTEGER, cost FLOAT,
+        timestamp DATETIME
+    );
+    INSERT INTO agents (name, tags, total_calls, total_cost, total_errors, avg_duration_ms)
+        VALUES ('legacy', '["old"]', 2, 0.5, 1, 30.0);
+    INSERT INTO calls (call_id, agent_name, status, duration_ms, cost, timestamp)
+        VALUES ('l1', 'legacy', 'success', 20, 0.25, '2026-01-30 10:00:00.000000'),
+               ('l2', 'legacy', 'error', 40, 0.25, '2026-01-30 10:00:01.000000');
+"""
+
+CALL_INDEXES = {
+    "ix_calls_trace_id",
+    "ix_calls_agent_name_timestamp",
+    "ix_calls_timestamp",
+    "ix_calls_status_timestamp",
+    "ix_calls_input_hash",
+    "ix_calls_output_hash",
+}
+
+
+@pytest.fixture
+def db_path():
+    """Temporary database path"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        path = f.name
+    
+    yield path
+    
+    # Cleanup
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def indexes(storage):
+    with storage.engine.connect() as conn:
+        return {row[1] for row in conn.exec_driver_sql("PRAGMA index_list(calls)")}
+
+
+def query_plan(storage, sql):
+    with storage.engine.connect() as conn:
+        return " ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+
+
+def test_versions_are_sequential():
+    """Test migration versions start at 1 and have no gaps"""
+    assert [m.version for m in MIGRATIONS] == list(range(1, SCHEMA_VERSION + 1))
+
+
+def test_new_database_is_current(db_path):
+    """Test a fresh database gets the latest schema and version"""
+    storage = Storage(db_path)
+    
+    assert schema_version(storage.engine) == SCHEMA_VERSION
+    assert CALL_INDEXES <= indexes(storage)
+    storage.engine.dispose()
+
+
+def test_v0_database_upgraded_in_place(db_path):
+    """Test an argus.db from before migrations is upgraded on open"""
+    conn = sqlite3.connect(db_path)
+    conn.executescript(V0_SCHEMA)
+    conn.close()
+    
+    storage = Storage(db_path)
+    
+    assert schema_version(storage.engine) == SCHEMA_VERSION
+    assert CALL_INDEXES <= indexes(storage)
+    
+    stats = storage.get_stats("legacy")
+    assert stats["total_calls"] == 2
+    assert stats["avg_duration_ms"] == pytest.approx(30.0)
+    assert stats["min_duration_ms"] == 20
+    assert stats["max_duration_ms"] == 40
+    assert stats["latency_percentiles"]["p50"] == pytest.approx(20, rel=0.02)
+    assert [c["call_id"] for c in storage.get_calls("legacy")] == ["l2", "l1"]
+    assert storage.get_calls("legacy")[0]["trace_id"] is None
+    storage.engine.dispose()
+
+
+def test_call_ids_never_reused_after_upgrade(db_path):
+    """Test the calls table is rebuilt with AUTOINCREMENT, keeping rows and indexes"""
+    conn = sqlite3.connect(db_path)
+    conn.executescript(V0_SCHEMA)
+    conn.close()
+    
+    storage = Storage(db_path)
+    assert CALL_INDEXES <= indexes(storage)
+    assert [c["call_id"] for c in storage.get_calls("legacy")] == ["l2", "l1"]
+    with storage.engine.begin() as conn:
+        assert "AUTOINCREMENT" in conn.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE name = 'calls'"
+        ).scalar()
+        with pytest.raises(IntegrityError):
+            conn.exec_driver_sql(
+                "INSERT INTO calls (call_id, agent_name) VALUES ('l1', 'legacy')"
+            )
+    with storage.engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM calls WHERE call_id = 'l2'")
+        conn.exec_driver_sql("INSERT INTO calls (call_id, agent_name) VALUES ('l3', 'legacy')")
+        assert conn.exec_driver_sql("SELECT id FROM calls WHERE call_id = 'l3'").scalar() == 3
+    storage.engine.dispose()
+
+
+def test_current_database_skips_migrations(db_path, monkeypatch):
+    """Test reopening an up-to-date database runs no migrations"""
+    Storage(db_path).engine.dispose()
+    
+    def fail(cursor):
+        raise AssertionError("migration re-applied")
+    
+    monkeypatch.setattr(
+        migrations, "MIGRATIONS", [m._replace(apply=fail) for m in MIGRATIONS]
+    )
+    storage = Storage(db_path)
+    
+    assert schema_version(storage.engine) == SCHEMA_VERSION
+    storage.engine.dispose()
+
+
+def test_failed_migration_rolls_back(db_path, monkeypatch):
+    """Test a failing migration leaves the database at its old version"""
+    conn = sqlite3.connect(db_path)
+    conn.executescript(V0_SCHEMA)
+    conn.close()
+    
+    def fail(cursor):
+        raise RuntimeError("boom")
+    
+    monkeypatch.setattr(
+        migrations, "MIGRATIONS", MIGRATIONS[:-1] + [MIGRATIONS[-1]._replace(apply=fail)]
+    )
+    with pytest.raises(RuntimeError):
+        Storage(db_path)
+    
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(calls)")}
+    assert "trace_id" not in columns
+    conn.close()
+
+
+@pytest.mark.parametrize("where, index", [
+    ("WHERE agent_name = 'a'", "ix_calls_agent_name_timestamp"),
+    ("", "ix_calls_timestamp"),
+    ("WHERE status = 'error'", "ix_calls_status_timestamp"),
+])
+def test_recent_calls_use_index(db_path, where, index):
+    """Test recent-call queries walk an index instead of scanning and sorting"""
+    storage = Storage(db_path)
+    
+    plan = query_plan(
+        storage,
+        f"SELECT * FROM calls {where} ORDER BY timestamp DESC LIMIT 100"
+    )
+    assert index in plan
+    assert "TEMP B-TREE" not in plan
+    storage.engine.dispose()
@@ -0,0 +1,156 @@
+"""
+Tests for keyset pagination and call filters
+"""
+
+import pytest
+from datetime import timedelta
+from sqlalchemy import event
+from argus.storage import Storage, PartitionedStorage
+from .conftest import START, record
+
+
+def all_pages(storage, **kwargs):
+    """call_ids of every page, and how many pages there were"""
+    seen, pages, cursor = [], 0, None
+    while True:
+        page = storage.get_calls_page(cursor=cursor, **kwargs)
+        seen.extend(c["call_id"] for c in page["calls"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return seen, pages
+
+
+def test_pages_cover_every_call_once(db_path):
+    """Test walking the cursor returns each call exactly once, newest first"""
+    storage = Storage(db_path)
+    storage.log_calls([record(i) for i in range(95)])
+    
+    seen, pages = all_pages(storage, limit=10)
+    
+    assert pages == 10
+    assert seen == [f"c{i:05d}" for i in reversed(range(95))]
+
+
+def test_same_timestamp_split_across_pages(db_path):
+    """Test ties on timestamp are broken by id, not skipped or repeated"""
+    storage = Storage(db_path)
+    storage.log_calls([record(i, timestamp=START) for i in range(25)])
+    
+    seen, _ = all_pages(storage, limit=7)
+    
+    assert sorted(seen) == [f"c{i:05d}" for i in range(25)]
+    assert len(set(seen)) == 25
+
+
+def test_last_page_has_no_cursor(db_path):
+    """Test an exact multiple of limit doesn't end on an empty page"""
+    storage = Storage(db_path)
+    storage.log_calls([record(i) for i in range(20)])
+    
+    first = storage.get_calls_page(limit=10)
+    second = storage.get_calls_page(limit=10, cursor=first["next_cursor"])
+    
+    assert first["next_cursor"] is not None
+    assert len(second["calls"]) == 10
+    assert second["next_cursor"] is None
+
+
+def test_filters(db_path):
+    """Test status, duration, cost and time range filters"""
+    storage = Storage(db_path)
+    storage.log_calls([
+        record(0, status="error", duration_ms=5000, cost=1.0),
+        record(1, duration_ms=20),
+        record(2, status="error", duration_ms=20),
+        record(3, duration_ms=3000, cost=0.5),
+    ])
+    
+    def ids(**filters):
+        return [c["call_id"] for c in storage.get_calls(**filters)]
+    
+    assert ids(status="error") == ["c00002", "c00000"]
+    assert ids(min_duration_ms=1000) == ["c00003", "c00000"]
+    assert ids(max_duration_ms=20) == ["c00002", "c00001"]
+    assert ids(min_cost=0.5) == ["c00003", "c00000"]
+    assert ids(status="error", min_duration_ms=1000) == ["c00000"]
+    assert ids(since=START + timedelta(seconds=1), until=START + timedelta(seconds=3)) == [
+        "c00002", "c00001"
+    ]
+
+
+def test_tags_filter_merges_agents(db_path):
+    """Test tag filters page through several agents in time order"""
+    storage = Storage(db_path)
+    storage.register_agent("support", ["prod", "chat"])
+    storage.register_agent("search", ["prod"])
+    storage.register_agent("scratch", ["dev"])
+    storage.log_calls([
+        record(i, agent_name=["support", "search", "scratch"][i % 3]) for i in range(30)
+    ])
+    
+    seen, _ = all_pages(storage, limit=4, tags=["prod"])
+    assert seen == [f"c{i:05d}" for i in reversed(range(30)) if i % 3 != 2]
+    
+    assert {c["agent_name"] for c in storage.get_calls(tags=["prod", "chat"])} == {"support"}
+    assert storage.get_calls(tags=["prod"], agent_name="scratch") == []
+    assert storage.get_calls(tags=["missing"]) == []
+
+
+def test_invalid_cursor(db_path):
+    """Test a malformed cursor is a ValueError"""
+    storage = Storage(db_path)
+    with pytest.raises(ValueError):
+        storage.get_calls_page(cursor="not-a-cursor")
+
+
+@pytest.mark.parametrize("limit", [0, -2])
+def test_page_limit_below_one(db_path, limit):
+    """Test a page limit below 1 is a ValueError, not an unbounded read"""
+    storage = Storage(db_path)
+    storage.log_calls([record(i) for i in range(3)])
+    with pytest.raises(ValueError):
+        storage.get_calls_page(limit=limit)
+    assert storage.get_calls(limit=0) == []
+
+
+@pytest.mark.parametrize("filters, index", [
+    ({}, "ix_calls_timestamp"),
+    ({"agent_name": "a"}, "ix_calls_agent_name_timestamp"),
+    ({"status": "error"}, "ix_calls_status_timestamp"),
+])
+def test_deep_pages_use_index(db_path, filters, index):
+    """Test the keyset condition seeks into the index instead of scanning"""
+    storage = Storage(db_path)
+    storage.log_calls([record(i, status="error") for i in range(50)])
+    cursor = storage.get_calls_page(limit=10, **filters)["next_cursor"]
+    assert cursor is not None
+    
+    statements = []
+    
+    def capture(conn, cursor_, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+    
+    event.listen(storage.engine, "before_cursor_execute", capture)
+    storage.get_calls_page(limit=10, cursor=cursor, **filters)
+    event.remove(storage.engine, "before_cursor_execute", capture)
+    
+    statement, parameters = next(s for s in statements if "FROM calls" in s[0])
+    with storage.engine.connect() as conn:
+        plan = " ".join(
+            row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        )
+    assert f"USING INDEX {index}" in plan
+    assert "timestamp<" in plan.replace(" ", "")
+    assert "TEMP B-TREE" not in plan
+
+
+def test_pages_across_partitions(db_path):
+    """Test cursors carry over from one partition file to the next"""
+    storage = PartitionedStorage(db_path, partition="hour")
+    storage.log_calls([record(i, timestamp=START + timedelta(minutes=7 * i)) for i in range(40)])
+    
+    seen, _ = all_pages(storage, limit=6)
+    
+    assert len(storage.partitions()) > 3
+    assert seen == [f"c{i:05d}" for i in reversed(range(40))]
@@ -0,0 +1,199 @@
+"""
+Tests for day/hour-partitioned call storage
+"""
+
+import pytest
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from argus import Watch, RetentionPolicy
+from argus.ids import new_id
+from argus.partitions import detect_partitioning
+from argus.storage import Storage, PartitionedStorage
+from .conftest import START, record
+
+
+def fill(storage, days=3, per_day=4):
+    storage.log_calls([
+        record(i, call_id=f"d{d}-{i}", timestamp=START + timedelta(days=d, minutes=i))
+        for d in range(days)
+        for i in range(per_day)
+    ])
+
+
+def test_calls_routed_to_day_files(db_path):
+    """Test each day's calls land in their own file"""
+    storage = PartitionedStorage(db_path, partition="day")
+    fill(storage)
+    
+    assert [p.key for p in storage.partitions()] == ["2026-03-01", "2026-03-02", "2026-03-03"]
+    assert detect_partitioning(db_path) == "day"
+    
+    calls = storage.get_calls(limit=100)
+    assert len(calls) == 12
+    assert calls == sorted(calls, key=lambda c: c["timestamp"], reverse=True)
+    # Aggregates still live in the main database
+    assert storage.get_stats("a")["total_calls"] == 12
+
+
+def test_hour_partitions(db_path):
+    """Test hourly partitioning"""
+    storage = PartitionedStorage(db_path, partition="hour")
+    storage.log_calls([record(i, timestamp=START + timedelta(minutes=40 * i)) for i in range(5)])
+    
+    assert [p.key for p in storage.partitions()] == [
+        "2026-03-01T12", "2026-03-01T13", "2026-03-01T14"
+    ]
+    assert detect_partitioning(db_path) == "hour"
+
+
+def test_time_range_only_opens_covering_partitions(db_path):
+    """Test get_calls with a range queries just the matching files"""
+    storage = PartitionedStorage(db_path, partition="day")
+    fill(storage)
+    
+    sessions = storage._call_sessions(
+        START + timedelta(days=1), START + timedelta(days=1, hours=1)
+    )
+    assert len(sessions) == 2   # 2026-03-02 + the main database
+    
+    calls = storage.get_calls(since=START + timedelta(days=1), until=START + timedelta(days=2))
+    assert {c["call_id"] for c in calls} == {f"d1-{i}" for i in range(4)}
+
+
+def test_limit_stops_at_newest_partitions(db_path):
+    """Test a small limit doesn't read older partitions"""
+    storage = PartitionedStorage(db_path, partition="day")
+    fill(storage)
+    
+    queried = []
+    for p in storage.partitions():
+        engine, _ = storage._open_partition(p.key)
+        event.listen(engine, "before_cursor_execute",
+                     lambda *args, key=p.key: queried.append(key))
+    
+    calls = storage.get_calls(limit=3)
+    assert [c["call_id"] for c in calls] == ["d2-3", "d2-2", "d2-1"]
+    assert set(queried) == {"2026-03-03"}
+
+
+def test_trace_found_across_partition_boundary(db_path):
+    """Test a trace spanning midnight is read from both days"""
+    storage = PartitionedStorage(db_path, partition="day")
+    trace_id = new_id()
+    started = datetime.utcnow().replace(hour=23, minute=59, second=59)
+    storage.log_calls([
+        record(0, call_id="root", timestamp=started, trace_id=trace_id),
+        record(1, call_id="child", timestamp=started + timedelta(seconds=2), trace_id=trace_id),
+    ])
+    
+    assert len(storage.partitions()) == 2
+    assert [s["call_id"] for s in storage.get_trace(trace_id)] == ["root", "child"]
+
+
+def test_retention_drops_partition_files(db_path):
+    """Test expired days are deleted as files and straddling days row by row"""
+    storage = PartitionedStorage(db_path, partition="day")
+    now = datetime.utcnow()
+    storage.log_calls([
+        record(i, timestamp=now - timedelta(days=10, minutes=i)) for i in range(5)
+    ])
+    storage.log_calls([record(i, timestamp=now - timedelta(minutes=i)) for i in range(5, 10)])
+    
+    report = storage.compact(RetentionPolicy(calls_ttl="3d"), pause=0)
+    
+    assert report["calls_deleted"] == 5
+    assert len(storage.partitions()) == 1
+    assert len(storage.get_calls()) == 5
+    assert storage.get_stats("a")["total_calls"] == 10
+
+
+def test_agent_override_keeps_partition(db_path):
+    """Test a longer per-agent TTL turns a file drop into row deletes"""
+    storage = PartitionedStorage(db_path, partition="day")
+    old = datetime.utcnow() - timedelta(days=10)
+    storage.log_calls([
+        record(0, "short", call_id="short", timestamp=old),
+        record(1, "long", call_id="long", timestamp=old),
+    ])
+    
+    report = storage.compact(RetentionPolicy(calls_ttl="3d", agent_ttls={"long": "30d"}), pause=0)
+    
+    assert report["calls_deleted"] == 1
+    assert [c["call_id"] for c in storage.get_calls()] == ["long"]
+
+
+def test_unpartitioned_calls_still_read(db_path):
+    """Test switching an existing database to partitions keeps its calls"""
+    Storage(db_path).log_calls([
+        record(99, call_id="legacy", timestamp=START - timedelta(days=30))
+    ])
+    
+    storage = PartitionedStorage(db_path, partition="day")
+    fill(storage, days=1)
+    
+    assert [c["call_id"] for c in storage.get_calls(limit=100)][-1] == "legacy"
+
+
+def test_watch_partition_option(db_path):
+    """Test Watch(partition=...) and validation"""
+    with pytest.raises(ValueError):
+        Watch(db_path=db_path, partition="week")
+    
+    w = Watch(db_path=db_path, partition="day")
+    
+    @w.agent(name="partitioned")
+    def func(x):
+        return x
+    
+    func(1)
+    assert isinstance(w.storage, PartitionedStorage)
+    assert len(w.storage.partitions()) == 1
+    assert w.get_calls(agent_name="partitioned")[0]["agent_name"] == "partitioned"
+    w.close()
+
+
+def test_old_partition_files_migrated(db_path):
+    """Test partition files written by older versions are upgraded and stamped"""
+    import sqlite3
+    from argus.migrations import SCHEMA_VERSION
+    from argus.partitions import partition_dir
+    
+    os.makedirs(partition_dir(db_path))
+    path = os.path.join(partition_dir(db_path), "calls-2026-03-01.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE calls (
+            id INTEGER PRIMARY KEY, call_id VARCHAR(255) UNIQUE NOT NULL,
+            agent_name VARCHAR(255) NOT NULL, input_data JSON, output_data JSON,
+            status VARCHAR(50), error TEXT, duration_ms INTEGER, cost FLOAT,
+            timestamp DATETIME
+        );
+        INSERT INTO calls (call_id, agent_name, status, duration_ms, cost, timestamp)
+            VALUES ('old', 'p', 'success', 10, 0.0, '2026-03-01 12:00:00.000000');
+    """)
+    conn.close()
+    
+    storage = PartitionedStorage(db_path, partition="day")
+    fill(storage, days=1)
+    
+    assert len(storage.get_calls(limit=100)) == 5
+    conn = sqlite3.connect(path)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(calls)")}
+    assert {"trace_id", "input_hash"} <= columns
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    conn.close()
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc")
+def test_partitions_hold_no_open_files(db_path):
+    """Test reading hundreds of partitions doesn't keep their files open"""
+    storage = PartitionedStorage(db_path, partition="hour")
+    before = len(os.listdir("/proc/self/fd"))
+    storage.log_calls([
+        record(h, timestamp=START + timedelta(hours=h)) for h in range(200)
+    ])
+    
+    assert len(list(storage.iter_calls())) == 200
+    assert len(storage.get_calls(limit=500)) == 200
+    assert len(os.listdir("/proc/self/fd")) - before < 10
@@ -0,0 +1,172 @@
+"""
+Tests for the compressed, content-addressed payload store
+"""
+
+import pytest
+import sqlite3
+import tempfile
+import json
+import os
+import shutil
+from datetime import datetime, timedelta
+from argus import RetentionPolicy
+from argus.payloads import PayloadBatch, decode_payload, encode_payload
+from argus.storage import Storage, PartitionedStorage
+
+
+@pytest.fixture
+def db_path():
+    """Temporary database path in its own directory"""
+    directory = tempfile.mkdtemp()
+    yield os.path.join(directory, "argus.db")
+    shutil.rmtree(directory)
+
+
+def record(call_id, input_data, output_data=None, timestamp=None):
+    return dict(
+        call_id=call_id, agent_name="p", input_data=input_data,
+        output_data=output_data if output_data is not None else {"result": "ok"},
+        status="success", error=None, duration_ms=10, cost=0.01,
+        timestamp=timestamp or datetime.utcnow()
+    )
+
+
+def payload_rows(storage):
+    with storage.engine.connect() as conn:
+        return conn.exec_driver_sql("SELECT hash, codec, size, length(data) FROM payloads").all()
+
+
+def test_encode_round_trip():
+    """Test small payloads stay raw and large ones are compressed"""
+    small = {"args": "hi"}
+    large = {"args": "the same prompt " * 200}
+    
+    digest, codec, size, blob = encode_payload(small)
+    assert codec == "raw"
+    assert decode_payload(codec, blob) == small
+    
+    digest, codec, size, blob = encode_payload(large)
+    assert codec == "zlib"
+    assert len(blob) < size
+    assert decode_payload(codec, blob) == large
+    
+    assert encode_payload(None) is None
+    with pytest.raises(ValueError):
+        decode_payload("lz4", blob)
+
+
+def test_hash_ignores_key_order():
+    """Test equal payloads hash the same whatever their key order"""
+    assert encode_payload({"a": 1, "b": 2})[0] == encode_payload({"b": 2, "a": 1})[0]
+    assert encode_payload({"a": 1})[0] != encode_payload({"a": 2})[0]
+
+
+def test_batch_encodes_each_payload_once():
+    """Test a batch keeps one row per distinct payload"""
+    batch = PayloadBatch()
+    shared = {"args": "x"}
+    hashes = [batch.add(shared), batch.add(shared), batch.add({"args": "x"}), batch.add(None)]
+    
+    assert hashes[0] == hashes[1] == hashes[2]
+    assert hashes[3] is None
+    assert len(batch) == 1
+    assert batch.rows([None, hashes[0], hashes[0]]) == batch.rows()
+
+
+def test_identical_payloads_stored_once(db_path):
+    """Test repeated prompts share one compressed row"""
+    storage = Storage(db_path)
+    prompt = {"args": "You are a helpful assistant. " * 100}
+    storage.log_calls([record(f"c{i}", prompt) for i in range(50)])
+    storage.log_calls([record(f"d{i}", dict(prompt)) for i in range(50)])
+    
+    rows = payload_rows(storage)
+    assert len(rows) == 2   # The prompt and {"result": "ok"}
+    stored = {row[1]: row for row in rows}
+    assert stored["zlib"][3] < stored["zlib"][2] / 10
+
+
+def test_calls_listed_without_payloads(db_path):
+    """Test get_calls() reads only metrics and get_call() loads payloads"""
+    storage = Storage(db_path)
+    storage.log_calls([record("c1", {"args": "question"}, {"result": "answer"})])
+    
+    listed = storage.get_calls()
+    assert "input_data" not in listed[0]
+    
+    call = storage.get_call("c1")
+    assert call["input_data"] == {"args": "question"}
+    assert call["output_data"] == {"result": "answer"}
+    assert storage.get_call("missing") is None
+    
+    with storage.engine.connect() as conn:
+        inline = conn.exec_driver_sql("SELECT input_data, output_data FROM calls").one()
+    assert inline == (None, None)
+
+
+def test_inline_payloads_still_read(db_path):
+    """Test calls written before the payloads table keep their data"""
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE calls (
+            id INTEGER PRIMARY KEY, call_id VARCHAR(255) UNIQUE NOT NULL,
+            agent_name VARCHAR(255) NOT NULL, input_data JSON, output_data JSON,
+            status VARCHAR(50), error TEXT, duration_ms INTEGER, cost FLOAT,
+            timestamp DATETIME
+        );
+        INSERT INTO calls (call_id, agent_name, input_data, output_data, status,
+                           duration_ms, cost, timestamp)
+            VALUES ('old', 'p', '{"args": "inline"}', '{"result": 1}', 'success',
+                    5, 0.0, '2026-01-30 10:00:00.000000');
+    """)
+    conn.close()
+    
+    storage = Storage(db_path)
+    storage.log_calls([record("new", {"args": "hashed"})])
+    
+    assert storage.get_call("old")["input_data"] == {"args": "inline"}
+    assert storage.get_call("new")["input_data"] == {"args": "hashed"}
+    
+    export_path = db_path + ".json"
+    storage.export(export_path, format="json")
+    with open(export_path) as f:
+        exported = {c["call_id"]: c for c in json.load(f)}
+    assert exported["old"]["output_data"] == {"result": 1}
+    assert exported["new"]["input_data"] == {"args": "hashed"}
+
+
+def test_compact_deletes_orphaned_payloads(db_path):
+    """Test payloads go once no remaining call refers to them"""
+    storage = Storage(db_path)
+    old = datetime.utcnow() - timedelta(days=60)
+    storage.log_calls([
+        record("expired", {"args": "only old"}, timestamp=old),
+        record("shared-old", {"args": "shared"}, timestamp=old),
+        record("shared-new", {"args": "shared"}),
+    ])
+    
+    report = storage.compact(RetentionPolicy(calls_ttl="30d"), pause=0)
+    
+    assert report["calls_deleted"] == 2
+    assert report["payloads_deleted"] == 1
+    assert storage.get_call("shared-new")["input_data"] == {"args": "shared"}
+    assert len(payload_rows(storage)) == 2
+
+
+def test_partitions_keep_their_own_payloads(db_path):
+    """Test each partition file stores the payloads of its calls"""
+    storage = PartitionedStorage(db_path, partition="day")
+    day = datetime(2026, 3, 1, 12, 0)
+    storage.log_calls([
+        record("a", {"args": "monday"}, timestamp=day),
+        record("b", {"args": "tuesday"}, timestamp=day + timedelta(days=1)),
+    ])
+    
+    counts = []
+    for p in storage.partitions():
+        conn = sqlite3.connect(p.path)
+        counts.append(conn.execute("SELECT COUNT(*) FROM payloads").fetchone()[0])
+        conn.close()
+    assert counts == [2, 2]
+    assert payload_rows(storage) == []
+    assert storage.get_call("b")["input_data"] == {"args": "tuesday"}
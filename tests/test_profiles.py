@@ -0,0 +1,95 @@
+"""
+Tests for SQLite storage profiles
+"""
+
+import pytest
+import sqlite3
+import tempfile
+import os
+from argus import Watch
+from argus.storage import Storage
+
+
+@pytest.fixture
+def db_path():
+    """Temporary database path"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        path = f.name
+    
+    yield path
+    
+    # Cleanup
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def pragma(storage, name):
+    with storage.engine.connect() as conn:
+        return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+@pytest.mark.parametrize("profile, journal_mode, synchronous", [
+    ("durable", "delete", 2),
+    ("balanced", "delete", 2),
+    ("concurrent", "wal", 1),
+    ("fast", "wal", 0),
+])
+def test_profile_pragmas_applied(db_path, profile, journal_mode, synchronous):
+    """Test every connection gets the profile's pragmas"""
+    storage = Storage(db_path, profile=profile)
+    
+    assert pragma(storage, "journal_mode") == journal_mode
+    assert pragma(storage, "synchronous") == synchronous
+    assert pragma(storage, "busy_timeout") > 0
+    storage.engine.dispose()
+
+
+def test_watch_passes_profile_to_storage(db_path):
+    """Test Watch(profile=...) reaches the storage engine"""
+    w = Watch(db_path=db_path, profile="fast")
+    
+    assert w.storage.profile == "fast"
+    assert pragma(w.storage, "synchronous") == 0
+    w.close()
+
+
+def test_unknown_profile_rejected(db_path):
+    """Test a typo fails at construction, not on the first call"""
+    with pytest.raises(ValueError):
+        Watch(db_path=db_path, profile="turbo")
+
+
+def test_default_profile_keeps_journal_mode(db_path):
+    """Test opening a database with the default profile never switches it to WAL"""
+    storage = Storage(db_path)
+    storage.register_agent("a", [])
+    storage.engine.dispose()
+    
+    assert not os.path.exists(db_path + "-wal")
+    assert sqlite3.connect(db_path).execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    
+    # ...and leaves a WAL database in WAL
+    Storage(db_path, profile="concurrent").engine.dispose()
+    storage = Storage(db_path)
+    assert pragma(storage, "journal_mode") == "wal"
+    storage.engine.dispose()
+
+
+def test_reads_while_another_connection_writes(db_path):
+    """Test the dashboard can read during an open write transaction"""
+    storage = Storage(db_path, profile="concurrent")
+    storage.register_agent("busy", [])
+    
+    writer = sqlite3.connect(db_path)
+    writer.execute("BEGIN IMMEDIATE")
+    writer.execute("UPDATE agents SET total_calls = 99 WHERE name = 'busy'")
+    try:
+        # Readers see the last committed state instead of "database is locked"
+        assert storage.get_stats("busy")["total_calls"] == 0
+    finally:
+        writer.commit()
+        writer.close()
+    
+    assert storage.get_stats("busy")["total_calls"] == 99
+    storage.engine.dispose()
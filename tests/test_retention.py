@@ -0,0 +1,171 @@
+"""
+Tests for retention and compaction
+"""
+
+import pytest
+import sqlite3
+import tempfile
+import threading
+import os
+from datetime import datetime, timedelta
+from argus import Watch, RetentionPolicy
+from argus.storage import Storage
+
+
+@pytest.fixture
+def db_path():
+    """Temporary database path"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        path = f.name
+    os.remove(path)
+    
+    yield path
+    
+    # Cleanup
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def calls(agent_name, age, n, prefix, payload=""):
+    ts = datetime.utcnow() - age
+    return [
+        dict(call_id=f"{prefix}{i}", agent_name=agent_name,
+             input_data={"args": payload}, output_data={}, status="success",
+             error=None, duration_ms=10, cost=0.01, timestamp=ts)
+        for i in range(n)
+    ]
+
+
+def test_expired_calls_deleted_totals_kept(db_path):
+    """Test old calls go, recent calls and all aggregates stay"""
+    storage = Storage(db_path)
+    storage.register_agent("a", [])
+    storage.log_calls(calls("a", timedelta(days=40), 30, "old"))
+    storage.log_calls(calls("a", timedelta(hours=1), 5, "new"))
+    
+    report = storage.compact(RetentionPolicy(calls_ttl="30d"), chunk_size=7, pause=0)
+    
+    assert report["calls_deleted"] == 30
+    assert {c["call_id"] for c in storage.get_calls(limit=100)} == {f"new{i}" for i in range(5)}
+    assert storage.get_stats("a")["total_calls"] == 35
+    assert sum(r["calls"] for r in storage.get_rollups("hour", since=datetime.utcnow() - timedelta(days=60))) == 35
+    storage.engine.dispose()
+
+
+def test_per_agent_ttl(db_path):
+    """Test an agent override wins over the default TTL"""
+    storage = Storage(db_path)
+    storage.log_calls(calls("noisy", timedelta(days=3), 4, "n"))
+    storage.log_calls(calls("quiet", timedelta(days=3), 4, "q"))
+    storage.log_calls(calls("kept", timedelta(days=60), 4, "k"))
+    
+    report = storage.compact(RetentionPolicy(
+        calls_ttl="2d",
+        agent_ttls={"noisy": "1d", "kept": None}
+    ), pause=0)
+    
+    assert report["calls_deleted"] == 8
+    assert {c["agent_name"] for c in storage.get_calls()} == {"kept"}
+    storage.engine.dispose()
+
+
+def test_rollup_ttls(db_path):
+    """Test each rollup resolution expires on its own schedule"""
+    storage = Storage(db_path)
+    storage.log_calls(calls("a", timedelta(days=5), 1, "x"))
+    
+    storage.compact(RetentionPolicy(
+        calls_ttl=None,
+        rollup_ttls={"minute": "1d", "hour": "10d", "day": None}
+    ), pause=0)
+    
+    since = datetime.utcnow() - timedelta(days=30)
+    assert storage.get_rollups("minute", since=since) == []
+    assert len(storage.get_rollups("hour", since=since)) == 1
+    assert len(storage.get_rollups("day", since=since)) == 1
+    assert len(storage.get_calls()) == 1
+    storage.engine.dispose()
+
+
+def test_incremental_vacuum_reclaims_space(db_path):
+    """Test deleted rows shrink the file on new databases"""
+    storage = Storage(db_path)
+    storage.log_calls(calls("a", timedelta(days=90), 3000, "big", payload="x" * 500))
+    
+    report = storage.compact(pause=0)
+    
+    assert report["calls_deleted"] == 3000
+    assert report["vacuum"] == "incremental"
+    assert report["reclaimed_bytes"] > 1_000_000
+    storage.engine.dispose()
+
+
+def test_old_database_needs_full_vacuum(db_path):
+    """Test databases without auto_vacuum are reported, and fixed by full_vacuum"""
+    sqlite3.connect(db_path).execute("CREATE TABLE placeholder (x)").connection.close()
+    storage = Storage(db_path)
+    storage.log_calls(calls("a", timedelta(days=90), 2000, "big", payload="x" * 500))
+    
+    assert storage.compact(pause=0)["vacuum"] == "needs full_vacuum"
+    
+    storage.log_calls(calls("a", timedelta(days=90), 2000, "more", payload="x" * 500))
+    report = storage.compact(full_vacuum=True, pause=0)
+    assert report["vacuum"] == "full"
+    assert report["reclaimed_bytes"] > 0
+    
+    storage.log_calls(calls("a", timedelta(days=90), 10, "later"))
+    assert storage.compact(pause=0)["vacuum"] == "incremental"
+    storage.engine.dispose()
+
+
+def test_writers_not_blocked_during_compact(db_path):
+    """Test agents keep logging while a large delete runs"""
+    storage = Storage(db_path)
+    storage.register_agent("busy", [])
+    for batch in range(10):
+        storage.log_calls(calls("busy", timedelta(days=40), 1000, f"old{batch}-"))
+    
+    errors = []
+    done = threading.Event()
+    
+    def writer():
+        i = 0
+        try:
+            while not done.is_set():
+                storage.log_calls(calls("busy", timedelta(0), 1, f"live{i}-"))
+                i += 1
+        except Exception as e:
+            errors.append(e)
+    
+    t = threading.Thread(target=writer)
+    t.start()
+    try:
+        report = storage.compact(chunk_size=500)
+    finally:
+        done.set()
+        t.join()
+    
+    assert errors == []
+    assert report["calls_deleted"] == 10000
+    total = storage.get_stats("busy")["total_calls"]
+    assert total > 10000
+    assert len(storage.get_calls(limit=100000)) == total - 10000
+    storage.engine.dispose()
+
+
+def test_watch_compact(db_path):
+    """Test Watch.compact uses the Watch's retention policy"""
+    w = Watch(db_path=db_path, retention=RetentionPolicy(calls_ttl="1h"))
+    w.storage.log_calls(calls("w", timedelta(hours=2), 3, "w"))
+    
+    assert w.compact()["calls_deleted"] == 3
+    w.close()
+
+
+def test_invalid_policy():
+    """Test bad TTLs and resolutions are rejected"""
+    with pytest.raises(ValueError):
+        RetentionPolicy(calls_ttl="-1d")
+    with pytest.raises(ValueError):
+        RetentionPolicy(rollup_ttls={"week": "1d"})
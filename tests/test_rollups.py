@@ -0,0 +1,160 @@
+"""
+Tests for minute/hour/day rollups
+"""
+
+import pytest
+import tempfile
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from argus import Watch
+from argus.rollups import parse_window, resolution_for, merge_counts, LATENCY_BOUNDS_MS
+from argus.storage import Storage
+
+
+@pytest.fixture
+def storage():
+    """Create a Storage instance with temporary database"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+    
+    s = Storage(db_path)
+    s.register_agent("roll", [])
+    yield s
+    s.engine.dispose()
+    
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+def record(call_id, timestamp, duration_ms=10, status="success", cost=0.1, **extra):
+    return dict(
+        call_id=call_id,
+        agent_name="roll",
+        input_data={},
+        output_data={},
+        status=status,
+        error=None,
+        duration_ms=duration_ms,
+        cost=cost,
+        timestamp=timestamp,
+        **extra
+    )
+
+
+def test_calls_rolled_up_per_resolution(storage):
+    """Test each call lands in its minute, hour and day bucket"""
+    base = datetime(2026, 3, 1, 10, 15, 30)
+    storage.log_calls([
+        record("a", base, duration_ms=5),
+        record("b", base + timedelta(seconds=20), duration_ms=300, status="error"),
+        record("c", base + timedelta(minutes=50), duration_ms=70000),
+    ])
+    
+    minutes = storage.get_rollups("minute", since=base - timedelta(days=1))
+    assert [(m["bucket_start"], m["calls"]) for m in minutes] == [
+        ("2026-03-01T10:15:00", 2),
+        ("2026-03-01T11:05:00", 1),
+    ]
+    assert minutes[0]["errors"] == 1
+    assert minutes[0]["min_duration_ms"] == 5
+    assert minutes[0]["max_duration_ms"] == 300
+    
+    hours = storage.get_rollups("hour", since=base - timedelta(days=1))
+    assert [h["calls"] for h in hours] == [2, 1]
+    
+    days = storage.get_rollups("day", since=base - timedelta(days=1))
+    assert len(days) == 1
+    assert days[0]["calls"] == 3
+    assert days[0]["cost"] == pytest.approx(0.3)
+    assert days[0]["sum_duration_ms"] == 70305
+    histogram = days[0]["histogram"]
+    assert histogram[0] == 1                                   # <= 10ms
+    assert histogram[LATENCY_BOUNDS_MS.index(500)] == 1       # <= 500ms
+    assert histogram[-1] == 1                                  # > 60s
+
+
+def test_batches_merge_into_existing_buckets(storage):
+    """Test later batches add to a bucket instead of replacing it"""
+    ts = datetime(2026, 3, 1, 10, 15)
+    storage.log_calls([record("a", ts, duration_ms=20)])
+    storage.log_calls([record("b", ts, duration_ms=2), record("c", ts, duration_ms=999)])
+    
+    (bucket,) = storage.get_rollups("minute", since=ts)
+    assert bucket["calls"] == 3
+    assert bucket["min_duration_ms"] == 2
+    assert bucket["max_duration_ms"] == 999
+    assert sum(bucket["histogram"]) == 3
+
+
+def test_unsampled_calls_are_rolled_up(storage):
+    """Test rollups count calls that have no row in calls"""
+    now = datetime.utcnow()
+    storage.log_calls([record(f"s{i}", now, sampled=False) for i in range(5)])
+    
+    stats = storage.get_window_stats("1h")
+    assert stats["agents"][0]["calls"] == 5
+    assert storage.get_calls() == []
+
+
+def test_window_stats_read_only_rollups(storage):
+    """Test windowed stats don't touch the calls table"""
+    now = datetime.utcnow()
+    storage.log_calls([
+        record("old", now - timedelta(days=3)),
+        record("recent", now - timedelta(hours=2), duration_ms=30, cost=0.5),
+        record("latest", now, duration_ms=10, status="error", cost=0.25),
+    ])
+    with storage.engine.begin() as conn:
+        conn.execute(text("DELETE FROM calls"))
+    
+    stats = storage.get_window_stats("24h")
+    assert stats["resolution"] == "hour"
+    (agent,) = stats["agents"]
+    assert agent["name"] == "roll"
+    assert agent["calls"] == 2
+    assert agent["errors"] == 1
+    assert agent["cost"] == pytest.approx(0.75)
+    assert agent["avg_duration_ms"] == pytest.approx(20)
+    assert agent["latency_histogram"]["le_10"] == 1
+    assert agent["latency_histogram"]["le_50"] == 1
+
+
+def test_watch_stats_window(tmp_path):
+    """Test Watch.stats(window=...) returns per-agent windowed stats"""
+    w = Watch(db_path=str(tmp_path / "roll.db"))
+    
+    @w.agent(name="windowed")
+    def func(x):
+        return x
+    
+    for i in range(3):
+        func(i)
+    
+    stats = w.stats(window="15m")
+    assert stats["resolution"] == "minute"
+    assert stats["agents"][0]["name"] == "windowed"
+    assert stats["agents"][0]["calls"] == 3
+    assert w.stats(agent_name="other", window="15m")["agents"] == []
+    w.close()
+
+
+def test_parse_window():
+    """Test window strings, numbers and timedeltas"""
+    assert parse_window("30m") == timedelta(minutes=30)
+    assert parse_window("24h") == timedelta(hours=24)
+    assert parse_window("7d") == timedelta(days=7)
+    assert parse_window(90) == timedelta(seconds=90)
+    assert parse_window(timedelta(hours=1)) == timedelta(hours=1)
+    with pytest.raises(ValueError):
+        parse_window("yesterday")
+    
+    assert resolution_for(timedelta(hours=1)) == "minute"
+    assert resolution_for(timedelta(days=1)) == "hour"
+    assert resolution_for(timedelta(days=90)) == "day"
+
+
+def test_merge_counts():
+    """Test the SQL histogram merge adds element-wise"""
+    assert merge_counts("[1, 2, 3]", "[1, 0, 1]") == "[2, 2, 4]"
+    assert merge_counts(None, "[1]") == "[1]"
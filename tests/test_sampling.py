@@ -0,0 +1,126 @@
+"""
+Tests for call sampling
+"""
+
+import pytest
+import tempfile
+import os
+import time
+from argus import Watch, Sampler
+
+
+@pytest.fixture
+def db_path():
+    """Temporary database path"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        path = f.name
+    
+    yield path
+    
+    # Cleanup
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def test_unsampled_calls_keep_exact_totals(db_path):
+    """Test dropped calls still count towards agent totals"""
+    watch = Watch(db_path=db_path, sampling=Sampler(rate=0.0))
+    
+    @watch.agent(name="sampled-agent", cost_per_call=0.5)
+    def func(x):
+        return x
+    
+    for i in range(50):
+        func(i)
+    
+    stats = watch.stats(agent_name="sampled-agent")
+    assert stats["total_calls"] == 50
+    assert stats["total_cost"] == pytest.approx(25.0)
+    assert watch.get_calls(agent_name="sampled-agent") == []
+
+
+def test_tail_rules_keep_errors_and_slow_calls(db_path):
+    """Test errors and slow calls are kept regardless of head rate"""
+    watch = Watch(db_path=db_path, sampling=Sampler(rate=0.0, slow_ms=20))
+    
+    @watch.agent(name="tail-agent")
+    def func(mode):
+        if mode == "error":
+            raise RuntimeError("kept")
+        if mode == "slow":
+            time.sleep(0.03)
+        return mode
+    
+    func("fast")
+    func("slow")
+    with pytest.raises(RuntimeError):
+        func("error")
+    
+    calls = watch.get_calls(agent_name="tail-agent")
+    assert sorted(c["status"] for c in calls) == ["error", "success"]
+    assert watch.stats(agent_name="tail-agent")["total_calls"] == 3
+
+
+def test_cost_threshold(db_path):
+    """Test expensive calls are kept"""
+    watch = Watch(db_path=db_path, sampling=Sampler(rate=0.0, min_cost=1.0))
+    
+    @watch.agent(name="cost-agent")
+    def func(cost):
+        return {"cost": cost}
+    
+    func(0.1)
+    func(2.0)
+    
+    calls = watch.get_calls(agent_name="cost-agent")
+    assert [c["cost"] for c in calls] == [2.0]
+
+
+def test_per_agent_rates(db_path):
+    """Test per-agent rates override the default"""
+    watch = Watch(
+        db_path=db_path,
+        sampling=Sampler(rate=0.0, agent_rates={"always": 1.0})
+    )
+    
+    @watch.agent(name="always")
+    def always():
+        return 1
+    
+    @watch.agent(name="never")
+    def never():
+        return 1
+    
+    @watch.agent(name="decorated", sample_rate=1.0)
+    def decorated():
+        return 1
+    
+    for _ in range(5):
+        always()
+        never()
+        decorated()
+    
+    assert len(watch.get_calls(agent_name="always")) == 5
+    assert len(watch.get_calls(agent_name="never")) == 0
+    assert len(watch.get_calls(agent_name="decorated")) == 5
+
+
+def test_manual_tracking_sampling(db_path):
+    """Test start/end apply head and tail sampling"""
+    watch = Watch(db_path=db_path, sampling=Sampler(rate=0.0))
+    watch.storage.register_agent("manual", [])
+    
+    ok = watch.start("manual", {"q": 1})
+    watch.end(ok, {"a": 1})
+    failed = watch.start("manual", {"q": 2})
+    watch.end(failed, {}, error="timeout")
+    
+    calls = watch.get_calls(agent_name="manual")
+    assert [c["call_id"] for c in calls] == [failed]
+    assert watch.stats(agent_name="manual")["total_calls"] == 2
+
+
+def test_invalid_rate():
+    """Test rates outside 0-1 are rejected"""
+    with pytest.raises(ValueError):
+        Sampler(rate=1.5)
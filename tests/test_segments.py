@@ -0,0 +1,288 @@
+"""
+Tests for the segment log backend
+"""
+
+import pytest
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from argus import Watch
+from argus.backends import SegmentLogBackend
+from argus.backends import segments
+from argus.backends.segments import encode_record, iter_records, _log_record
+from argus.storage import Storage
+from .conftest import START, record
+
+
+@pytest.fixture
+def backend(tmp_path):
+    # Folds only when a test asks for one
+    backend = SegmentLogBackend(os.path.join(tmp_path, "argus.db"), fold_interval=3600)
+    yield backend
+    backend.close()
+
+
+def segment_files(backend):
+    return sorted(
+        name
+        for writer in os.listdir(backend.log_dir)
+        for name in os.listdir(os.path.join(backend.log_dir, writer))
+        if name.endswith(".seg")
+    )
+
+
+def test_record_round_trip():
+    """Test records decode to what was logged, and a torn frame ends the segment"""
+    first = record(
+        1, status="error", trace_id="t1", span_id="s1", parent_span_id=None, duration_ms=12.5
+    )
+    second = record(
+        2, agent_name="ünï", input_data=None, trace_id=None, span_id=None,
+        parent_span_id=None, sampled=False
+    )
+    data = encode_record(first) + encode_record(second)
+    
+    decoded = [_log_record(r) for _, _, r in iter_records(data)]
+    assert decoded[0] == dict(first, sampled=True)
+    assert decoded[1] == second
+    assert isinstance(decoded[1]["duration_ms"], int)
+    
+    # Aware timestamps are stored as naive UTC, like everywhere else
+    aware = datetime(2026, 3, 1, 14, 0, tzinfo=timezone(timedelta(hours=2)))
+    _, _, decoded = next(iter_records(encode_record(record(4, timestamp=aware))))
+    assert decoded["timestamp"] == datetime(2026, 3, 1, 12, 0)
+    
+    torn = data + encode_record(record(3))[:-1]
+    assert len(list(iter_records(torn))) == 2
+    corrupt = data[:-1] + bytes([data[-1] ^ 1])
+    assert len(list(iter_records(corrupt))) == 1
+
+
+def test_calls_readable_before_fold(backend):
+    """Test get_calls and get_call see calls still in segments"""
+    backend.register_agent("a", ["prod"])
+    backend.log_calls([
+        record(i, duration_ms=10 * (i + 1), trace_id="t1" if i < 2 else None) for i in range(5)
+    ])
+    
+    assert [c["call_id"] for c in backend.get_calls()] == [f"c{i:05d}" for i in range(4, -1, -1)]
+    assert backend.get_call("c00003")["output_data"] == {"result": 3}
+    assert [s["call_id"] for s in backend.get_trace("t1")] == ["c00000", "c00001"]
+    assert backend.get_calls(tags=["prod"], min_duration_ms=30)[-1]["call_id"] == "c00002"
+    # Totals come from SQLite
+    assert backend.get_stats()["total_calls"] == 0
+    
+    assert backend.fold() == 5
+    assert backend.get_stats()["total_calls"] == 5
+    assert len(backend.get_calls()) == 5
+    
+    # Folding picks up where it stopped in the same segment
+    backend.log_calls([record(i) for i in range(5, 8)])
+    assert backend.fold() == 3
+    assert backend.get_stats()["total_calls"] == 8
+    assert segment_files(backend) == ["0000000000.seg"]
+    assert len(backend.get_calls()) == 8
+
+
+def test_same_results_as_sqlite(tmp_path, backend):
+    """Test reads match plain SQLite, half folded and fully folded"""
+    sqlite = Storage(os.path.join(tmp_path, "plain.db"))
+    calls = [
+        record(i, agent_name="ab"[i % 2], status="error" if i % 5 == 0 else "success",
+               cost=0.01 * i, trace_id="t1" if i % 3 == 0 else None)
+        for i in range(20)
+    ]
+    calls.append(record(20, sampled=False))
+    # Same batches, so costs are summed in the same order
+    sqlite.log_calls(calls[:10])
+    sqlite.log_calls(calls[10:])
+    backend.log_calls(calls[:10])
+    backend.fold()
+    backend.log_calls(calls[10:])
+    
+    def same(read):
+        assert read(backend) == read(sqlite)
+    
+    same(lambda s: s.get_calls(limit=50))
+    same(lambda s: s.get_calls("b", limit=3))
+    same(lambda s: s.get_calls(status="error", min_cost=0.05))
+    same(lambda s: s.get_call("c00015"))
+    same(lambda s: s.get_call("c00020"))
+    same(lambda s: s.get_trace("t1"))
+    
+    backend.fold()
+    same(lambda s: s.get_stats())
+    same(lambda s: s.list_agents())
+    same(lambda s: s.get_rollups("minute"))
+    same(lambda s: list(s.iter_calls()))
+
+
+def test_pages_span_segments_and_sqlite(backend):
+    """Test cursors walk folded and unfolded calls once each"""
+    backend.log_calls([record(i) for i in range(0, 10, 2)])
+    backend.fold()
+    backend.log_calls([record(i) for i in range(1, 10, 2)])
+    
+    seen = []
+    page = backend.get_calls_page(limit=3)
+    seen.extend(page["calls"])
+    while page["next_cursor"]:
+        page = backend.get_calls_page(limit=3, cursor=page["next_cursor"])
+        seen.extend(page["calls"])
+    
+    assert [c["call_id"] for c in seen] == [f"c{i:05d}" for i in range(9, -1, -1)]
+
+
+def test_pages_stable_across_writers_and_folds(tmp_path, backend):
+    """Test calls with one timestamp from two writers page once each while folding"""
+    other = SegmentLogBackend(os.path.join(tmp_path, "argus.db"), fold_interval=3600)
+    backend.log_calls([record(i, timestamp=START) for i in range(0, 6, 2)])
+    other.log_calls([record(i, timestamp=START) for i in range(1, 6, 2)])
+    
+    seen = []
+    page = backend.get_calls_page(limit=2)
+    seen.extend(page["calls"])
+    while page["next_cursor"]:
+        backend.fold()
+        other.fold()
+        page = backend.get_calls_page(limit=2, cursor=page["next_cursor"])
+        seen.extend(page["calls"])
+    other.close()
+    
+    assert [c["call_id"] for c in seen] == [f"c{i:05d}" for i in range(5, -1, -1)]
+
+
+def test_partitioned_fold_replayed_after_crash(tmp_path, monkeypatch):
+    """Test a fold that committed partitions but not the main database is redone in full"""
+    backend = SegmentLogBackend(
+        os.path.join(tmp_path, "argus.db"), partition="hour", fold_interval=3600
+    )
+    backend.log_calls([record(i) for i in range(3)])
+    
+    monkeypatch.setattr(segments, "_UPSERT_CHECKPOINT", "INSERT INTO missing VALUES (?, ?, ?)")
+    with pytest.raises(sqlite3.OperationalError):
+        backend.fold()
+    assert len(backend.store.get_calls()) == 3
+    assert backend.get_stats()["total_calls"] == 0
+    
+    monkeypatch.undo()
+    assert backend.fold() == 3
+    assert backend.get_stats()["total_calls"] == 3
+    assert len(backend.get_calls()) == 3
+    backend.close()
+
+
+def test_tail_cache_holds_only_unfolded_calls(tmp_path, backend):
+    """Test folded calls are dropped from the read cache and never decoded again"""
+    def cached():
+        return sum(len(records) for _, _, records in backend._tail_cache.values())
+    
+    backend.log_calls([record(i) for i in range(50)])
+    assert len(backend.get_calls(limit=100)) == 50
+    assert cached() == 50
+    
+    backend.fold()
+    assert cached() == 0
+    backend.log_calls([record(i) for i in range(50, 53)])
+    assert len(backend.get_calls(limit=100)) == 53
+    assert cached() == 3
+    
+    # Another writer's folded calls are skipped, not decoded
+    other = SegmentLogBackend(os.path.join(tmp_path, "argus.db"), fold_interval=3600)
+    other.log_calls([record(i, agent_name="other") for i in range(60, 80)])
+    other.fold()
+    assert len(backend.get_calls("other")) == 20
+    assert cached() == 3
+    other.close()
+
+
+def test_rotation(tmp_path):
+    """Test segments rotate at segment_bytes and folding removes them"""
+    backend = SegmentLogBackend(
+        os.path.join(tmp_path, "argus.db"), segment_bytes=500, fold_interval=3600
+    )
+    for i in range(10):
+        backend.log_call(**record(i))
+    
+    assert len(segment_files(backend)) > 2
+    assert len(backend.get_calls()) == 10
+    
+    assert backend.fold() == 10
+    assert len(segment_files(backend)) == 1
+    backend.close()
+    assert os.listdir(backend.log_dir) == []
+
+
+def test_fold_never_duplicates(backend):
+    """Test a segment folded again (crash before it was deleted) adds nothing"""
+    backend.log_calls([record(i) for i in range(3)])
+    with backend._write_lock:
+        backend._rotate()
+    path = os.path.join(backend._dir, "0000000000.seg")
+    with open(path, "rb") as f:
+        data = f.read()
+    backend.fold()
+    assert not os.path.exists(path)
+    
+    with open(path, "wb") as f:
+        f.write(data)
+    assert backend.fold() == 0
+    assert backend.get_stats()["total_calls"] == 3
+    assert len(backend.get_calls()) == 3
+
+
+def test_torn_tail_and_duplicates_are_skipped(backend):
+    """Test a torn write or an already stored call_id doesn't block folding"""
+    backend.store.log_call(**record(1))
+    backend.log_calls([record(i) for i in range(3)])
+    with backend._write_lock:
+        backend._rotate()
+    with open(os.path.join(backend._dir, "0000000000.seg"), "ab") as f:
+        f.write(encode_record(record(3))[:10])
+    
+    assert backend.fold() == 2
+    assert backend.get_stats()["total_calls"] == 3
+    assert sorted(os.listdir(backend._dir)) == ["0000000001.seg", "LOCK"]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="needs flock")
+def test_dead_writer_is_folded(tmp_path, backend):
+    """Test another writer's calls are readable, and folded once it dies"""
+    other = SegmentLogBackend(os.path.join(tmp_path, "argus.db"), fold_interval=3600)
+    other.log_calls([record(i, agent_name="other") for i in range(4)])
+    
+    assert len(backend.get_calls("other")) == 4
+    backend.fold()
+    assert backend.get_stats()["total_calls"] == 0
+    
+    # Dies without closing
+    other._stop.set()
+    os.close(other._fd)
+    os.close(other._lock_fd)
+    other._closed = True
+    
+    assert backend.fold() == 4
+    assert backend.get_stats("other")["total_calls"] == 4
+    assert os.listdir(backend.log_dir) == [backend._writer]
+    assert len(backend.get_calls("other")) == 4
+
+
+def test_watch_segments_backend(tmp_path):
+    """Test Watch(backend="segments") shows calls at once and folds on close"""
+    db_path = os.path.join(tmp_path, "argus.db")
+    watch = Watch(db_path=db_path, backend="segments")
+    
+    @watch.agent(name="seg", tags=["test"])
+    def double(x):
+        return x * 2
+    
+    for i in range(3):
+        double(i)
+    
+    assert isinstance(watch.storage, SegmentLogBackend)
+    assert len(watch.get_calls("seg")) == 3
+    assert watch.list_agents()[0]["tags"] == ["test"]
+    
+    watch.close()
+    assert Storage(db_path).get_stats("seg")["total_calls"] == 3
+    assert os.listdir(watch.storage.log_dir) == []
@@ -0,0 +1,137 @@
+"""
+Tests for latency percentile sketches
+"""
+
+import pytest
+import random
+import tempfile
+import os
+from datetime import datetime
+from argus.sketch import LatencySketch, merge_sketches, percentiles_of
+from argus.storage import Storage
+
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+@pytest.fixture
+def durations():
+    rng = random.Random(42)
+    return [rng.lognormvariate(6, 1.5) for _ in range(20000)]
+
+
+def test_quantiles_within_relative_accuracy(durations):
+    """Test every reported percentile is within 1% of the exact value"""
+    sketch = LatencySketch(relative_accuracy=0.01)
+    for d in durations:
+        sketch.add(d)
+    
+    for q in (0.5, 0.9, 0.99, 0.999):
+        assert sketch.quantile(q) == pytest.approx(exact_quantile(durations, q), rel=0.01)
+    assert sketch.quantile(0.0) == min(durations)
+    assert sketch.quantile(1.0) == max(durations)
+
+
+def test_merge_equals_single_sketch(durations):
+    """Test merged sketches match one sketch fed all values"""
+    whole, left, right = LatencySketch(), LatencySketch(), LatencySketch()
+    for i, d in enumerate(durations):
+        whole.add(d)
+        (left if i % 3 else right).add(d)
+    
+    left.merge(right)
+    assert left.bins == whole.bins
+    assert left.count == whole.count
+    assert left.percentiles() == whole.percentiles()
+    
+    merged = LatencySketch.from_bytes(merge_sketches(
+        LatencySketch().to_bytes(),
+        merge_sketches(left.to_bytes(), right.to_bytes())
+    ))
+    assert merged.count == whole.count + right.count
+
+
+def test_serialized_merge_matches_object_merge(durations):
+    """Test the SQL merge function agrees with LatencySketch.merge"""
+    a, b = LatencySketch(), LatencySketch()
+    for d in durations[:100]:
+        a.add(d)
+    for d in durations[100:110]:
+        b.add(d * 1000)   # Bins above a's range
+    b.add(0)
+    
+    expected = LatencySketch.from_bytes(a.to_bytes())
+    expected.merge(b)
+    merged = LatencySketch.from_bytes(merge_sketches(a.to_bytes(), b.to_bytes()))
+    assert merged.bins == expected.bins
+    assert merged.zero_count == 1
+    assert (merged.min, merged.max) == (expected.min, expected.max)
+    assert merge_sketches(None, a.to_bytes()) == a.to_bytes()
+
+
+def test_memory_is_bounded():
+    """Test the bin count stays under max_bins however wide the range"""
+    sketch = LatencySketch(max_bins=100)
+    for exponent in range(-3, 9):
+        for i in range(1, 200):
+            sketch.add(i * 10.0 ** exponent)
+    
+    assert len(sketch.bins) <= 100
+    assert sketch.quantile(0.99) == pytest.approx(exact_quantile(
+        [i * 10.0 ** e for e in range(-3, 9) for i in range(1, 200)], 0.99
+    ), rel=0.01)
+
+
+def test_serialized_merge_is_bounded():
+    """Test merged sketches stay within the serialized bin cap"""
+    from argus.sketch import _MAX_SERIALIZED_BINS, _unpack
+    
+    low, high = LatencySketch(), LatencySketch()
+    for i in range(1, 2000):
+        low.add(i * 1e-9)
+        high.add(i * 1e6)       # About 2100 bins above low's
+    merged = merge_sketches(low.to_bytes(), high.to_bytes())
+    
+    assert len(_unpack(merged)[6]) <= _MAX_SERIALIZED_BINS
+    sketch = LatencySketch.from_bytes(merged)
+    assert sketch.count == low.count + high.count
+    assert sketch.quantile(0.99) == pytest.approx(high.quantile(0.98), rel=0.01)
+
+
+def test_empty_sketch():
+    """Test an empty sketch reports no percentiles"""
+    assert LatencySketch().quantile(0.5) is None
+    assert percentiles_of(None) == {"p50": None, "p90": None, "p99": None, "p99.9": None}
+    assert percentiles_of(LatencySketch().to_bytes())["p99"] is None
+
+
+def test_storage_reports_percentiles():
+    """Test stats, listings and windows include p50/p90/p99/p99.9"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+    storage = Storage(db_path)
+    storage.register_agent("tail", [])
+    
+    durations = list(range(1, 1001))
+    for start in range(0, 1000, 250):
+        storage.log_calls([
+            dict(call_id=f"c{d}", agent_name="tail", input_data={}, output_data={},
+                 status="success", error=None, duration_ms=d, cost=0.0,
+                 timestamp=datetime.utcnow())
+            for d in durations[start:start + 250]
+        ])
+    
+    expected = {"p50": 500, "p90": 900, "p99": 990, "p99.9": 999}
+    for percentiles in (
+        storage.get_stats("tail")["latency_percentiles"],
+        storage.get_stats()["agents"][0]["latency_percentiles"],
+        storage.list_agents()[0]["latency_percentiles"],
+        storage.get_window_stats("1h")["agents"][0]["latency_percentiles"],
+    ):
+        for name, value in expected.items():
+            assert percentiles[name] == pytest.approx(value, rel=0.01)
+    
+    storage.engine.dispose()
+    os.remove(db_path)
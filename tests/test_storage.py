@@ -0,0 +1,250 @@
+"""
+Tests for Storage
+"""
+
+import pytest
+import tempfile
+import os
+import json
+from datetime import datetime
+from sqlalchemy import event, text
+from argus.storage import Storage
+
+
+@pytest.fixture
+def storage():
+    """Create a Storage instance with temporary database"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+    
+    s = Storage(db_path)
+    yield s
+    s.engine.dispose()
+    
+    # Cleanup
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+def count_statements(storage):
+    """Attach a counter of executed SQL statements"""
+    statements = []
+    
+    @event.listens_for(storage.engine, "before_cursor_execute")
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    
+    return statements
+
+
+def log(storage, agent_name, call_id, status="success", duration_ms=10, cost=0.0):
+    storage.log_call(
+        call_id=call_id,
+        agent_name=agent_name,
+        input_data={},
+        output_data={},
+        status=status,
+        error=None,
+        duration_ms=duration_ms,
+        cost=cost,
+        timestamp=datetime.utcnow()
+    )
+
+
+def test_register_agent_cached(storage):
+    """Test repeated registration skips the database"""
+    storage.register_agent("cached", ["a"])
+    
+    statements = count_statements(storage)
+    for _ in range(10):
+        storage.register_agent("cached", ["a"])
+    
+    assert statements == []
+
+
+def test_register_agent_updates_tags(storage):
+    """Test changed tags are written through"""
+    storage.register_agent("retagged", ["old"])
+    storage.register_agent("retagged", ["new", "tags"])
+    
+    agent = storage.list_agents()[0]
+    assert agent["tags"] == ["new", "tags"]
+
+
+def test_agent_restored_after_wipe(storage):
+    """Test a known agent survives its row being deleted"""
+    storage.register_agent("survivor", ["keep"])
+    log(storage, "survivor", "c1")
+    
+    with storage.engine.begin() as conn:
+        conn.execute(text("DELETE FROM agents"))
+    
+    log(storage, "survivor", "c2")
+    
+    stats = storage.get_stats("survivor")
+    assert stats["total_calls"] == 1
+    assert storage.list_agents()[0]["tags"] == ["keep"]
+
+
+def record(agent_name, call_id, status="success", duration_ms=10, cost=0.0, **extra):
+    return dict(
+        call_id=call_id,
+        agent_name=agent_name,
+        input_data={"args": "(1,)"},
+        output_data={"result": "2"},
+        status=status,
+        error="boom" if status == "error" else None,
+        duration_ms=duration_ms,
+        cost=cost,
+        timestamp=datetime.utcnow(),
+        **extra
+    )
+
+
+def test_log_calls_folds_batch_into_totals(storage):
+    """Test a batch updates totals like the same calls logged one by one"""
+    storage.register_agent("bulk", [])
+    log(storage, "bulk", "before", duration_ms=40, cost=1.0)
+    
+    storage.log_calls([
+        record("bulk", "b1", duration_ms=10, cost=0.5),
+        record("bulk", "b2", status="error", duration_ms=20, cost=0.25),
+        record("bulk", "b3", duration_ms=30, sampled=False),
+    ])
+    
+    stats = storage.get_stats("bulk")
+    assert stats["total_calls"] == 4
+    assert stats["total_errors"] == 1
+    assert stats["total_cost"] == pytest.approx(1.75)
+    assert stats["avg_duration_ms"] == pytest.approx(25.0)
+    assert len(storage.get_calls(agent_name="bulk")) == 3
+
+
+def test_log_calls_rows_read_back_through_orm(storage, tmp_path):
+    """Test rows written by the bulk path round-trip through the ORM reads"""
+    storage.log_calls([
+        record("bulk", "rt1", tags=["x"], trace_id="t" * 26, span_id="s" * 16)
+    ])
+    
+    call = storage.get_calls()[0]
+    assert call["call_id"] == "rt1"
+    assert call["trace_id"] == "t" * 26
+    datetime.fromisoformat(call["timestamp"])
+    
+    out = tmp_path / "calls.json"
+    storage.export(str(out), format="json")
+    exported = json.loads(out.read_text())[0]
+    assert exported["input_data"] == {"args": "(1,)"}
+    assert exported["output_data"] == {"result": "2"}
+
+
+def test_log_calls_rolls_back_failed_batch(storage):
+    """Test a failing batch writes neither rows nor totals"""
+    storage.register_agent("atomic", [])
+    log(storage, "atomic", "dup")
+    
+    with pytest.raises(Exception):
+        storage.log_calls([
+            record("atomic", "fresh"),
+            record("atomic", "dup"),
+        ])
+    
+    assert storage.get_stats("atomic")["total_calls"] == 1
+    assert [c["call_id"] for c in storage.get_calls()] == ["dup"]
+
+
+def test_concurrent_writers_keep_exact_counters(storage):
+    """Test totals are exact after many concurrent calls from threads and processes"""
+    import threading
+    
+    # A second Storage on the same file stands in for another process
+    other = Storage(str(storage.engine.url.database))
+    storage.register_agent("contended", [])
+    threads_per_storage, calls_per_thread = 4, 100
+    
+    def worker(s, thread_no):
+        for i in range(calls_per_thread):
+            if i % 10 == 0:
+                s.log_calls([
+                    record("contended", f"{id(s)}-{thread_no}-{i}-{j}", duration_ms=j + 1, cost=0.25)
+                    for j in range(5)
+                ])
+            else:
+                log(s, "contended", f"{id(s)}-{thread_no}-{i}",
+                    status="error" if i % 7 == 0 else "success",
+                    duration_ms=i + 1, cost=0.5)
+    
+    threads = [
+        threading.Thread(target=worker, args=(s, n))
+        for s in (storage, other)
+        for n in range(threads_per_storage)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    other.engine.dispose()
+    
+    per_thread_batched = len(range(0, calls_per_thread, 10))
+    per_thread_single = calls_per_thread - per_thread_batched
+    n_threads = len(threads)
+    expected_calls = n_threads * (per_thread_single + per_thread_batched * 5)
+    expected_errors = n_threads * sum(
+        1 for i in range(calls_per_thread) if i % 10 != 0 and i % 7 == 0
+    )
+    expected_cost = n_threads * (per_thread_single * 0.5 + per_thread_batched * 5 * 0.25)
+    expected_sum = n_threads * (
+        sum(i + 1 for i in range(calls_per_thread) if i % 10 != 0)
+        + per_thread_batched * sum(range(1, 6))
+    )
+    
+    stats = storage.get_stats("contended")
+    assert stats["total_calls"] == expected_calls
+    assert stats["total_errors"] == expected_errors
+    assert stats["total_cost"] == pytest.approx(expected_cost)
+    assert stats["avg_duration_ms"] == pytest.approx(expected_sum / expected_calls)
+    assert stats["min_duration_ms"] == 1
+    assert stats["max_duration_ms"] == calls_per_thread
+    assert len(storage.get_calls(agent_name="contended", limit=10000)) == expected_calls
+
+
+def test_upgrade_backfills_duration_sum():
+    """Test databases with a running average get sum/min/max columns"""
+    import sqlite3
+    
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+    
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE agents (
+            id INTEGER PRIMARY KEY, name VARCHAR(255) UNIQUE NOT NULL, tags JSON,
+            total_calls INTEGER, total_cost FLOAT, total_errors INTEGER,
+            avg_duration_ms FLOAT, created_at DATETIME, last_called_at DATETIME
+        );
+        CREATE TABLE calls (
+            id INTEGER PRIMARY KEY, call_id VARCHAR(255) UNIQUE NOT NULL,
+            agent_name VARCHAR(255) NOT NULL, input_data JSON, output_data JSON,
+            status VARCHAR(50), error TEXT, duration_ms INTEGER, cost FLOAT,
+            timestamp DATETIME
+        );
+        INSERT INTO agents (name, tags, total_calls, total_cost, total_errors, avg_duration_ms)
+            VALUES ('legacy', '[]', 4, 0.0, 0, 25.0);
+        INSERT INTO calls (call_id, agent_name, status, duration_ms, cost)
+            VALUES ('l1', 'legacy', 'success', 10, 0.0), ('l2', 'legacy', 'success', 40, 0.0);
+    """)
+    conn.commit()
+    conn.close()
+    
+    try:
+        s = Storage(db_path)
+        log(s, "legacy", "new", duration_ms=75)
+        
+        stats = s.get_stats("legacy")
+        assert stats["total_calls"] == 5
+        assert stats["avg_duration_ms"] == pytest.approx((25.0 * 4 + 75) / 5)
+        assert stats["min_duration_ms"] == 10
+        assert stats["max_duration_ms"] == 75
+        s.engine.dispose()
+    finally:
+        os.remove(db_path)
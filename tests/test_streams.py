@@ -0,0 +1,235 @@
+"""
+Tests for streaming agent instrumentation
+"""
+
+import pytest
+import asyncio
+import tempfile
+import os
+import time
+from argus import Watch
+
+
+@pytest.fixture
+def watch():
+    """Create a Watch instance with temporary database"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+    
+    w = Watch(db_path=db_path)
+    yield w
+    w.close()
+    
+    # Cleanup
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+def stream_stats(watch, agent_name):
+    """output_data["stream"] of the only call logged for agent_name"""
+    watch.flush(timeout=5)
+    calls = watch.get_calls(agent_name=agent_name)
+    assert len(calls) == 1
+    call = watch.get_call(calls[0]["call_id"])
+    return call["output_data"]["stream"], call["duration_ms"], call["status"]
+
+
+def test_generator_logged_when_exhausted(watch):
+    """Test sync generators are timed until the last item"""
+    
+    @watch.agent(name="gen-agent")
+    def tokens():
+        time.sleep(0.02)
+        for t in ["a", "b", "c"]:
+            yield t
+            time.sleep(0.01)
+    
+    stream = tokens()
+    assert watch.get_calls(agent_name="gen-agent") == []
+    assert list(stream) == ["a", "b", "c"]
+    
+    stats, duration_ms, status = stream_stats(watch, "gen-agent")
+    assert status == "success"
+    assert stats["items"] == 3
+    assert stats["ttft_ms"] >= 20
+    assert duration_ms >= 40
+    assert stats["inter_item_ms"]["min"] >= 10
+
+
+def test_generator_error(watch):
+    """Test errors raised mid-stream are logged"""
+    
+    @watch.agent(name="gen-error")
+    def tokens():
+        yield "a"
+        raise ValueError("stream broke")
+    
+    with pytest.raises(ValueError):
+        list(tokens())
+    
+    stats, _, status = stream_stats(watch, "gen-error")
+    assert status == "error"
+    assert stats["items"] == 1
+
+
+def test_generator_closed_early(watch):
+    """Test closing a stream early logs it once"""
+    
+    @watch.agent(name="gen-closed")
+    def tokens():
+        while True:
+            yield "x"
+    
+    stream = tokens()
+    next(stream)
+    next(stream)
+    stream.close()
+    
+    stats, _, status = stream_stats(watch, "gen-closed")
+    assert status == "success"
+    assert stats["items"] == 2
+    assert watch.stats(agent_name="gen-closed")["total_calls"] == 1
+
+
+def test_async_generator(watch):
+    """Test async generators are timed until exhausted"""
+    
+    @watch.agent(name="agen-agent")
+    async def tokens():
+        await asyncio.sleep(0.02)
+        for t in range(5):
+            yield t
+    
+    async def consume():
+        return [t async for t in tokens()]
+    
+    assert asyncio.run(consume()) == [0, 1, 2, 3, 4]
+    
+    stats, _, _ = stream_stats(watch, "agen-agent")
+    assert stats["items"] == 5
+    assert stats["ttft_ms"] >= 20
+
+
+def test_coroutine_returning_async_iterator(watch):
+    """Test async agents returning a stream object"""
+    
+    async def upstream():
+        for t in range(3):
+            await asyncio.sleep(0)
+            yield t
+    
+    @watch.agent(name="astream-agent")
+    async def ask():
+        return upstream()
+    
+    async def consume():
+        stream = await ask()
+        return [t async for t in stream]
+    
+    assert asyncio.run(consume()) == [0, 1, 2]
+    
+    stats, _, _ = stream_stats(watch, "astream-agent")
+    assert stats["items"] == 3
+
+
+def test_non_stream_results_untouched(watch):
+    """Test lists and strings are not treated as streams"""
+    
+    @watch.agent(name="plain")
+    def func():
+        return [1, 2, 3]
+    
+    assert func() == [1, 2, 3]
+    assert watch.stats(agent_name="plain")["total_calls"] == 1
+
+
+def test_other_iterators_untouched(watch):
+    """Test map, zip, cursors and files are returned as they are"""
+    import sqlite3
+    
+    conn = sqlite3.connect(":memory:")
+    
+    @watch.agent(name="iterators")
+    def func(kind):
+        if kind == "map":
+            return map(str, [1, 2])
+        if kind == "zip":
+            return zip([1], [2])
+        return conn.execute("SELECT 1")
+    
+    assert isinstance(func("map"), map)
+    assert isinstance(func("zip"), zip)
+    assert func("cursor").fetchall() == [(1,)]
+    assert watch.stats(agent_name="iterators")["total_calls"] == 3
+
+
+def test_sdk_stream_detected_by_name():
+    """Test SDK stream classes are recognised without importing the SDK"""
+    from argus.streams import is_stream, is_async_stream
+    
+    Stream = type("Stream", (), {"__module__": "openai._streaming"})
+    AsyncStream = type("AsyncStream", (), {"__module__": "anthropic._streaming"})
+    Other = type("Stream", (), {"__module__": "mylib"})
+    
+    assert is_stream(Stream()) and not is_async_stream(Stream())
+    assert is_async_stream(AsyncStream()) and not is_stream(AsyncStream())
+    assert not is_stream(Other())
+
+
+def test_abandoned_stream_logged_off_finalizer(watch):
+    """Test a garbage-collected stream hands its call to a background thread"""
+    import threading
+    
+    threads = []
+    log_call = watch.storage.log_call
+    
+    def tracked(**record):
+        threads.append(threading.current_thread().name)
+        log_call(**record)
+    
+    watch.storage.log_call = tracked
+    
+    @watch.agent(name="abandoned")
+    def gen():
+        yield 1
+        yield 2
+    
+    stream = gen()
+    next(stream)
+    del stream
+    
+    stream_stats(watch, "abandoned")
+    assert threads and threads[0].startswith("argus-persist")
+
+
+def test_collected_stream_takes_no_locks(watch):
+    """Test garbage collection never waits on the writer's locks"""
+    import gc
+    import threading
+    
+    @watch.agent(name="abandoned")
+    def gen():
+        yield 1
+        yield 2
+    
+    stream = gen()
+    next(stream)
+    
+    # Would deadlock if the finalizer wrote or submitted the call
+    collected = threading.Event()
+    
+    def collect():
+        nonlocal stream
+        del stream
+        gc.collect()
+        collected.set()
+    
+    with watch._executor_lock:
+        thread = threading.Thread(target=collect)
+        thread.start()
+        assert collected.wait(timeout=5)
+    thread.join()
+    
+    stats, _, status = stream_stats(watch, "abandoned")
+    assert status == "success"
+    assert stats["items"] == 1
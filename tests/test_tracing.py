@@ -0,0 +1,129 @@
+"""
+Tests for nested spans and traces
+"""
+
+import pytest
+import asyncio
+import sqlite3
+import tempfile
+import os
+from argus import Watch
+from argus.storage import Storage
+
+
+@pytest.fixture
+def watch():
+    """Create a Watch instance with temporary database"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+    
+    w = Watch(db_path=db_path)
+    yield w
+    w.close()
+    
+    # Cleanup
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+def test_nested_calls_share_trace(watch):
+    """Test a watched call inside another becomes its child span"""
+    
+    @watch.agent(name="tool")
+    def tool(x):
+        return x + 1
+    
+    @watch.agent(name="orchestrator")
+    def orchestrator():
+        with watch.span("retrieval") as span:
+            span.output_data = {"docs": 3}
+            tool(1)
+        return tool(2)
+    
+    orchestrator()
+    
+    root = watch.get_calls(agent_name="orchestrator")[0]
+    trace = watch.get_trace(root["trace_id"])
+    assert len(trace) == 4
+    
+    by_name = {}
+    for s in trace:
+        by_name.setdefault(s["agent_name"], []).append(s)
+    retrieval = by_name["retrieval"][0]
+    
+    assert root["parent_span_id"] is None
+    assert retrieval["parent_span_id"] == root["span_id"]
+    parents = sorted(s["parent_span_id"] for s in by_name["tool"])
+    assert parents == sorted([retrieval["span_id"], root["span_id"]])
+
+
+def test_separate_calls_get_separate_traces(watch):
+    """Test top-level calls start new traces"""
+    
+    @watch.agent(name="solo")
+    def solo():
+        return 1
+    
+    solo()
+    solo()
+    
+    calls = watch.get_calls(agent_name="solo")
+    assert calls[0]["trace_id"] != calls[1]["trace_id"]
+
+
+def test_span_records_errors(watch):
+    """Test exceptions inside a span mark it as failed"""
+    with pytest.raises(KeyError):
+        with watch.span("lookup"):
+            raise KeyError("missing")
+    
+    stats = watch.stats(agent_name="lookup")
+    assert stats["total_errors"] == 1
+
+
+def test_async_tasks_propagate_context(watch):
+    """Test concurrent async children attach to the right parent"""
+    
+    @watch.agent(name="async-child")
+    async def child(i):
+        await asyncio.sleep(0)
+        return i
+    
+    @watch.agent(name="async-parent")
+    async def parent():
+        return await asyncio.gather(child(1), child(2))
+    
+    async def main():
+        await asyncio.gather(parent(), parent())
+    
+    asyncio.run(main())
+    watch.flush(timeout=5)
+    
+    for root in watch.get_calls(agent_name="async-parent"):
+        trace = watch.get_trace(root["trace_id"])
+        children = [s for s in trace if s["agent_name"] == "async-child"]
+        assert len(children) == 2
+        assert all(c["parent_span_id"] == root["span_id"] for c in children)
+
+
+def test_old_database_upgraded():
+    """Test trace columns are added to databases created before tracing"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+    
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE calls (id INTEGER PRIMARY KEY, call_id VARCHAR(255) UNIQUE NOT NULL, "
+        "agent_name VARCHAR(255) NOT NULL, input_data JSON, output_data JSON, "
+        "status VARCHAR(50), error TEXT, duration_ms INTEGER, cost FLOAT, timestamp DATETIME)"
+    )
+    conn.commit()
+    conn.close()
+    
+    storage = Storage(db_path)
+    with storage.engine.connect() as conn:
+        columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(calls)")}
+    assert {"trace_id", "span_id", "parent_span_id"} <= columns
+    
+    storage.engine.dispose()
+    os.remove(db_path)
@@ -0,0 +1,212 @@
+"""
+Tests for incremental export with watermarks
+"""
+
+import pytest
+import gzip
+import json
+import os
+from datetime import timedelta
+from argus.storage import Storage, PartitionedStorage
+from .conftest import START, record
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = Storage(os.path.join(tmp_path, "argus.db"))
+    storage.log_calls([record(i) for i in range(10)])
+    return storage
+
+
+def exported_ids(path):
+    with open(path) as f:
+        return [json.loads(line)["call_id"] for line in f]
+
+
+def test_exports_only_new_calls(storage, tmp_path):
+    """Test each export picks up where the previous one stopped"""
+    first = os.path.join(tmp_path, "1.jsonl")
+    second = os.path.join(tmp_path, "2.jsonl")
+    third = os.path.join(tmp_path, "3.jsonl")
+    
+    assert storage.export_since_watermark("ship", first, chunk_size=3) == 10
+    assert exported_ids(first) == [f"c{i:05d}" for i in range(10)]
+    
+    # Nothing new - no file
+    assert storage.export_since_watermark("ship", second) == 0
+    assert not os.path.exists(second)
+    
+    storage.log_calls([record(i) for i in range(10, 15)])
+    assert storage.export_since_watermark("ship", third, chunk_size=3) == 5
+    assert exported_ids(third) == [f"c{i:05d}" for i in range(10, 15)]
+    
+    with open(third) as f:
+        assert json.loads(f.readline())["input_data"] == {"args": "q10"}
+
+
+def test_watermarks_are_per_destination(storage, tmp_path):
+    """Test names keep independent positions"""
+    storage.export_since_watermark("s3", os.path.join(tmp_path, "s3-1.jsonl"))
+    storage.log_calls([record(10)])
+    
+    assert storage.export_since_watermark("s3", os.path.join(tmp_path, "s3-2.jsonl")) == 1
+    assert storage.export_since_watermark("kafka", os.path.join(tmp_path, "k-1.jsonl")) == 11
+    
+    watermarks = {w["name"]: w for w in storage.get_watermarks()}
+    assert watermarks["s3"]["exported_calls"] == 11
+    assert watermarks["kafka"]["exported_calls"] == 11
+    assert watermarks["s3"]["positions"] == {"main": 11}
+    assert watermarks["s3"]["pending"] is None
+
+
+def test_crash_before_rename_exports_again(storage, tmp_path, monkeypatch):
+    """Test an export that never reached its file is redone"""
+    path = os.path.join(tmp_path, "calls.jsonl")
+    
+    def crash(*args, **kwargs):
+        raise OSError("disk full")
+    monkeypatch.setattr(os, "replace", crash)
+    
+    with pytest.raises(OSError):
+        storage.export_since_watermark("ship", path)
+    assert not os.path.exists(path)
+    assert os.path.exists(path + ".tmp")
+    
+    monkeypatch.undo()
+    storage.log_calls([record(10)])
+    assert storage.export_since_watermark("ship", path) == 11
+    assert not os.path.exists(path + ".tmp")
+    assert len(exported_ids(path)) == 11
+
+
+def test_crash_after_rename_is_not_exported_twice(storage, tmp_path, monkeypatch):
+    """Test a file that made it into place counts as delivered"""
+    first = os.path.join(tmp_path, "1.jsonl")
+    second = os.path.join(tmp_path, "2.jsonl")
+    
+    def crash(*args, **kwargs):
+        raise RuntimeError("killed")
+    monkeypatch.setattr(storage, "_commit_watermark", crash)
+    
+    with pytest.raises(RuntimeError):
+        storage.export_since_watermark("ship", first)
+    assert len(exported_ids(first)) == 10
+    
+    monkeypatch.undo()
+    storage.log_calls([record(10), record(11)])
+    assert storage.export_since_watermark("ship", second) == 2
+    assert exported_ids(second) == ["c00010", "c00011"]
+
+
+def test_shipped_file_is_not_exported_twice(storage, tmp_path, monkeypatch):
+    """Test a file deleted by the shipper after a crash still counts as delivered"""
+    first = os.path.join(tmp_path, "1.jsonl")
+    second = os.path.join(tmp_path, "2.jsonl")
+    
+    def crash(*args, **kwargs):
+        raise RuntimeError("killed")
+    monkeypatch.setattr(storage, "_commit_watermark", crash)
+    
+    with pytest.raises(RuntimeError):
+        storage.export_since_watermark("ship", first)
+    os.remove(first)
+    
+    monkeypatch.undo()
+    storage.log_calls([record(10)])
+    assert storage.export_since_watermark("ship", second) == 1
+    assert exported_ids(second) == ["c00010"]
+
+
+def test_reused_filename_is_exported_again(storage, tmp_path, monkeypatch):
+    """Test an earlier file under the same path doesn't count for a crashed export"""
+    path = os.path.join(tmp_path, "calls.jsonl")
+    assert storage.export_since_watermark("ship", path) == 10
+    
+    storage.log_calls([record(10), record(11)])
+    
+    def crash(*args, **kwargs):
+        raise OSError("disk full")
+    monkeypatch.setattr(os, "replace", crash)
+    
+    with pytest.raises(OSError):
+        storage.export_since_watermark("ship", path)
+    assert len(exported_ids(path)) == 10
+    
+    monkeypatch.undo()
+    assert storage.export_since_watermark("ship", path) == 2
+    assert exported_ids(path) == ["c00010", "c00011"]
+
+
+def test_reset_watermark(storage, tmp_path):
+    """Test a reset watermark starts from the beginning"""
+    storage.export_since_watermark("ship", os.path.join(tmp_path, "1.jsonl"))
+    storage.reset_watermark("ship")
+    
+    assert storage.get_watermarks() == []
+    assert storage.export_since_watermark("ship", os.path.join(tmp_path, "2.jsonl")) == 10
+
+
+def test_ids_starting_over(storage, tmp_path):
+    """Test calls are still exported after every call was deleted"""
+    storage.export_since_watermark("ship", os.path.join(tmp_path, "1.jsonl"))
+    with storage.engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM calls")
+    
+    storage.log_calls([record(20), record(21)])
+    path = os.path.join(tmp_path, "2.jsonl")
+    assert storage.export_since_watermark("ship", path) == 2
+    assert exported_ids(path) == ["c00020", "c00021"]
+
+
+def test_new_ids_past_old_watermark_after_delete(storage, tmp_path):
+    """Test calls logged after compacting everything away are all exported"""
+    storage.export_since_watermark("ship", os.path.join(tmp_path, "1.jsonl"))
+    with storage.engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM calls")
+    
+    storage.log_calls([record(i) for i in range(20, 35)])
+    path = os.path.join(tmp_path, "2.jsonl")
+    assert storage.export_since_watermark("ship", path) == 15
+    assert exported_ids(path) == [f"c{i:05d}" for i in range(20, 35)]
+
+
+def test_compression_from_filename(storage, tmp_path):
+    """Test a .gz destination is gzipped, not named after the temp file"""
+    path = os.path.join(tmp_path, "calls.jsonl.gz")
+    assert storage.export_since_watermark("ship", path) == 10
+    
+    with gzip.open(path, "rt") as f:
+        assert len(f.readlines()) == 10
+
+
+def test_partitioned_watermarks(tmp_path):
+    """Test each partition has its own position and dropped ones are forgotten"""
+    storage = PartitionedStorage(os.path.join(tmp_path, "argus.db"), partition="hour")
+    storage.log_calls([record(i, timestamp=START + timedelta(minutes=40 * i)) for i in range(4)])
+    
+    first = os.path.join(tmp_path, "1.jsonl")
+    assert storage.export_since_watermark("ship", first) == 4
+    assert exported_ids(first) == [f"c{i:05d}" for i in range(4)]
+    
+    oldest = storage.partitions()[0].key
+    storage.drop_partition(oldest)
+    storage.log_calls([
+        record(i, timestamp=START + timedelta(minutes=40 * i)) for i in range(4, 6)
+    ])
+    
+    second = os.path.join(tmp_path, "2.jsonl")
+    assert storage.export_since_watermark("ship", second) == 2
+    assert exported_ids(second) == ["c00004", "c00005"]
+    
+    positions = storage.get_watermarks()[0]["positions"]
+    assert oldest not in positions
+    assert set(positions) == {"main"} | {p.key for p in storage.partitions()}
+
+
+def test_csv_watermark_export(storage, tmp_path):
+    """Test other formats go through the same watermark"""
+    path = os.path.join(tmp_path, "calls.csv")
+    assert storage.export_since_watermark("ship", path, format="csv") == 10
+    
+    with open(path) as f:
+        assert len(f.readlines()) == 11
@@ -0,0 +1,136 @@
+"""
+Tests for the background batched writer
+"""
+
+import pytest
+import tempfile
+import os
+import threading
+from datetime import datetime
+from argus import Watch
+from argus.writer import BatchWriter
+
+
+@pytest.fixture
+def db_path():
+    """Temporary database path"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        path = f.name
+    
+    yield path
+    
+    # Cleanup
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def make_record(i, agent_name="batch-agent"):
+    return {
+        "call_id": f"call-{i}",
+        "agent_name": agent_name,
+        "input_data": {"i": i},
+        "output_data": {},
+        "status": "success",
+        "error": None,
+        "duration_ms": 10,
+        "cost": 0.5,
+        "timestamp": datetime.utcnow(),
+        "tags": ["batch"]
+    }
+
+
+def test_async_writes_flush(db_path):
+    """Test decorated calls are written after flush()"""
+    watch = Watch(db_path=db_path, async_writes=True, flush_interval=60)
+    
+    @watch.agent(name="async-agent", tags=["queued"])
+    def func(x):
+        return x
+    
+    for i in range(25):
+        func(i)
+    
+    assert watch.flush(timeout=5)
+    
+    stats = watch.stats(agent_name="async-agent")
+    assert stats["total_calls"] == 25
+    assert len(watch.get_calls(agent_name="async-agent", limit=100)) == 25
+    assert watch.list_agents()[0]["tags"] == ["queued"]
+    watch.close()
+
+
+def test_async_writes_close_flushes(db_path):
+    """Test close() writes everything still queued"""
+    watch = Watch(db_path=db_path, async_writes=True, flush_interval=60)
+    
+    @watch.agent(name="close-agent")
+    def func():
+        raise ValueError("boom")
+    
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            func()
+    
+    watch.close()
+    
+    stats = watch.stats(agent_name="close-agent")
+    assert stats["total_calls"] == 3
+    assert stats["total_errors"] == 3
+
+
+def test_batch_size_trigger(db_path):
+    """Test a full batch is written without an explicit flush"""
+    watch = Watch(db_path=db_path)
+    writer = BatchWriter(watch.storage, batch_size=10, flush_interval=60)
+    
+    written = threading.Event()
+    log_calls = watch.storage.log_calls
+    
+    def spy(batch):
+        log_calls(batch)
+        written.set()
+    
+    watch.storage.log_calls = spy
+    for i in range(10):
+        writer.submit(make_record(i))
+    
+    assert written.wait(5)
+    assert watch.stats(agent_name="batch-agent")["total_calls"] == 10
+    writer.close()
+
+
+def test_drop_policy(db_path):
+    """Test records are dropped instead of blocking when the queue is full"""
+    watch = Watch(db_path=db_path)
+    release = threading.Event()
+    log_calls = watch.storage.log_calls
+    
+    def slow(batch):
+        release.wait(5)
+        log_calls(batch)
+    
+    watch.storage.log_calls = slow
+    writer = BatchWriter(
+        watch.storage,
+        batch_size=1,
+        flush_interval=60,
+        max_queue_size=2,
+        policy="drop"
+    )
+    
+    results = [writer.submit(make_record(i)) for i in range(10)]
+    assert not all(results)
+    assert writer.dropped == results.count(False)
+    
+    release.set()
+    writer.close()
+    
+    stats = watch.stats(agent_name="batch-agent")
+    assert stats["total_calls"] == results.count(True)
+
+
+def test_invalid_policy(db_path):
+    """Test unknown queue policies are rejected"""
+    watch = Watch(db_path=db_path)
+    with pytest.raises(ValueError):
+        BatchWriter(watch.storage, policy="spill")